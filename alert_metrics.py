@@ -0,0 +1,195 @@
+import bisect
+import threading
+from collections import Counter
+from datetime import date, datetime
+from pathlib import Path
+from typing import Callable, Iterable, NamedTuple, Optional
+
+import pyarrow as pa
+
+from audit_store import STATE_DIR, TIMESTAMP_FORMAT, connect
+from case_index import CaseIndex
+from data_store import DEFAULT_OFFICER, CaseStore
+from instrumentation import timed
+
+
+ALERT_STATUS_DB = STATE_DIR / "alert_status.db"
+CLOSED_STATUSES = ("Closed", "SAR Filed")
+# Upper bound in days (inclusive) of each open-alert age bucket; the last is open-ended.
+AGE_BUCKETS = [(7, "0-7 days"), (30, "8-30 days"), (90, "31-90 days"), (None, "90+ days")]
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS alert_status (
+    alert_id   TEXT PRIMARY KEY,
+    status     TEXT NOT NULL,
+    officer    TEXT NOT NULL,
+    updated_by TEXT NOT NULL,
+    updated_at TEXT NOT NULL
+) WITHOUT ROWID;
+"""
+
+
+class AlertKey(NamedTuple):
+    status: str
+    risk: str
+    officer: str
+    alert_date: date
+
+
+def _key(alert: dict) -> AlertKey:
+    officer = alert.get("Assigned Officer") or DEFAULT_OFFICER
+    return AlertKey(alert["Status"], alert["Risk Level"], officer, alert["Alert Date"])
+
+
+# -----------------------------------------------------------------------------
+# Status changes made in the app (source alert files are read-only)
+# -----------------------------------------------------------------------------
+class AlertStatusStore:
+    """Current status and officer of every alert changed since it was loaded."""
+
+    def __init__(self, path: Path = ALERT_STATUS_DB):
+        self.path = Path(path)
+        self._conn = connect(self.path)
+        self._conn.executescript(SCHEMA)
+        self._lock = threading.Lock()
+
+    def all(self) -> dict[str, tuple[str, str]]:
+        with self._lock:
+            rows = self._conn.execute("SELECT alert_id, status, officer FROM alert_status").fetchall()
+        return {alert_id: (status, officer) for alert_id, status, officer in rows}
+
+    def set(self, alert_id: str, status: str, officer: str, user: str) -> None:
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO alert_status VALUES (?, ?, ?, ?, ?)",
+                (alert_id, status, officer, user, datetime.now().strftime(TIMESTAMP_FORMAT)),
+            )
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+# -----------------------------------------------------------------------------
+# Materialised queue counts
+# -----------------------------------------------------------------------------
+class AlertMetrics:
+    """Alert-queue counts by status, risk level, age and officer.
+
+    Counted once from the alerts table with a grouped aggregate, then kept
+    current by applying each status change as a -1/+1 delta. Open alerts are
+    counted per alert date, so age buckets only sum a few thousand dates and
+    never need a rescan as days pass.
+    """
+
+    def __init__(
+        self,
+        alerts: pa.Table,
+        lookup: Callable[[str], Optional[dict]],
+        statuses: Optional[AlertStatusStore] = None,
+    ):
+        self._lookup = lookup
+        self._statuses = statuses
+        self._lock = threading.Lock()
+        self._overrides: dict[str, tuple[str, str]] = {}
+        self.version = 0
+        self.total = 0
+        self.by_status: Counter = Counter()
+        self.by_risk: Counter = Counter()
+        self.open_by_risk: Counter = Counter()
+        self.open_by_officer: Counter = Counter()
+        self._open_by_date: Counter = Counter()
+        self._ages: tuple = (None, None)
+
+        keys = ["Status", "Risk Level", "Alert Date"]
+        if "Assigned Officer" in alerts.schema.names:
+            keys.append("Assigned Officer")
+        for group in alerts.group_by(keys).aggregate([("Alert ID", "count")]).to_pylist():
+            self._count(_key(group), group["Alert ID_count"])
+
+        # Changes made in earlier runs are replayed as deltas on top of the source counts.
+        for alert_id, (status, officer) in (statuses.all() if statuses else {}).items():
+            alert = lookup(alert_id)
+            if alert is not None:
+                self._move(alert_id, _key(alert), status, officer)
+
+    @classmethod
+    def from_store(cls, store: CaseStore, index: CaseIndex, statuses: Optional[AlertStatusStore] = None) -> "AlertMetrics":
+        return cls(store.alert_table(), index.alert, statuses)
+
+    def _count(self, key: AlertKey, n: int) -> None:
+        self.total += n
+        self.by_status[key.status] += n
+        self.by_risk[key.risk] += n
+        if key.status not in CLOSED_STATUSES:
+            self.open_by_risk[key.risk] += n
+            self.open_by_officer[key.officer] += n
+            self._open_by_date[key.alert_date] += n
+
+    def _move(self, alert_id: str, old: AlertKey, status: str, officer: str) -> None:
+        self._count(old, -1)
+        self._count(old._replace(status=status, officer=officer), 1)
+        self._overrides[alert_id] = (status, officer)
+        self.version += 1
+
+    # -- reads ----------------------------------------------------------------
+    def state(self, alert: dict) -> dict:
+        # The alert record with its current status and officer applied.
+        key = _key(alert)
+        status, officer = self._overrides.get(alert["Alert ID"], (key.status, key.officer))
+        return {**alert, "Status": status, "Assigned Officer": officer}
+
+    def statuses(self, alert_ids: Iterable[str]) -> dict[str, str]:
+        # Current status of those of ``alert_ids`` changed in the app.
+        with self._lock:
+            return {alert_id: self._overrides[alert_id][0] for alert_id in alert_ids if alert_id in self._overrides}
+
+    def counts(self) -> dict[str, dict[str, int]]:
+        # Largest first, copied under the lock so a concurrent change never shows half-applied.
+        with self._lock:
+            return {
+                dimension: {key: n for key, n in counter.most_common() if n}
+                for dimension, counter in [
+                    ("Status", self.by_status),
+                    ("Risk Level", self.open_by_risk),
+                    ("Assigned Officer", self.open_by_officer),
+                ]
+            }
+
+    def totals(self) -> dict[str, int]:
+        # Dashboard headline figures, read together under the lock.
+        with self._lock:
+            return {"Open": sum(self.open_by_risk.values()), "High Risk": self.by_risk["High"]}
+
+    @timed("aggregate")
+    def by_age(self, today: Optional[date] = None) -> dict[str, int]:
+        today = today or date.today()
+        with self._lock:
+            if self._ages[0] == (today, self.version):
+                return self._ages[1]
+            bounds = [limit for limit, _ in AGE_BUCKETS[:-1]]
+            counts = dict.fromkeys((label for _, label in AGE_BUCKETS), 0)
+            for alert_date, n in self._open_by_date.items():
+                counts[AGE_BUCKETS[bisect.bisect_left(bounds, (today - alert_date).days)][1]] += n
+            self._ages = ((today, self.version), counts)
+            return counts
+
+    # -- writes ---------------------------------------------------------------
+    def change(
+        self,
+        alert_id: str,
+        status: Optional[str] = None,
+        officer: Optional[str] = None,
+        user: str = "",
+    ) -> Optional[dict]:
+        alert = self._lookup(alert_id)
+        if alert is None:
+            return None
+        with self._lock:
+            current = _key(self.state(alert))
+            status, officer = status or current.status, officer or current.officer
+            if (status, officer) != (current.status, current.officer):
+                if self._statuses is not None:
+                    self._statuses.set(alert_id, status, officer, user)
+                self._move(alert_id, current, status, officer)
+        return self.state(alert)
@@ -1,6 +1,45 @@
+import os
+import uuid
 import pandas as pd
 import streamlit as st
-from datetime import datetime
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from audit_store import AUDIT_COLUMNS, STATE_DIR
+from case_index import CaseIndex
+from counterparty_graph import NETWORK_WINDOW_DAYS, NetworkSummary
+from data_store import TRANSACTION_VIEW_COLUMNS, transaction_filter
+from draft_cache import draft_key
+from draft_store import DraftConflict
+from evidence_selection import DEFAULT_REASON, REASON_OPTIONS, EvidenceSelection, describe_delta
+from evidence_summary import EvidenceSummary, summarize_evidence
+from instrumentation import REGISTRY, begin_run, current_trace, run_elapsed, timed, track_frontend_payload
+from job_queue import FAILED, Job, Progress
+from narrative import TEMPLATE_TYPES, DraftResult, generate_draft
+from narrative_templates import default_engine
+from resources import (
+    current_data_version,
+    get_alert_metrics,
+    get_audit_store,
+    get_case_index,
+    get_case_store,
+    get_counterparty_graph,
+    get_draft_cache,
+    get_draft_store,
+    get_filing_store,
+    get_job_queue,
+    get_scored_transactions,
+    get_workflow_store,
+    stylesheet,
+)
+from rules_engine import RULES_COLUMN, SCORE_COLUMN, SUGGEST_MIN_SCORE, SUGGESTION_COLUMN, suggested_reasons
+from session_state import SessionStateManager
+from workflow_store import PENDING, ReviewConflict
+
+
+# Timing for this rerun starts before any cached resource or data access below.
+begin_run()
+track_frontend_payload()
 
 
 # -----------------------------------------------------------------------------
@@ -13,198 +52,253 @@ st.set_page_config(
     initial_sidebar_state="expanded",
 )
 
-st.markdown(
-    """
-    <style>
-        .stApp {
-            background-color: #f5f7fb;
-            color: #1f2a44;
-        }
-        .compact-title {
-            font-size: 1.45rem;
-            font-weight: 700;
-            color: #102a43;
-            margin-bottom: 0.1rem;
-        }
-        .compact-subtitle {
-            color: #486581;
-            font-size: 0.92rem;
-            margin-bottom: 0.5rem;
-        }
-        .metric-card {
-            background-color: #ffffff;
-            border: 1px solid #d9e2ec;
-            border-radius: 10px;
-            padding: 0.8rem;
-            box-shadow: 0 1px 3px rgba(16, 42, 67, 0.07);
-        }
-        .metric-label {
-            color: #486581;
-            font-size: 0.82rem;
-            margin-bottom: 0.15rem;
-        }
-        .metric-value {
-            color: #102a43;
-            font-size: 1.25rem;
-            font-weight: 700;
-        }
-        .status-pill {
-            display: inline-block;
-            background-color: #e3f9e5;
-            color: #207227;
-            border: 1px solid #a7f3d0;
-            border-radius: 999px;
-            padding: 0.15rem 0.6rem;
-            font-size: 0.75rem;
-            font-weight: 600;
-        }
-        .context-card {
-            background-color: #ffffff;
-            border: 1px solid #d9e2ec;
-            border-radius: 10px;
-            padding: 0.6rem 0.75rem;
-            margin-bottom: 0.35rem;
-        }
-        .context-label {
-            font-size: 0.73rem;
-            color: #627d98;
-        }
-        .context-value {
-            font-size: 0.9rem;
-            color: #102a43;
-            font-weight: 600;
-        }
-        .small-muted {
-            color: #627d98;
-            font-size: 0.8rem;
-        }
-    </style>
-    """,
-    unsafe_allow_html=True,
-)
+st.html(stylesheet())
 
 
 # -----------------------------------------------------------------------------
-# Static placeholder datasets
+# Shared case data (memory-mapped Arrow sources, one copy per data version).
+# Page-specific resources (counterparty graph, draft cache, job queue, filing
+# store) are fetched by the pages that use them, not on every rerun.
 # -----------------------------------------------------------------------------
-alerts_df = pd.DataFrame(
-    [
-        ["ALT-1024", "CASE-3401", "Sophia Williams", "High", "2026-02-12", "Open", 185000.00],
-        ["ALT-1025", "CASE-3402", "Liam Johnson", "Medium", "2026-02-12", "Investigating", 94500.00],
-        ["ALT-1026", "CASE-3403", "Olivia Brown", "High", "2026-02-11", "Open", 250000.00],
-        ["ALT-1027", "CASE-3398", "Noah Davis", "Low", "2026-02-10", "Closed", 12000.00],
-        ["ALT-1028", "CASE-3404", "Emma Wilson", "Medium", "2026-02-09", "Pending", 68000.00],
-    ],
-    columns=[
-        "Alert ID",
-        "Case ID",
-        "Customer Name",
-        "Risk Level",
-        "Alert Date",
-        "Status",
-        "Suspicious Amount",
-    ],
-)
-
-customer_df = pd.DataFrame(
-    [
-        ["Sophia Williams", "CUST-00981", "High", "Import/Export Director", "United Kingdom", "1987-06-14", "No", "No Match", "Enhanced Monitoring"],
-        ["Liam Johnson", "CUST-01005", "Medium", "IT Consultant", "Ireland", "1990-09-21", "No", "No Match", "Periodic Review"],
-        ["Olivia Brown", "CUST-01088", "High", "Logistics Owner", "UAE", "1985-01-03", "No", "No Match", "Enhanced Monitoring"],
-        ["Noah Davis", "CUST-01120", "Low", "Retail Manager", "United States", "1992-03-19", "No", "No Match", "Standard Monitoring"],
-        ["Emma Wilson", "CUST-01241", "Medium", "Property Broker", "Canada", "1988-11-05", "No", "No Match", "Periodic Review"],
-    ],
-    columns=[
-        "Customer Name",
-        "Customer ID",
-        "Risk Rating",
-        "Occupation",
-        "Nationality",
-        "Date of Birth",
-        "PEP",
-        "Sanctions Screening",
-        "Monitoring Plan",
-    ],
-)
-
-transactions_df = pd.DataFrame(
-    [
-        ["TXN-7781", "2026-02-10", 85000.00, "Outbound", "Blue Harbor Trading", "SG", "High"],
-        ["TXN-7782", "2026-02-10", 60000.00, "Inbound", "Sterling Commodities", "AE", "Medium"],
-        ["TXN-7783", "2026-02-11", 40000.00, "Outbound", "Northline Brokers", "TR", "High"],
-        ["TXN-7784", "2026-02-12", 12000.00, "Inbound", "Atlas Supplies", "GB", "Low"],
-        ["TXN-7785", "2026-02-12", 95000.00, "Outbound", "Redwood Logistics", "CY", "High"],
-        ["TXN-7786", "2026-02-13", 31000.00, "Outbound", "Falcon Imports", "HK", "Medium"],
-    ],
-    columns=["Transaction ID", "Date", "Amount", "Direction", "Counterparty", "Country", "Risk Flag"],
-)
+case_store = get_case_store(current_data_version())
+case_index = get_case_index(case_store.version)
+alert_metrics = get_alert_metrics(case_store.version)
+audit_store = get_audit_store()
+draft_store = get_draft_store()
+workflow = get_workflow_store()
+session = SessionStateManager(st.session_state)
+
+ALERT_PAGE_SIZE = 100
+AUDIT_PAGE_SIZE = 50
+DEBUG_PREVIEW_ROWS = 50
+JOB_POLL_SECONDS = 1.0
+WORKFLOW_POLL_SECONDS = 2.0
+METRICS_FILE = Path(os.environ.get("SAR_METRICS_FILE", STATE_DIR / "metrics.prom"))
 
 
 # -----------------------------------------------------------------------------
 # Session state setup
 # -----------------------------------------------------------------------------
 def init_state() -> None:
-    default_case = alerts_df.iloc[0].to_dict()
-
-    if "selected_case" not in st.session_state:
-        st.session_state.selected_case = default_case
+    # Session state holds IDs and handles only; records come from the shared index.
+    if "selected_alert_id" not in st.session_state:
+        st.session_state.selected_alert_id = case_index.alert_ids()[0]
 
     if "selected_transactions" not in st.session_state:
-        st.session_state.selected_transactions = []
+        st.session_state.selected_transactions = EvidenceSelection(selected_case()["Case ID"])
 
     if "role" not in st.session_state:
         st.session_state.role = "Analyst"
 
-    if "audit_log" not in st.session_state:
-        st.session_state.audit_log = [
-            {
-                "Timestamp": "2026-02-12 09:35:00",
-                "User": "m.khan",
-                "Action": "Alert selected",
-                "Case ID": "CASE-3401",
-                "Description": "Initial alert triage completed.",
-            }
-        ]
+    if "session_id" not in st.session_state:
+        st.session_state.session_id = uuid.uuid4().hex
 
-    if "sar_draft" not in st.session_state:
-        st.session_state.sar_draft = ""
+    if "evidence_page" not in st.session_state:
+        st.session_state.evidence_page = 1
 
-    if "draft_version" not in st.session_state:
-        st.session_state.draft_version = 0
+    if "alert_page" not in st.session_state:
+        # Open the alert table on the page holding the current alert.
+        st.session_state.alert_page = case_index.alert_position(st.session_state.selected_alert_id) // ALERT_PAGE_SIZE + 1
 
-    if "draft_last_edited" not in st.session_state:
-        st.session_state.draft_last_edited = "-"
-
-    if "draft_edited_by" not in st.session_state:
-        st.session_state.draft_edited_by = "-"
+    if "draft_version" not in st.session_state:
+        load_case_draft(selected_case()["Case ID"])
+    else:
+        # The editor widget owns the working draft. Re-assigning its value keeps
+        # the text, saved or not, while the Narrative Generator is not shown.
+        st.session_state.draft_editor = st.session_state.draft_editor
 
 
 # -----------------------------------------------------------------------------
 # Utility helpers
 # -----------------------------------------------------------------------------
 def current_user() -> str:
+    name = st.session_state.get("user_name", "").strip()
+    if name:
+        return name
     return "analyst.user" if st.session_state.role == "Analyst" else "reviewer.user"
 
 
 def add_audit_event(action: str, description: str) -> None:
-    st.session_state.audit_log.append(
+    # Waits for the commit: the UI confirms actions right after logging them.
+    audit_store.append(
         {
             "Timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
             "User": current_user(),
             "Action": action,
-            "Case ID": st.session_state.selected_case["Case ID"],
+            "Case ID": selected_case()["Case ID"],
             "Description": description,
-        }
+        },
+        wait=True,
+    )
+
+
+def selected_case() -> dict:
+    case = case_index.alert(st.session_state.selected_alert_id)
+    if case is None:
+        # The alert is gone from the current data version; fall back to the first one.
+        st.session_state.selected_alert_id = case_index.alert_ids()[0]
+        case = case_index.alert(st.session_state.selected_alert_id)
+    return alert_metrics.state(case)
+
+
+def set_case_status(status: str, message: str) -> None:
+    case = alert_metrics.change(st.session_state.selected_alert_id, status=status, user=current_user())
+    add_audit_event("Case status changed", f"{case['Alert ID']} status set to {status}.")
+    # The context bar and queue counts sit outside the calling fragment, so rerun the whole page.
+    st.toast(message)
+    st.rerun()
+
+
+def current_draft() -> str:
+    return st.session_state.draft_editor
+
+
+def set_current_draft(text: str) -> None:
+    # Only before the editor is drawn in this run; Streamlit rejects changes after.
+    st.session_state.draft_editor = text
+
+
+def load_case_draft(case_id: str) -> None:
+    latest = draft_store.latest(case_id)
+    set_current_draft(draft_store.text(case_id, latest.version) if latest else "")
+    st.session_state.draft_version = latest.version if latest else 0
+    st.session_state.draft_last_edited = latest.created_at if latest else "-"
+    st.session_state.draft_edited_by = latest.author if latest else "-"
+    st.session_state.draft_conflict = None
+
+
+def save_draft_version(text: str) -> int:
+    # Saves on top of the version this session loaded; 0 if another session saved first.
+    try:
+        version = workflow.save_draft(
+            selected_case()["Case ID"], text, current_user(), expected=st.session_state.draft_version
+        )
+    except DraftConflict as exc:
+        st.session_state.draft_conflict = exc.latest
+        return 0
+    st.session_state.draft_conflict = None
+    st.session_state.draft_version = version
+    st.session_state.draft_last_edited = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    st.session_state.draft_edited_by = current_user()
+    return version
+
+
+def commit_draft(text: str) -> int:
+    # The saved version matching `text`, saving it first if it was edited.
+    version = st.session_state.draft_version
+    if version and text == draft_store.text(selected_case()["Case ID"], version):
+        return version
+    return save_draft_version(text)
+
+
+def select_alert(alert_id: str) -> None:
+    case = case_index.alert(alert_id)
+    st.session_state.selected_alert_id = alert_id
+    st.session_state.selected_transactions.clear(case["Case ID"])
+    load_case_draft(case["Case ID"])
+    add_audit_event("Alert selected", f"Selected {alert_id} for investigation.")
+
+
+def selected_customer_record() -> dict:
+    return case_index.customer(selected_case()["Customer ID"])
+
+
+@timed("data")
+def evidence_frame(customer_id: str, selection: EvidenceSelection) -> pd.DataFrame:
+    if not selection:
+        return pd.DataFrame()
+    rows = case_store.transactions_by_id(customer_id, selection.ids)
+    rows["Suspicion Reason"] = rows["Transaction ID"].map(selection.reasons).fillna(DEFAULT_REASON)
+    return rows
+
+
+@st.cache_data(max_entries=1024, show_spinner=False)
+def cached_evidence_summary(
+    version: str, customer_id: str, fingerprint: str, _selection: EvidenceSelection
+) -> EvidenceSummary:
+    return summarize_evidence(evidence_frame(customer_id, _selection))
+
+
+def evidence_summary() -> EvidenceSummary:
+    # Shared across pages and sessions; keyed by the selection's content hash.
+    selection = st.session_state.selected_transactions
+    customer_id = selected_case()["Customer ID"]
+    return cached_evidence_summary(case_store.version, customer_id, selection.fingerprint(), selection)
+
+
+@st.cache_data(max_entries=1024, show_spinner=False)
+def cached_case_network(version: str, customer_id: str, window_end, window_days: int) -> NetworkSummary:
+    return get_counterparty_graph(version).analyze(customer_id, window_end, window_days)
+
+
+def case_network() -> NetworkSummary:
+    # Window ends at the alert date; the graph itself is built once per data version.
+    case = selected_case()
+    return cached_case_network(case_store.version, case["Customer ID"], case["Alert Date"], NETWORK_WINDOW_DAYS)
+
+
+def draft_request_key(selection: EvidenceSelection, template_type: str, analyst_summary: str) -> str:
+    return draft_key(
+        selection.case_id,
+        ((tx_id, selection.reason(tx_id)) for tx_id in selection.ids),
+        template_type,
+        default_engine().template_version(template_type),
+        analyst_summary,
+        case_store.version,
+        NETWORK_WINDOW_DAYS,
     )
 
 
-def selected_customer_record() -> pd.Series:
-    name = st.session_state.selected_case["Customer Name"]
-    return customer_df[customer_df["Customer Name"] == name].iloc[0]
+def apply_generated_draft(draft: DraftResult, cached: bool = False) -> bool:
+    # False when the draft matches the saved version, which then stays current.
+    case_id = selected_case()["Case ID"]
+    version = st.session_state.draft_version
+    changed = not version or draft.narrative != draft_store.text(case_id, version)
+    # Loaded into the editor even if the save conflicts, so "Save Mine" saves it.
+    set_current_draft(draft.narrative)
+    if changed:
+        if not save_draft_version(draft.narrative):
+            return False
+        source = "from cache" if cached else "generated"
+        add_audit_event("Narrative generated", f"Draft v{st.session_state.draft_version} {source}.")
+    return changed
+
+
+def submit_draft_job(key: str, selection: EvidenceSelection, template_type: str, analyst_summary: str) -> Job:
+    # Identical evidence, template and summary share one job across re-clicks and sessions.
+    case = selected_case()
+    graph = get_counterparty_graph(case_store.version)
+
+    def run(progress: Progress) -> DraftResult:
+        progress(0.1, "Summarising evidence")
+        summary = summarize_evidence(evidence_frame(case["Customer ID"], selection))
+        progress(0.4, "Analysing counterparty network")
+        network = graph.analyze(case["Customer ID"], case["Alert Date"], NETWORK_WINDOW_DAYS)
+        progress(0.7, "Rendering narrative")
+        return get_draft_cache().put(key, generate_draft(case, summary, template_type, analyst_summary, network=network))
+
+    job = get_job_queue().submit(key, run, f"{case['Case ID']} | {template_type}")
+    st.session_state.draft_job = (case["Case ID"], job.key)
+    return job
+
+
+def render_metric_cards(cards: list[tuple[str, str]], value_style: str = "") -> None:
+    for col, (label, value) in zip(st.columns(len(cards)), cards):
+        with col:
+            st.markdown(
+                f"""
+                <div class="metric-card">
+                    <div class="metric-label">{label}</div>
+                    <div class="metric-value"{value_style}>{value}</div>
+                </div>
+                """,
+                unsafe_allow_html=True,
+            )
 
 
+@timed("render")
 def render_case_context_bar() -> None:
-    case = st.session_state.selected_case
+    case = selected_case()
     with st.container():
         cols = st.columns(6)
         values = [
@@ -213,7 +307,7 @@ def render_case_context_bar() -> None:
             ("Customer Name", case["Customer Name"]),
             ("Risk Level", case["Risk Level"]),
             ("Case Status", case["Status"]),
-            ("Assigned Officer", "Mariam Khan"),
+            ("Assigned Officer", case["Assigned Officer"]),
         ]
         for c, (label, value) in zip(cols, values):
             with c:
@@ -225,28 +319,97 @@ def render_case_context_bar() -> None:
 
 # -----------------------------------------------------------------------------
 # Core modular page renderers
+#
+# The evidence, narrative and audit renderers are fragments: widget changes
+# inside them rerun only that renderer, not the sidebar, styling, context bar
+# or debug panel. Anything that changes the case context stays outside them.
 # -----------------------------------------------------------------------------
+@timed("render")
 def render_case_selection() -> None:
     st.subheader("Alert / Case Selection")
     st.caption("Select an alert to establish case context for evidence review and narrative drafting.")
 
-    view_df = alerts_df[["Alert ID", "Customer Name", "Risk Level", "Alert Date", "Status", "Suspicious Amount"]]
+    search = st.text_input("Search Alerts", placeholder="Alert ID, case ID or customer name")
+    # A new search starts again from its first page.
+    if st.session_state.get("alert_search") != search:
+        if "alert_search" in st.session_state:
+            st.session_state.alert_page = 1
+        st.session_state.alert_search = search
+
+    page = case_index.alert_page(st.session_state.alert_page - 1, ALERT_PAGE_SIZE, search)
+    if st.session_state.alert_page > page.page_count:
+        st.session_state.alert_page = page.page_count
+
+    # Only the page's rows are shown, so only they need their app status applied.
+    view_df = page.rows
+    view_df["Status"] = view_df["Alert ID"].map(alert_metrics.statuses(view_df["Alert ID"])).fillna(view_df["Status"])
     st.dataframe(view_df, use_container_width=True, hide_index=True)
 
-    case_options = [f"{row['Alert ID']} | {row['Case ID']} | {row['Customer Name']}" for _, row in alerts_df.iterrows()]
-    default_idx = 0
-    selected_option = st.selectbox("Select Alert / Case", case_options, index=default_idx)
+    p1, p2 = st.columns([1, 3])
+    p1.number_input("Page", min_value=1, max_value=page.page_count, step=1, key="alert_page")
+    p2.markdown(
+        f"<span class='small-muted'>{page.total:,} alerts | page {page.page + 1} of {page.page_count}</span>",
+        unsafe_allow_html=True,
+    )
 
-    selected_alert_id = selected_option.split(" | ")[0]
-    selected_row = alerts_df[alerts_df["Alert ID"] == selected_alert_id].iloc[0].to_dict()
+    # Keep the current alert selectable, e.g. when it was opened from the review queue.
+    case_options = page.labels
+    current = case_index.alert_label(st.session_state.selected_alert_id)
+    if current not in case_options:
+        case_options = [current] + case_options
+    selected_option = st.selectbox("Select Alert / Case", case_options, index=case_options.index(current))
 
-    if selected_row["Alert ID"] != st.session_state.selected_case["Alert ID"]:
-        st.session_state.selected_case = selected_row
-        st.session_state.selected_transactions = []
-        add_audit_event("Alert selected", f"Selected {selected_row['Alert ID']} for investigation.")
+    selected_alert_id = CaseIndex.alert_id_from_label(selected_option)
+    if selected_alert_id != st.session_state.selected_alert_id:
+        select_alert(selected_alert_id)
         st.success("Case context updated.")
 
 
+@timed("render")
+def render_review_queue() -> None:
+    st.markdown("##### Review Queue")
+    reviews = workflow.pending()
+    if not reviews:
+        st.caption("No drafts are waiting for review.")
+        return
+    st.dataframe(
+        pd.DataFrame(
+            [
+                {
+                    "Case ID": r.case_id,
+                    "Alert ID": r.alert_id,
+                    "Draft Version": f"v{r.draft_version}",
+                    "Requested By": r.requested_by,
+                    "Requested At": r.requested_at,
+                }
+                for r in reviews
+            ]
+        ),
+        use_container_width=True,
+        hide_index=True,
+    )
+    q1, q2 = st.columns([3, 1], vertical_alignment="bottom")
+    alert_id = q1.selectbox("Open for Review", [r.alert_id for r in reviews])
+    if q2.button("Open Case", use_container_width=True, disabled=alert_id == st.session_state.selected_alert_id):
+        select_alert(alert_id)
+        st.rerun()
+
+
+@timed("render")
+def render_alert_queue() -> None:
+    with st.expander("Alert Queue"):
+        st.caption("All alerts by status; open alerts by risk level, age and assigned officer.")
+        counts = alert_metrics.counts()
+        counts["Age"] = alert_metrics.by_age()
+        for col, (dimension, values) in zip(st.columns(4), counts.items()):
+            col.dataframe(
+                pd.DataFrame(values.items(), columns=[dimension, "Alerts"]),
+                use_container_width=True,
+                hide_index=True,
+            )
+
+
+@timed("render")
 def render_customer_summary() -> None:
     st.subheader("Customer Summary")
     st.caption("Read-only profile and KYC highlights for the selected case.")
@@ -268,29 +431,64 @@ def render_customer_summary() -> None:
         kyc_cols[3].text_input("Monitoring Plan", value=cust["Monitoring Plan"], disabled=False)
 
 
+@st.fragment
+@timed("render")
 def render_transaction_selection() -> None:
     st.subheader("Transaction Evidence Selection")
-    st.caption("Select suspicious transactions and tag each with the primary suspicion reason.")
-
-    reason_options = [
-        "Structuring",
-        "Layering",
-        "Rapid Movement",
-        "Sanctions Risk",
-        "Unusual Pattern",
-        "Other",
-    ]
-
-    work_df = transactions_df.copy()
-    work_df["Select"] = work_df["Transaction ID"].isin(
-        [tx["Transaction ID"] for tx in st.session_state.selected_transactions]
+    st.caption(
+        "Rule scores pre-fill a suggested reason for every transaction. "
+        "Select the suspicious ones and adjust reasons where needed."
+    )
+
+    customer_id = selected_case()["Customer ID"]
+
+    scored = get_scored_transactions(case_store.version, customer_id)
+
+    with st.expander("Filter and Sort"):
+        f1, f2, f3, f4, f5 = st.columns(5)
+        directions = f1.multiselect("Direction", ["Inbound", "Outbound"])
+        risk_flags = f2.multiselect("Risk Flag", ["High", "Medium", "Low"])
+        min_amount = f3.number_input("Minimum Amount", min_value=0.0, value=0.0, step=1000.0)
+        counterparty = f4.text_input("Counterparty Contains")
+        min_score = f5.number_input("Minimum Score", min_value=0, max_value=100, value=0, step=10)
+        o1, o2, o3 = st.columns(3)
+        sort_by = o1.selectbox("Sort by", ["Date", "Amount", "Score", "Counterparty", "Country", "Risk Flag"])
+        descending = o2.toggle("Descending")
+        page_size = o3.selectbox("Rows per Page", [50, 100, 250, 500], index=1)
+
+    # Another customer, filter or sort order starts again from the first page.
+    view = (customer_id, directions, risk_flags, min_amount, counterparty, min_score, sort_by, descending, page_size)
+    if st.session_state.get("evidence_view") != view:
+        st.session_state.evidence_view = view
+        st.session_state.evidence_page = 1
+
+    page = case_store.transaction_page(
+        customer_id,
+        filter=transaction_filter(directions, risk_flags, min_amount, counterparty, min_score),
+        sort_by=sort_by,
+        descending=descending,
+        page=st.session_state.evidence_page - 1,
+        page_size=page_size,
+        columns=TRANSACTION_VIEW_COLUMNS + [SCORE_COLUMN, RULES_COLUMN, SUGGESTION_COLUMN],
+        table=scored,
+    )
+    if st.session_state.evidence_page > page.page_count:
+        st.session_state.evidence_page = page.page_count
+
+    p1, p2 = st.columns([1, 3])
+    p1.number_input("Page", min_value=1, max_value=page.page_count, step=1, key="evidence_page")
+    p2.markdown(
+        f"<span class='small-muted'>{page.total:,} transactions for {customer_id} | "
+        f"page {page.page + 1} of {page.page_count}</span>",
+        unsafe_allow_html=True,
     )
 
-    existing_reasons = {
-        tx["Transaction ID"]: tx.get("Suspicion Reason", "Unusual Pattern")
-        for tx in st.session_state.selected_transactions
-    }
-    work_df["Suspicion Reason"] = work_df["Transaction ID"].map(existing_reasons).fillna("Unusual Pattern")
+    selection = st.session_state.selected_transactions
+    work_df = page.rows
+    suggested = work_df.pop(SUGGESTION_COLUMN)
+    work_df["Select"] = work_df["Transaction ID"].isin(selection.ids)
+    # Tagged rows keep the analyst's reason; everything else shows the rules' suggestion.
+    work_df["Suspicion Reason"] = work_df["Transaction ID"].map(selection.reasons).fillna(suggested)
 
     edited = st.data_editor(
         work_df,
@@ -298,64 +496,143 @@ def render_transaction_selection() -> None:
         hide_index=True,
         column_config={
             "Select": st.column_config.CheckboxColumn(required=False),
-            "Suspicion Reason": st.column_config.SelectboxColumn(options=reason_options, required=True),
+            "Suspicion Reason": st.column_config.SelectboxColumn(options=REASON_OPTIONS, required=True),
             "Amount": st.column_config.NumberColumn(format="$%.2f"),
+            SCORE_COLUMN: st.column_config.ProgressColumn(min_value=0, max_value=100, format="%d"),
         },
-        disabled=["Transaction ID", "Date", "Amount", "Direction", "Counterparty", "Country", "Risk Flag"],
+        disabled=TRANSACTION_VIEW_COLUMNS + [SCORE_COLUMN, RULES_COLUMN],
+        key="evidence_editor",
     )
 
-    if st.button("Update Selected Evidence", use_container_width=True):
-        selected_df = edited[edited["Select"]].copy()
-        st.session_state.selected_transactions = selected_df[
-            [
-                "Transaction ID",
-                "Date",
-                "Amount",
-                "Direction",
-                "Counterparty",
-                "Country",
-                "Risk Flag",
-                "Suspicion Reason",
-            ]
-        ].to_dict("records")
-        add_audit_event(
-            "Transactions selected",
-            f"Selected {len(st.session_state.selected_transactions)} suspicious transactions.",
+    u1, u2 = st.columns(2)
+    if u1.button("Update Selected Evidence", use_container_width=True):
+        # Only the rows the analyst touched are applied; other pages are untouched.
+        delta = selection.apply_edits(
+            edited["Transaction ID"].tolist(),
+            st.session_state.evidence_editor["edited_rows"],
+            suggested.tolist(),
         )
-        st.success("Evidence selection updated.")
+        if delta:
+            add_audit_event("Transactions selected", describe_delta(delta, len(selection)))
+            st.success("Evidence selection updated.")
+        else:
+            st.info("No evidence changes to apply.")
+
+    threshold = max(int(min_score), SUGGEST_MIN_SCORE)
+    if u2.button(f"Select All Scoring {threshold}+ With Suggested Reasons", use_container_width=True):
+        # Covers every page, not just the one shown; analyst-set reasons are kept.
+        suggestions = suggested_reasons(scored, threshold)
+        delta = selection.tag({tx_id: r for tx_id, r in suggestions.items() if tx_id not in selection})
+        if delta:
+            add_audit_event("Transactions selected", describe_delta(delta, len(selection)))
+            st.success(f"Selected {len(delta.added)} rule-flagged transactions.")
+        else:
+            st.info("No further transactions meet the score threshold.")
+
+    render_counterparty_network()
 
     st.markdown("##### Evidence Summary")
-    selected_tx = pd.DataFrame(st.session_state.selected_transactions)
+    summary = evidence_summary()
 
-    if selected_tx.empty:
+    if summary.empty:
         st.info("No suspicious transactions selected yet.")
         return
 
-    total_amount = float(selected_tx["Amount"].sum())
-    tx_count = int(selected_tx.shape[0])
-    date_range = f"{selected_tx['Date'].min()} to {selected_tx['Date'].max()}"
-    top_counterparties = ", ".join(selected_tx["Counterparty"].value_counts().head(3).index.tolist())
-
-    s1, s2, s3, s4 = st.columns(4)
-    cards = [
-        ("Total suspicious amount", f"${total_amount:,.2f}"),
-        ("Suspicious transactions", str(tx_count)),
-        ("Date range", date_range),
-        ("Top counterparties", top_counterparties if top_counterparties else "-"),
-    ]
-    for col, (label, value) in zip([s1, s2, s3, s4], cards):
-        with col:
-            st.markdown(
-                f"""
-                <div class="metric-card">
-                    <div class="metric-label">{label}</div>
-                    <div class="metric-value" style="font-size:1rem;">{value}</div>
-                </div>
-                """,
-                unsafe_allow_html=True,
-            )
+    top_counterparties = ", ".join(summary.top_counterparties)
+    compact = ' style="font-size:1rem;"'
+    render_metric_cards(
+        [
+            ("Total suspicious amount", f"${summary.total_amount:,.2f}"),
+            ("Suspicious transactions", str(summary.tx_count)),
+            ("Date range", summary.date_range),
+            ("Top counterparties", top_counterparties if top_counterparties else "-"),
+        ],
+        compact,
+    )
+    render_metric_cards(
+        [
+            ("Velocity", f"{summary.tx_per_day:,.1f} tx/day | ${summary.amount_per_day:,.0f}/day"),
+            ("Inbound / Outbound", f"${summary.inbound_amount:,.0f} / ${summary.outbound_amount:,.0f}"),
+            ("Round-amount transactions", str(summary.round_amount_count)),
+            ("Near-threshold transactions", str(summary.structuring_count)),
+        ],
+        compact,
+    )
+
+    with st.expander("Totals by Country and Counterparty"):
+        t1, t2 = st.columns(2)
+        t1.dataframe(
+            pd.DataFrame(summary.country_totals.items(), columns=["Country", "Amount"]),
+            use_container_width=True,
+            hide_index=True,
+        )
+        t2.dataframe(
+            pd.DataFrame(summary.counterparty_totals.items(), columns=["Counterparty", "Amount"]),
+            use_container_width=True,
+            hide_index=True,
+        )
 
 
+@timed("render")
+def render_counterparty_network() -> None:
+    with st.expander("Counterparty Network"):
+        network = case_network()
+        st.caption(
+            f"Money flows for {network.customer_id} from {network.window_start} to {network.window_end}. "
+            "Flow paths follow funds that move on within a few days while keeping most of their value."
+        )
+        render_metric_cards(
+            [
+                ("Fan-in", f"{network.fan_in} | ${network.inbound_amount:,.0f}"),
+                ("Fan-out", f"{network.fan_out} | ${network.outbound_amount:,.0f}"),
+                ("Flow paths", str(len(network.paths))),
+                ("Cycles", str(len(network.cycles))),
+            ],
+            ' style="font-size:1rem;"',
+        )
+
+        flows = [("Inbound", p) for p in network.inbound_paths]
+        flows += [("Outbound", p) for p in network.outbound_paths]
+        flows += [("Cycle", p) for p in network.cycles]
+        if not flows:
+            st.info("No multi-hop flows in this window.")
+            return
+        st.dataframe(
+            pd.DataFrame(
+                [
+                    {
+                        "Flow": kind,
+                        "Path": " -> ".join(path.nodes),
+                        "Hops": len(path.hops),
+                        "Start Amount": path.amounts[0],
+                        "End Amount": path.amounts[-1],
+                        "First Date": path.first_date,
+                        "Last Date": path.last_date,
+                    }
+                    for kind, path in flows
+                ]
+            ),
+            use_container_width=True,
+            hide_index=True,
+            column_config={
+                "Start Amount": st.column_config.NumberColumn(format="$%.2f"),
+                "End Amount": st.column_config.NumberColumn(format="$%.2f"),
+            },
+        )
+
+        label = f"Add {len(network.flow_transactions)} flow transactions to evidence"
+        if st.button(label, disabled=not network.flow_transactions, use_container_width=True):
+            selection = st.session_state.selected_transactions
+            delta = selection.tag(network.flow_transactions)
+            if delta:
+                add_audit_event("Transactions selected", describe_delta(delta, len(selection)))
+                st.success("Flow transactions added to the evidence selection.")
+            else:
+                st.info("Flow transactions are already selected.")
+
+
+@st.fragment
+@timed("render")
 def render_narrative_generator() -> None:
     st.subheader("SAR Narrative Generator")
     st.caption("Generate and manage narrative drafts from selected evidence.")
@@ -364,40 +641,34 @@ def render_narrative_generator() -> None:
 
     with left:
         st.markdown("##### Evidence and Controls")
-        template_type = st.selectbox(
-            "SAR Template Type",
-            ["Structuring", "Cross-border laundering", "Sanctions evasion", "Fraud", "Other"],
-        )
+        template_type = st.selectbox("SAR Template Type", TEMPLATE_TYPES)
         analyst_summary = st.text_input("Analyst Investigation Summary", placeholder="1-2 sentence summary")
 
         disable_generate = st.session_state.role == "Reviewer"
         if st.button("Generate SAR Draft", type="primary", disabled=disable_generate, use_container_width=True):
-            selected_tx = pd.DataFrame(st.session_state.selected_transactions)
-            if selected_tx.empty:
+            selection = st.session_state.selected_transactions.copy()
+            if not selection:
                 st.warning("Select suspicious transactions before generating a draft.")
             else:
-                amount = selected_tx["Amount"].sum()
-                reasons = ", ".join(sorted(selected_tx["Suspicion Reason"].unique()))
-                counterparties = ", ".join(selected_tx["Counterparty"].value_counts().head(3).index.tolist())
-                st.session_state.sar_draft = (
-                    f"SAR Template: {template_type}\n\n"
-                    f"Case {st.session_state.selected_case['Case ID']} associated with alert "
-                    f"{st.session_state.selected_case['Alert ID']} involves transaction behavior "
-                    f"indicative of {template_type.lower()}. The review identified "
-                    f"{len(selected_tx)} suspicious transactions totaling ${amount:,.2f}, "
-                    f"with key counterparties including {counterparties}.\n\n"
-                    f"Primary suspicion indicators include {reasons}. "
-                    f"{analyst_summary if analyst_summary else 'Analyst notes pending additional detail.'}\n\n"
-                    "This is a simulated frontend draft for workflow validation only."
-                )
-                st.session_state.draft_version += 1
-                st.session_state.draft_last_edited = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                st.session_state.draft_edited_by = current_user()
-                add_audit_event("Narrative generated", f"Draft v{st.session_state.draft_version} generated.")
-                st.success("Draft generated.")
+                key = draft_request_key(selection, template_type, analyst_summary)
+                cached = get_draft_cache().get(key)
+                if cached is None:
+                    submit_draft_job(key, selection, template_type, analyst_summary)
+                elif apply_generated_draft(cached, cached=True):
+                    st.success("Draft generated from cache.")
+                elif st.session_state.get("draft_conflict"):
+                    st.rerun()
+                else:
+                    st.info(f"Inputs are unchanged; the draft is still v{st.session_state.draft_version}.")
+
+        if st.session_state.get("draft_job"):
+            render_draft_job()
 
     with right:
         st.markdown("##### Editable SAR Draft")
+        render_case_activity()
+        if st.session_state.get("draft_conflict"):
+            render_draft_conflict()
         st.markdown(
             f"<span class='small-muted'>Version: v{st.session_state.draft_version} | "
             f"Last edited: {st.session_state.draft_last_edited} | "
@@ -407,7 +678,6 @@ def render_narrative_generator() -> None:
 
         draft_text = st.text_area(
             "Draft",
-            value=st.session_state.sar_draft,
             height=280,
             key="draft_editor",
             placeholder="Generated draft appears here...",
@@ -416,81 +686,307 @@ def render_narrative_generator() -> None:
         edit_cols = st.columns(4)
 
         if edit_cols[0].button("Mark Draft Edited", use_container_width=True):
-            st.session_state.sar_draft = draft_text
             st.session_state.draft_last_edited = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
             st.session_state.draft_edited_by = current_user()
             add_audit_event("Draft edited", "Draft content manually edited by user.")
             st.info("Draft edit captured.")
 
         if edit_cols[1].button("Save Draft", use_container_width=True):
-            st.session_state.sar_draft = draft_text
-            st.session_state.draft_version += 1
-            st.session_state.draft_last_edited = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            st.session_state.draft_edited_by = current_user()
-            add_audit_event("Draft saved", f"Draft saved as version v{st.session_state.draft_version}.")
-            st.success("Draft saved.")
+            if save_draft_version(draft_text):
+                add_audit_event("Draft saved", f"Draft saved as version v{st.session_state.draft_version}.")
+                st.success("Draft saved.")
+            else:
+                st.rerun()
 
         if edit_cols[2].button("Request Review", use_container_width=True):
-            st.session_state.sar_draft = draft_text
-            add_audit_event("Submitted for review", "Draft submitted to reviewer queue.")
-            st.info("Review requested.")
+            # The review pins the saved version the reviewer will read.
+            version = commit_draft(draft_text)
+            if not version:
+                st.rerun()
+            case = selected_case()
+            workflow.request_review(case["Case ID"], case["Alert ID"], version, current_user())
+            add_audit_event("Submitted for review", f"Draft v{version} submitted to reviewer queue.")
+            set_case_status("Under Review", "Review requested.")
 
         if edit_cols[3].button("Submit SAR", use_container_width=True):
-            st.session_state.sar_draft = draft_text
+            # The filing pins the exact draft version and evidence for the export run.
+            version = commit_draft(draft_text)
+            if not version:
+                st.rerun()
+            selection = st.session_state.selected_transactions
             add_audit_event("SAR submitted", "SAR submitted to regulatory filing queue.")
-            st.success("SAR submitted.")
+            get_filing_store().record(
+                selected_case(),
+                version,
+                {tx_id: selection.reason(tx_id) for tx_id in selection.ids},
+                current_user(),
+            )
+            set_case_status("SAR Filed", "SAR submitted.")
+
+        render_draft_history()
 
         if st.session_state.role == "Reviewer":
-            st.divider()
-            r1, r2 = st.columns(2)
-            if r1.button("Approve", use_container_width=True):
-                add_audit_event("Review approved", "Reviewer approved SAR draft.")
-                st.success("Draft approved.")
-            if r2.button("Reject", use_container_width=True):
-                add_audit_event("Review rejected", "Reviewer rejected SAR draft and returned to analyst.")
-                st.error("Draft rejected.")
+            render_review_decision()
+
+
+@st.fragment(run_every=WORKFLOW_POLL_SECONDS)
+@timed("render")
+def render_case_activity() -> None:
+    # Other sessions on this case and their saves; queries only run after the case changed.
+    case_id = selected_case()["Case ID"]
+    workflow.touch(case_id, st.session_state.session_id, current_user(), st.session_state.role)
+    activity = workflow.activity(case_id)
+
+    others = workflow.editors(case_id, exclude=st.session_state.session_id)
+    if others:
+        st.warning("Also open by " + ", ".join(f"{e.user} ({e.role})" for e in others))
+
+    latest = activity.latest
+    if latest and latest.version > st.session_state.draft_version and not st.session_state.get("draft_conflict"):
+        a1, a2 = st.columns([3, 1], vertical_alignment="center")
+        a1.info(f"v{latest.version} was saved by {latest.author} at {latest.created_at}; you are editing v{st.session_state.draft_version}.")
+        if a2.button("Load Latest", use_container_width=True):
+            load_case_draft(case_id)
+            st.rerun()
+
+    review = activity.review
+    if review and review.status == PENDING:
+        st.caption(f"Review pending for v{review.draft_version}, requested by {review.requested_by} at {review.requested_at}.")
+    elif review:
+        st.caption(f"Last review: v{review.draft_version} {review.status.lower()} by {review.reviewer} at {review.decided_at}.")
+
+
+@timed("render")
+def render_draft_conflict() -> None:
+    latest = st.session_state.draft_conflict
+    st.error(
+        f"Not saved: v{latest.version} was saved by {latest.author} at {latest.created_at} "
+        f"after you opened v{st.session_state.draft_version}. Your text is still in the editor."
+    )
+    c1, c2 = st.columns(2)
+    if c1.button(f"Discard Mine and Load v{latest.version}", use_container_width=True):
+        load_case_draft(selected_case()["Case ID"])
+        st.rerun()
+    if c2.button(f"Save Mine as v{latest.version + 1}", use_container_width=True):
+        st.session_state.draft_version = latest.version
+        if save_draft_version(current_draft()):
+            add_audit_event("Draft saved", f"Draft saved as version v{st.session_state.draft_version} over a concurrent edit.")
+        st.rerun()
+
+
+@timed("render")
+def render_review_decision() -> None:
+    st.divider()
+    review = workflow.activity(selected_case()["Case ID"]).review
+    pending = review is not None and review.status == PENDING
+    r1, r2 = st.columns(2)
+    approve = r1.button("Approve", disabled=not pending, use_container_width=True)
+    reject = r2.button("Reject", disabled=not pending, use_container_width=True)
+    if not (approve or reject):
+        return
+    try:
+        workflow.decide(selected_case()["Case ID"], st.session_state.draft_version, current_user(), approve)
+    except ReviewConflict as exc:
+        st.error(f"{exc}. Load the latest draft before deciding.")
+        return
+    if approve:
+        add_audit_event("Review approved", f"Reviewer approved SAR draft v{st.session_state.draft_version}.")
+        st.success("Draft approved.")
+    else:
+        add_audit_event("Review rejected", "Reviewer rejected SAR draft and returned to analyst.")
+        set_case_status("Investigating", "Draft rejected.")
+
+
+@st.fragment(run_every=JOB_POLL_SECONDS)
+@timed("render")
+def render_draft_job() -> None:
+    # Polls the background job; only rendered while this session has one pending.
+    case_id, key = st.session_state.draft_job
+    job = get_job_queue().get(key)
+    if job is None or case_id != selected_case()["Case ID"]:
+        st.session_state.draft_job = None
+        return
+    if not job.finished:
+        st.progress(job.progress, text=f"{job.message} ({job.elapsed:.1f}s)")
+        return
+
+    st.session_state.draft_job = None
+    if job.status == FAILED:
+        add_audit_event("Narrative generation failed", job.error)
+        st.error(f"Draft generation failed: {job.error}")
+        return
+    if apply_generated_draft(job.result):
+        st.toast("Draft generated.")
+    elif not st.session_state.get("draft_conflict"):
+        st.toast(f"Draft unchanged; still v{st.session_state.draft_version}.")
+    st.rerun()
+
+
+@timed("render")
+def render_draft_history() -> None:
+    case_id = selected_case()["Case ID"]
+    history = draft_store.history(case_id)
+    if not history:
+        return
 
+    with st.expander(f"Version History ({len(history)})"):
+        st.dataframe(
+            pd.DataFrame(history, columns=["Case ID", "Version", "Parent", "Stored As", "Stored Bytes", "Characters", "Author", "Saved At"]),
+            use_container_width=True,
+            hide_index=True,
+        )
+        versions = [v.version for v in history]
+        h1, h2 = st.columns(2)
+        to_version = h1.selectbox("Compare Version", versions, format_func=lambda v: f"v{v}")
+        from_version = h2.selectbox(
+            "Against Version", versions, index=min(1, len(versions) - 1), format_func=lambda v: f"v{v}"
+        )
+        diff = draft_store.diff(case_id, from_version, to_version)
+        if diff:
+            st.code(diff, language="diff")
+        else:
+            st.caption("No differences between the selected versions.")
 
+
+@st.fragment
+@timed("render")
 def render_audit_trail() -> None:
     st.subheader("Audit Trail")
     st.caption("Traceable event history with workflow-level filtering.")
 
-    log_df = pd.DataFrame(st.session_state.audit_log)
-    if log_df.empty:
+    facets = audit_store.facets()
+    if not facets["action"]:
         st.info("No audit events recorded yet.")
         return
 
-    f1, f2 = st.columns([1.3, 1])
+    f1, f2, f3, f4, f5 = st.columns([1.3, 1, 1, 0.8, 0.8])
     with f1:
-        action_filter = st.multiselect("Filter by Action", sorted(log_df["Action"].unique().tolist()))
+        action_filter = st.multiselect("Filter by Action", facets["action"])
     with f2:
-        user_filter = st.selectbox("Filter by User", ["All"] + sorted(log_df["User"].unique().tolist()))
+        user_filter = st.selectbox("Filter by User", ["All"] + facets["user"])
+    with f3:
+        case_filter = st.selectbox("Filter by Case", ["All"] + facets["case_id"])
+    with f4:
+        date_from = st.date_input("From", value=None)
+    with f5:
+        date_to = st.date_input("To", value=None)
+
+    # Keyset pagination: a stack of cursors, reset whenever the filters change.
+    filters = (tuple(action_filter), user_filter, case_filter, date_from, date_to)
+    if st.session_state.get("audit_filters") != filters:
+        st.session_state.audit_filters = filters
+        st.session_state.audit_cursors = [None]
+
+    cursors = st.session_state.audit_cursors
+    page = audit_store.query(
+        actions=action_filter,
+        user=None if user_filter == "All" else user_filter,
+        case_id=None if case_filter == "All" else case_filter,
+        since=datetime.combine(date_from, datetime.min.time()) if date_from else None,
+        until=datetime.combine(date_to + timedelta(days=1), datetime.min.time()) if date_to else None,
+        before=cursors[-1],
+        limit=AUDIT_PAGE_SIZE,
+    )
 
-    filtered = log_df.copy()
-    if action_filter:
-        filtered = filtered[filtered["Action"].isin(action_filter)]
-    if user_filter != "All":
-        filtered = filtered[filtered["User"] == user_filter]
+    st.dataframe(pd.DataFrame(page.events, columns=AUDIT_COLUMNS), use_container_width=True, hide_index=True)
 
-    st.dataframe(filtered.sort_values("Timestamp", ascending=False), use_container_width=True, hide_index=True)
+    n1, n2, n3 = st.columns([1, 1, 3])
+    n1.button("Newer", disabled=len(cursors) == 1, on_click=cursors.pop, use_container_width=True)
+    n2.button(
+        "Older",
+        disabled=page.next_key is None,
+        on_click=cursors.append,
+        args=(page.next_key,),
+        use_container_width=True,
+    )
+    n3.markdown(f"<span class='small-muted'>Page {len(cursors)} | newest first</span>", unsafe_allow_html=True)
 
 
+@timed("render")
 def render_debug_panel() -> None:
     with st.expander("Debug Information"):
-        st.write("Selected Transactions")
-        st.json(st.session_state.selected_transactions)
+        case = selected_case()
+        selection = st.session_state.selected_transactions
+        preview_ids = selection.sorted_ids()[:DEBUG_PREVIEW_ROWS]
+
+        st.write(f"Selected Transactions (first {len(preview_ids)} of {len(selection)})")
+        st.json({tx_id: selection.reason(tx_id) for tx_id in preview_ids})
 
         prompt_data = {
-            "case_id": st.session_state.selected_case["Case ID"],
-            "alert_id": st.session_state.selected_case["Alert ID"],
-            "customer_name": st.session_state.selected_case["Customer Name"],
-            "selected_transaction_count": len(st.session_state.selected_transactions),
+            "case_id": case["Case ID"],
+            "alert_id": case["Alert ID"],
+            "customer_name": case["Customer Name"],
+            "selected_transaction_count": len(selection),
         }
         st.write("Current prompt data structure")
         st.json(prompt_data)
 
-        st.write("Session state")
-        st.json({k: v for k, v in st.session_state.items() if k != "audit_log"})
+        if st.toggle("Inspect session memory"):
+            sizes = session.footprint()
+            st.write(f"Session state: {sum(sizes.values()):,} bytes across {len(sizes)} keys")
+            st.dataframe(pd.DataFrame(sizes.items(), columns=["Key", "Bytes"]), use_container_width=True, hide_index=True)
+            st.write("Session state")
+            st.json(session.lightweight_state(sizes))
+
+
+def render_performance_panel() -> None:
+    with st.expander("Performance"):
+        if not st.toggle("Show rerun timings"):
+            return
+        # Read before this panel draws anything, so the numbers exclude the panel itself.
+        trace = current_trace()
+        elapsed = run_elapsed()
+
+        self_ms = {kind: sum(s.self_seconds for s in trace if s.kind == kind) * 1000 for kind in ("data", "aggregate", "render")}
+        render_metric_cards(
+            [
+                ("Rerun so far", f"{elapsed * 1000:,.1f} ms"),
+                ("Data access", f"{self_ms['data']:,.1f} ms"),
+                ("Aggregation", f"{self_ms['aggregate']:,.1f} ms"),
+                ("Rendering", f"{self_ms['render']:,.1f} ms"),
+                ("Sent to browser", f"{sum(s.frontend_bytes for s in trace if s.depth == 0) / 1024:,.1f} KB"),
+            ]
+        )
+        st.caption("Rendering is renderer time outside nested data and aggregation calls, which includes serializing elements for the browser.")
+
+        st.write("This rerun")
+        st.dataframe(
+            pd.DataFrame(
+                [
+                    {
+                        "Kind": s.kind,
+                        "Name": "\u2003" * s.depth + s.name,
+                        "Total ms": round(s.seconds * 1000, 2),
+                        "Self ms": round(s.self_seconds * 1000, 2),
+                        "Frontend KB": round(s.frontend_bytes / 1024, 1),
+                        "Messages": s.frontend_messages,
+                    }
+                    for s in trace
+                ]
+            ),
+            use_container_width=True,
+            hide_index=True,
+        )
+
+        st.write("Since server start")
+        st.dataframe(pd.DataFrame(REGISTRY.snapshot()), use_container_width=True, hide_index=True)
+
+        j1, j2 = st.columns(2)
+        j1.write("Background jobs")
+        j1.dataframe(pd.DataFrame([get_job_queue().counts()]), use_container_width=True, hide_index=True)
+        j2.write("Draft cache")
+        j2.dataframe(pd.DataFrame([get_draft_cache().stats()]), use_container_width=True, hide_index=True)
+
+        c1, c2 = st.columns(2)
+        if c1.button("Write metrics file", use_container_width=True):
+            c1.caption(f"Wrote {REGISTRY.write_textfile(METRICS_FILE)}")
+        c2.download_button(
+            "Download metrics (Prometheus)",
+            data=REGISTRY.prometheus(),
+            file_name="sar_metrics.prom",
+            mime="text/plain",
+            use_container_width=True,
+        )
 
 
 # -----------------------------------------------------------------------------
@@ -505,6 +1001,7 @@ with st.sidebar:
     st.divider()
 
     st.session_state.role = st.selectbox("Role", ["Analyst", "Reviewer"], index=0 if st.session_state.role == "Analyst" else 1)
+    st.text_input("User Name", key="user_name", placeholder=current_user())
 
     page = st.radio(
         "Navigation",
@@ -522,6 +1019,9 @@ with st.sidebar:
     st.divider()
     st.markdown("**Current User**")
     st.write(f"{current_user()} ({st.session_state.role})")
+    if st.session_state.role == "Reviewer":
+        st.markdown("**Review Queue**")
+        st.write(f"{workflow.pending_count:,} pending")
     st.markdown("**System Status**")
     st.markdown('<span class="status-pill">Active</span>', unsafe_allow_html=True)
 
@@ -532,26 +1032,17 @@ render_case_context_bar()
 st.divider()
 
 if page == "Dashboard":
-    c1, c2, c3, c4 = st.columns(4)
-    selected_tx = pd.DataFrame(st.session_state.selected_transactions)
-    total_suspicious = f"${selected_tx['Amount'].sum():,.2f}" if not selected_tx.empty else "$0.00"
-    metrics = [
-        ("Open Alerts", str(alerts_df[alerts_df["Status"] != "Closed"].shape[0])),
-        ("High Risk Alerts", str(alerts_df[alerts_df["Risk Level"] == "High"].shape[0])),
-        ("Selected Evidence Tx", str(selected_tx.shape[0])),
-        ("Selected Evidence Amount", total_suspicious),
-    ]
-    for col, (label, value) in zip([c1, c2, c3, c4], metrics):
-        with col:
-            st.markdown(
-                f"""
-                <div class="metric-card">
-                    <div class="metric-label">{label}</div>
-                    <div class="metric-value">{value}</div>
-                </div>
-                """,
-                unsafe_allow_html=True,
-            )
+    summary = evidence_summary()
+    totals = alert_metrics.totals()
+    render_metric_cards(
+        [
+            ("Open Alerts", f"{totals['Open']:,}"),
+            ("High Risk Alerts", f"{totals['High Risk']:,}"),
+            ("Selected Evidence Tx", str(summary.tx_count)),
+            ("Selected Evidence Amount", f"${summary.total_amount:,.2f}"),
+        ]
+    )
+    render_alert_queue()
 
     st.divider()
     render_case_selection()
@@ -569,10 +1060,11 @@ elif page == "Case Management":
     st.subheader("Case Management")
     st.caption("Read-only case controls and assignment context.")
     c1, c2, c3 = st.columns(3)
-    c1.text_input("Case ID", value=st.session_state.selected_case["Case ID"], disabled=True)
-    c2.text_input("Case Status", value=st.session_state.selected_case["Status"], disabled=True)
-    c3.text_input("Assigned Officer", value="Mariam Khan", disabled=True)
+    c1.text_input("Case ID", value=selected_case()["Case ID"], disabled=True)
+    c2.text_input("Case Status", value=selected_case()["Status"], disabled=True)
+    c3.text_input("Assigned Officer", value=selected_case()["Assigned Officer"], disabled=True)
     st.info("Case actions are logged through the Narrative Generator controls.")
+    render_review_queue()
 
 elif page == "Narrative Generator":
     render_narrative_generator()
@@ -582,3 +1074,4 @@ elif page == "Audit Trail":
 
 st.divider()
 render_debug_panel()
+render_performance_panel()
@@ -0,0 +1,287 @@
+import atexit
+import logging
+import os
+import sqlite3
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Iterable, Iterator, NamedTuple, Optional, Sequence
+
+from instrumentation import timed
+
+
+STATE_DIR = Path(os.environ.get("SAR_STATE_DIR", Path(__file__).resolve().parent / "state"))
+AUDIT_DB = STATE_DIR / "audit.db"
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS audit_events (
+    id          INTEGER PRIMARY KEY AUTOINCREMENT,
+    ts          INTEGER NOT NULL,
+    user        TEXT    NOT NULL,
+    action      TEXT    NOT NULL,
+    case_id     TEXT    NOT NULL,
+    description TEXT    NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_audit_ts     ON audit_events (ts, id);
+CREATE INDEX IF NOT EXISTS idx_audit_case   ON audit_events (case_id, ts, id);
+CREATE INDEX IF NOT EXISTS idx_audit_user   ON audit_events (user, ts, id);
+CREATE INDEX IF NOT EXISTS idx_audit_action ON audit_events (action, ts, id);
+CREATE TRIGGER IF NOT EXISTS audit_events_no_update BEFORE UPDATE ON audit_events
+BEGIN SELECT RAISE(ABORT, 'audit log is append-only'); END;
+CREATE TRIGGER IF NOT EXISTS audit_events_no_delete BEFORE DELETE ON audit_events
+BEGIN SELECT RAISE(ABORT, 'audit log is append-only'); END;
+"""
+
+AUDIT_COLUMNS = ["Timestamp", "User", "Action", "Case ID", "Description"]
+
+_log = logging.getLogger(__name__)
+
+
+class AuditWriterError(RuntimeError):
+    """The writer thread stopped; queued events were not committed."""
+
+
+class AuditPage(NamedTuple):
+    events: list[dict]
+    # Keyset cursor (ts, id) of the last row; pass as `before` for the next page.
+    next_key: Optional[tuple[int, int]]
+
+
+def to_epoch(timestamp: str) -> int:
+    return int(datetime.strptime(timestamp, TIMESTAMP_FORMAT).timestamp())
+
+
+def from_epoch(ts: int) -> str:
+    return datetime.fromtimestamp(ts).strftime(TIMESTAMP_FORMAT)
+
+
+def _row(event: dict) -> tuple:
+    return (to_epoch(event["Timestamp"]), event["User"], event["Action"], event["Case ID"], event["Description"])
+
+
+def _event(row: tuple) -> dict:
+    ts, user, action, case_id, description = row
+    return dict(zip(AUDIT_COLUMNS, (from_epoch(ts), user, action, case_id, description)))
+
+
+def connect(path: Path) -> sqlite3.Connection:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(str(path), check_same_thread=False, timeout=30)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
+
+
+def connect_readonly(path: Path) -> sqlite3.Connection:
+    # For processes that only read the log: no writer thread, schema or pragmas.
+    return sqlite3.connect(f"{Path(path).resolve().as_uri()}?mode=ro", uri=True, check_same_thread=False, timeout=30)
+
+
+def read_events(conn: sqlite3.Connection, case_id: Optional[str] = None, until: Optional[datetime] = None) -> Iterator[dict]:
+    # Oldest first, streamed from the cursor; `until` is inclusive.
+    clauses, params = [], []
+    if case_id is not None:
+        clauses.append("case_id = ?")
+        params.append(case_id)
+    if until is not None:
+        clauses.append("ts <= ?")
+        params.append(int(until.timestamp()))
+    where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+    cursor = conn.execute(f"SELECT ts, user, action, case_id, description FROM audit_events {where} ORDER BY ts, id", params)
+    for row in cursor:
+        yield _event(row)
+
+
+# -----------------------------------------------------------------------------
+# Append-only audit store with group commit
+# -----------------------------------------------------------------------------
+class AuditStore:
+    """Durable audit log in a local SQLite database (WAL mode).
+
+    ``append`` only queues the event; a writer thread commits queued events in
+    batches so concurrent sessions share one transaction per batch. Reads flush
+    the queue first, so callers always see their own events. Pass
+    ``wait=True`` to return only once the event is committed, and with
+    synchronous=FULL a committed event survives a crash or power loss. If the
+    writer fails, appends and flushes raise AuditWriterError instead of
+    queueing events that would never be written.
+    """
+
+    def __init__(self, path: Path = AUDIT_DB, batch_size: int = 500, flush_interval: float = 0.05):
+        self.path = Path(path)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+
+        self._writer = connect(self.path)
+        self._writer.execute("PRAGMA synchronous=FULL")
+        self._writer.executescript(SCHEMA)
+        self._local = threading.local()
+
+        self._facet_lock = threading.Lock()
+        self._facet_high_water = 0
+        self._facets: dict[str, set[str]] = {"action": set(), "user": set(), "case_id": set()}
+
+        self._pending: list[tuple] = []
+        self._in_flight = 0
+        self._flush_requested = False
+        self._cond = threading.Condition()
+        self._closed = False
+        self._error: Optional[BaseException] = None
+        self._thread = threading.Thread(target=self._run, name="audit-writer", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    # -- writes ---------------------------------------------------------------
+    def append(self, event: dict, wait: bool = False) -> None:
+        self.append_many([event], wait=wait)
+
+    def append_many(self, events: Iterable[dict], wait: bool = False) -> None:
+        rows = [_row(event) for event in events]
+        with self._cond:
+            self._check_writer()
+            self._pending.extend(rows)
+            self._cond.notify_all()
+        if wait:
+            self.flush()
+
+    def _check_writer(self) -> None:
+        # Caller holds self._cond.
+        if self._error is not None or not self._thread.is_alive():
+            reason = repr(self._error) if self._error is not None else "store closed"
+            raise AuditWriterError(
+                f"Audit writer stopped ({reason}); {len(self._pending)} queued events were not written"
+            ) from self._error
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while not self._pending and not self._closed:
+                    self._cond.wait()
+                if not self._pending and self._closed:
+                    return
+                # Give concurrent appenders a moment to join this batch.
+                if len(self._pending) < self.batch_size and not (self._closed or self._flush_requested):
+                    self._cond.wait(self.flush_interval)
+                batch, self._pending = self._pending, []
+                self._flush_requested = False
+                self._in_flight = len(batch)
+            try:
+                with self._writer:
+                    self._writer.executemany(
+                        "INSERT INTO audit_events (ts, user, action, case_id, description) VALUES (?, ?, ?, ?, ?)",
+                        batch,
+                    )
+            except sqlite3.OperationalError:
+                # Typically a lock held by another process; keep the batch and retry.
+                with self._cond:
+                    self._pending[:0] = batch
+                    self._cond.wait(self.flush_interval)
+            except Exception as exc:
+                # Anything else will not go away on retry: keep the batch queued,
+                # record the error for appenders and stop the writer.
+                _log.exception("Audit writer stopped; %d events not written", len(batch))
+                with self._cond:
+                    self._pending[:0] = batch
+                    self._error = exc
+                return
+            finally:
+                with self._cond:
+                    self._in_flight = 0
+                    self._cond.notify_all()
+
+    def flush(self) -> None:
+        # Returns once everything queued so far is committed; raises if it never will be.
+        with self._cond:
+            if not (self._pending or self._in_flight):
+                return
+            self._check_writer()
+            self._flush_requested = True
+            self._cond.notify_all()
+            while (self._pending or self._in_flight) and self._thread.is_alive():
+                self._cond.wait(self.flush_interval)
+            if self._pending:
+                self._check_writer()
+
+    def close(self) -> None:
+        with self._cond:
+            if self._closed:
+                return
+            self._closed = True
+            self._cond.notify_all()
+        self._thread.join()
+
+    # -- reads ----------------------------------------------------------------
+    def _reader(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = connect(self.path)
+        return conn
+
+    def count(self) -> int:
+        self.flush()
+        return self._reader().execute("SELECT COUNT(*) FROM audit_events").fetchone()[0]
+
+    @timed("data")
+    def query(
+        self,
+        actions: Sequence[str] = (),
+        user: Optional[str] = None,
+        case_id: Optional[str] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        before: Optional[tuple[int, int]] = None,
+        limit: int = 50,
+    ) -> AuditPage:
+        # Newest first, keyset-paginated on (ts, id) so every page is an index range scan.
+        self.flush()
+        clauses, params = [], []
+        if actions:
+            clauses.append(f"action IN ({', '.join('?' * len(actions))})")
+            params.extend(actions)
+        if user:
+            clauses.append("user = ?")
+            params.append(user)
+        if case_id:
+            clauses.append("case_id = ?")
+            params.append(case_id)
+        if since:
+            clauses.append("ts >= ?")
+            params.append(int(since.timestamp()))
+        if until:
+            clauses.append("ts < ?")
+            params.append(int(until.timestamp()))
+        if before:
+            clauses.append("(ts, id) < (?, ?)")
+            params.extend(before)
+
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        rows = self._reader().execute(
+            f"SELECT id, ts, user, action, case_id, description FROM audit_events {where} "
+            "ORDER BY ts DESC, id DESC LIMIT ?",
+            (*params, limit + 1),
+        ).fetchall()
+
+        next_key = (rows[limit - 1][1], rows[limit - 1][0]) if len(rows) > limit else None
+        return AuditPage([_event(row[1:]) for row in rows[:limit]], next_key)
+
+    @timed("data")
+    def facets(self) -> dict[str, list[str]]:
+        # Distinct actions / users / cases, extended incrementally from the last seen id.
+        self.flush()
+        conn = self._reader()
+        with self._facet_lock:
+            high_water = conn.execute("SELECT MAX(id) FROM audit_events").fetchone()[0] or 0
+            if high_water > self._facet_high_water:
+                # First load walks the covering indexes; later loads only read new rows by id.
+                scan = "" if self._facet_high_water == 0 else "NOT INDEXED"
+                for column, values in self._facets.items():
+                    values.update(
+                        value
+                        for (value,) in conn.execute(
+                            f"SELECT DISTINCT {column} FROM audit_events {scan} WHERE id > ? AND id <= ?",
+                            (self._facet_high_water, high_water),
+                        )
+                    )
+                self._facet_high_water = high_water
+            return {column: sorted(values) for column, values in self._facets.items()}
@@ -0,0 +1,181 @@
+import argparse
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import replace
+from pathlib import Path
+from typing import Iterable, Iterator, Optional
+
+from alert_metrics import ALERT_STATUS_DB, CLOSED_STATUSES, AlertStatusStore
+from audit_store import AUDIT_DB, AuditStore
+from case_index import CaseIndex
+from data_store import DATA_DIR, CaseStore
+from draft_cache import DRAFT_CACHE_DIR, DraftCache, case_draft_key
+from draft_store import DRAFT_DB, DraftStore
+from narrative import TEMPLATE_TYPES, DraftResult, generate_case_draft, timestamp
+
+
+BATCH_USER = "batch.generator"
+BATCH_OUTPUT_DIR = Path(os.environ.get("SAR_BATCH_OUTPUT_DIR", Path(__file__).resolve().parent / "batch_output"))
+
+
+# -----------------------------------------------------------------------------
+# Worker process state
+# -----------------------------------------------------------------------------
+_store: Optional[CaseStore] = None
+_index: Optional[CaseIndex] = None
+_cache: Optional[DraftCache] = None
+
+
+def _init_worker(data_dir: str, cache_dir: Optional[str]) -> None:
+    # Each worker memory-maps the sources once and reuses them for every case.
+    global _store, _index, _cache
+    _store = CaseStore(Path(data_dir))
+    _index = CaseIndex.from_store(_store)
+    # Workers share drafts through the disk tier only; their memory tiers stay small.
+    _cache = DraftCache(maxsize=64, directory=Path(cache_dir)) if cache_dir else None
+
+
+def _generate(job: tuple[str, str]) -> DraftResult:
+    case_id, template_type = job
+    case = _index.case(case_id)
+    if case is None:
+        return DraftResult.failure(case_id, "", template_type, "Unknown Case ID.")
+    try:
+        if _cache is None:
+            return generate_case_draft(_store, case, template_type)
+        result, hit = _cache.get_or_create(
+            case_draft_key(_store, case, template_type), lambda: generate_case_draft(_store, case, template_type)
+        )
+        return replace(result, cached=hit)
+    except Exception as exc:  # one bad case must not sink the whole backlog
+        return DraftResult.failure(case_id, case["Alert ID"], template_type, repr(exc))
+
+
+# -----------------------------------------------------------------------------
+# Batch driver
+# -----------------------------------------------------------------------------
+def open_case_ids(store: CaseStore, statuses: Optional[AlertStatusStore] = None) -> list[str]:
+    # Open as the Dashboard counts it: status changes made in the app override the source file.
+    alerts = store.alerts_frame()
+    status = alerts["Status"]
+    if statuses is not None:
+        overrides = {alert_id: override for alert_id, (override, _) in statuses.all().items()}
+        status = alerts["Alert ID"].map(overrides).fillna(status)
+    return alerts.loc[~status.isin(CLOSED_STATUSES), "Case ID"].tolist()
+
+
+def generate_batch(
+    case_ids: Iterable[str],
+    template_type: str = "Other",
+    data_dir: Path = DATA_DIR,
+    workers: Optional[int] = None,
+    chunk_size: int = 64,
+    cache_dir: Optional[Path] = None,
+) -> Iterator[DraftResult]:
+    # With a cache_dir, cases whose evidence and template are unchanged reuse their last draft.
+    jobs = ((case_id, template_type) for case_id in case_ids)
+    initargs = (str(data_dir), str(cache_dir) if cache_dir else None)
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=initargs) as pool:
+        yield from pool.map(_generate, jobs, chunksize=chunk_size)
+
+
+def audit_event(result: DraftResult, version: int = 0) -> dict:
+    if result.error:
+        action, description = "Narrative generation failed", result.error
+    else:
+        action = "Narrative generated"
+        source = f"reused from cache (generated {result.generated_at})" if result.cached else "generated"
+        description = f"Batch draft {source} from {result.tx_count} transactions ({result.template_type})."
+        if version:
+            description += f" Saved as v{version}."
+    # Stamped when written: a cached draft keeps its original generated_at, which must not backdate the trail.
+    return {
+        "Timestamp": timestamp(),
+        "User": BATCH_USER,
+        "Action": action,
+        "Case ID": result.case_id,
+        "Description": description,
+    }
+
+
+def save_draft(store: DraftStore, result: DraftResult) -> int:
+    # Saved on top of the case's history so the app lists it; an unchanged draft keeps its version.
+    latest = store.latest_version(result.case_id)
+    if latest and store.text(result.case_id, latest) == result.narrative:
+        return latest
+    return store.save(result.case_id, result.narrative, BATCH_USER)
+
+
+def write_results(
+    results: Iterable[DraftResult],
+    out_dir: Path,
+    audit: AuditStore,
+    drafts_store: Optional[DraftStore] = None,
+    flush_every: int = 500,
+) -> tuple[int, int, int]:
+    # Drafts and audit events are buffered and appended in bulk, never held in full.
+    out_dir.mkdir(parents=True, exist_ok=True)
+    generated = failed = reused = 0
+    drafts: list[str] = []
+    events: list[dict] = []
+    with open(out_dir / "drafts.jsonl", "a", encoding="utf-8") as draft_file:
+
+        def flush() -> None:
+            draft_file.writelines(drafts)
+            audit.append_many(events)
+            drafts.clear()
+            events.clear()
+
+        for result in results:
+            version = 0
+            if result.error:
+                failed += 1
+            else:
+                generated += 1
+                reused += result.cached
+                drafts.append(json.dumps(result.to_dict()) + "\n")
+                if drafts_store is not None:
+                    version = save_draft(drafts_store, result)
+            events.append(audit_event(result, version))
+            if len(events) >= flush_every:
+                flush()
+        flush()
+    audit.flush()
+    return generated, failed, reused
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Generate SAR narrative drafts for a queue of cases.")
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument("--cases", nargs="+", metavar="CASE_ID", help="Case IDs to generate drafts for.")
+    target.add_argument("--all-open", action="store_true", help="Generate drafts for every open alert (not Closed or SAR Filed).")
+    parser.add_argument("--template", default="Other", choices=TEMPLATE_TYPES, help="SAR template type.")
+    parser.add_argument("--data-dir", type=Path, default=DATA_DIR, help="Folder holding alerts/customers/transactions.")
+    parser.add_argument("--out", type=Path, default=BATCH_OUTPUT_DIR, help="Folder for drafts.jsonl.")
+    parser.add_argument("--draft-db", type=Path, default=DRAFT_DB, help="Draft store the drafts are saved to.")
+    parser.add_argument("--status-db", type=Path, default=ALERT_STATUS_DB, help="Alert status changes made in the app.")
+    parser.add_argument("--audit-db", type=Path, default=AUDIT_DB, help="Audit store the generation events are appended to.")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="Worker processes.")
+    parser.add_argument("--chunk-size", type=int, default=64, help="Cases handed to a worker at a time.")
+    parser.add_argument("--cache-dir", type=Path, default=DRAFT_CACHE_DIR, help="Draft cache shared across runs.")
+    parser.add_argument("--no-cache", action="store_true", help="Regenerate every draft.")
+    args = parser.parse_args(argv)
+
+    if args.cases:
+        case_ids = args.cases
+    else:
+        statuses = AlertStatusStore(args.status_db)
+        case_ids = open_case_ids(CaseStore(args.data_dir), statuses)
+        statuses.close()
+    cache_dir = None if args.no_cache else args.cache_dir
+    results = generate_batch(case_ids, args.template, args.data_dir, args.workers, args.chunk_size, cache_dir)
+    generated, failed, reused = write_results(results, args.out, AuditStore(args.audit_db), DraftStore(args.draft_db))
+    print(
+        f"Generated {generated} drafts ({reused} reused from cache, {failed} failed) "
+        f"for {len(case_ids)} cases into {args.out}."
+    )
+
+
+if __name__ == "__main__":
+    main()
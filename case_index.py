@@ -0,0 +1,126 @@
+import math
+import threading
+from typing import NamedTuple, Optional
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+from cachetools import LRUCache
+
+from data_store import CaseStore
+from instrumentation import timed
+
+
+ALERT_VIEW_COLUMNS = ["Alert ID", "Customer Name", "Risk Level", "Alert Date", "Status", "Suspicious Amount"]
+# Recent alert searches keep their matching row numbers, so paging through
+# the results does not rescan the labels.
+SEARCH_CACHE_SIZE = 32
+
+
+class AlertPage(NamedTuple):
+    rows: pd.DataFrame
+    labels: list[str]
+    total: int
+    page: int
+    page_count: int
+
+
+# -----------------------------------------------------------------------------
+# Hash index over alerts and customers
+# -----------------------------------------------------------------------------
+def _positions(table: pa.Table, column: str) -> dict[str, int]:
+    # First occurrence wins so the index stays stable if a source repeats a key.
+    positions: dict[str, int] = {}
+    for pos, key in enumerate(table.column(column).to_pylist()):
+        positions.setdefault(key, pos)
+    return positions
+
+
+class CaseIndex:
+    """O(1) lookup of alert, case and customer records by their unique IDs."""
+
+    def __init__(self, alerts: pa.Table, customers: pa.Table, version: str = ""):
+        self.version = version
+        self._alerts = alerts
+        self._customers = customers
+        self._by_alert_id = _positions(alerts, "Alert ID")
+        self._by_case_id = _positions(alerts, "Case ID")
+        self._by_customer_id = _positions(customers, "Customer ID")
+        self._alert_labels: Optional[pa.Array] = None
+        self._searches: LRUCache = LRUCache(maxsize=SEARCH_CACHE_SIZE)
+        self._search_lock = threading.Lock()
+
+    @classmethod
+    def from_store(cls, store: CaseStore) -> "CaseIndex":
+        return cls(store.alert_table(), store.customer_table(), store.version)
+
+    @staticmethod
+    def _record(table: pa.Table, pos: Optional[int]) -> Optional[dict]:
+        if pos is None:
+            return None
+        return table.slice(pos, 1).to_pylist()[0]
+
+    def alert(self, alert_id: str) -> Optional[dict]:
+        return self._record(self._alerts, self._by_alert_id.get(alert_id))
+
+    def case(self, case_id: str) -> Optional[dict]:
+        return self._record(self._alerts, self._by_case_id.get(case_id))
+
+    def customer(self, customer_id: str) -> Optional[dict]:
+        return self._record(self._customers, self._by_customer_id.get(customer_id))
+
+    def alert_position(self, alert_id: str) -> int:
+        # Row of the alert in alert_ids() and unfiltered alert pages; 0 when unknown.
+        return self._by_alert_id.get(alert_id, 0)
+
+    def alert_ids(self) -> list[str]:
+        return list(self._by_alert_id)
+
+    @staticmethod
+    def _labels(alerts: pa.Table) -> pa.Array:
+        # "ALT-1024 | CASE-3401 | Sophia Williams"
+        return pc.binary_join_element_wise(
+            alerts.column("Alert ID"), alerts.column("Case ID"), alerts.column("Customer Name"), " | "
+        ).combine_chunks()
+
+    def alert_label(self, alert_id: str) -> Optional[str]:
+        pos = self._by_alert_id.get(alert_id)
+        return None if pos is None else self._labels(self._alerts.slice(pos, 1))[0].as_py()
+
+    def _matches(self, search: str) -> pa.Array:
+        # Row numbers of alerts whose label contains ``search``, ignoring case.
+        key = search.lower()
+        with self._search_lock:
+            rows = self._searches.get(key)
+        if rows is None:
+            if self._alert_labels is None:
+                self._alert_labels = self._labels(self._alerts)
+            rows = pc.indices_nonzero(pc.match_substring(self._alert_labels, search, ignore_case=True))
+            with self._search_lock:
+                self._searches[key] = rows
+        return rows
+
+    @timed("data")
+    def alert_page(self, page: int = 0, page_size: int = 100, search: str = "") -> AlertPage:
+        """One page of alerts, optionally only those whose label contains ``search``.
+
+        Only the page's rows are converted for display, so the cost does not
+        grow with the number of alerts.
+        """
+        rows = self._matches(search) if search else None
+        total = len(rows) if rows is not None else self._alerts.num_rows
+        page_count = max(1, math.ceil(total / page_size))
+        page = min(max(page, 0), page_count - 1)
+        if rows is None:
+            table = self._alerts.slice(page * page_size, page_size)
+        else:
+            table = self._alerts.take(rows.slice(page * page_size, page_size))
+        labels = self._labels(table).to_pylist()
+        return AlertPage(table.select(ALERT_VIEW_COLUMNS).to_pandas(), labels, total, page, page_count)
+
+    @staticmethod
+    def alert_id_from_label(label: str) -> str:
+        return label.split(" | ", 1)[0]
+
+    def __len__(self) -> int:
+        return len(self._by_alert_id)
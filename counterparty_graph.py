@@ -0,0 +1,417 @@
+import os
+import threading
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+from typing import Iterable, NamedTuple, Optional
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from data_store import CaseStore
+from instrumentation import timed
+
+
+NETWORK_WINDOW_DAYS = int(os.environ.get("SAR_NETWORK_WINDOW_DAYS", "90"))
+# Funds must move on within this many days to count as the next hop of a flow.
+MAX_HOP_GAP_DAYS = 7
+# A hop may pass on between this share and slightly more than the amount received.
+MIN_RETAINED = 0.5
+MAX_GROWTH = 1.05
+# Flows starting below this amount are everyday spending, not layering.
+MIN_FLOW_AMOUNT = 1_000.0
+# Nodes with more edges than this (merchants, payroll, cash) end a path instead of fanning it out.
+HUB_DEGREE = 1000
+# Edges visited per walk; bounds query time on dense neighbourhoods.
+WALK_BUDGET = 50_000
+# Edges appended since the last compaction are scanned linearly until they exceed this.
+COMPACT_MIN_EDGES = 100_000
+COMPACT_RATIO = 0.125
+
+_EPOCH = date(1970, 1, 1)
+
+
+class _Growable:
+    """Append-only numpy array with amortised doubling."""
+
+    def __init__(self, dtype, capacity: int = 1024):
+        self._data = np.empty(capacity, dtype=dtype)
+        self.size = 0
+
+    def extend(self, values: np.ndarray) -> None:
+        needed = self.size + len(values)
+        if needed > len(self._data):
+            grown = np.empty(max(needed, 2 * len(self._data)), dtype=self._data.dtype)
+            grown[: self.size] = self._data[: self.size]
+            self._data = grown
+        self._data[self.size : needed] = values
+        self.size = needed
+
+    @property
+    def view(self) -> np.ndarray:
+        return self._data[: self.size]
+
+
+class _Csr(NamedTuple):
+    # Edges grouped by node and sorted by day within each node.
+    offsets: np.ndarray
+    order: np.ndarray
+    day: np.ndarray
+
+    @classmethod
+    def build(cls, nodes: np.ndarray, day: np.ndarray, n_nodes: int) -> "_Csr":
+        # One argsort over a packed (node, day) key is several times faster than lexsort.
+        key = (nodes.astype(np.int64) << 32) | (day.astype(np.int64) - int(day.min(initial=0))) if len(day) else nodes
+        order = np.argsort(key).astype(np.int64)
+        offsets = np.searchsorted(nodes[order], np.arange(n_nodes + 1)).astype(np.int64)
+        return cls(offsets, order, day[order])
+
+    @classmethod
+    def empty(cls) -> "_Csr":
+        return cls(np.zeros(1, np.int64), np.zeros(0, np.int64), np.zeros(0, np.int32))
+
+
+class _Edges(NamedTuple):
+    src: np.ndarray
+    dst: np.ndarray
+    day: np.ndarray
+    amount: np.ndarray
+    outbound: np.ndarray
+    compacted: int
+    out: _Csr
+    inn: _Csr
+
+
+# -----------------------------------------------------------------------------
+# Query results
+# -----------------------------------------------------------------------------
+class FlowPath(NamedTuple):
+    nodes: tuple[str, ...]
+    amounts: tuple[float, ...]
+    first_date: date
+    last_date: date
+    # (src, dst, day, amount) per hop, used to map hops back to transactions.
+    hops: tuple[tuple[str, str, date, float], ...]
+
+    @property
+    def retained(self) -> float:
+        return self.amounts[-1] / self.amounts[0] if self.amounts[0] else 0.0
+
+    def describe(self) -> str:
+        days = (self.last_date - self.first_date).days
+        return (
+            f"{' -> '.join(self.nodes)} (${self.amounts[0]:,.0f} to ${self.amounts[-1]:,.0f}, "
+            f"{len(self.hops)} hops over {days} day{'s' if days != 1 else ''})"
+        )
+
+
+@dataclass
+class NetworkSummary:
+    customer_id: str
+    window_start: date
+    window_end: date
+    fan_in: int = 0
+    fan_out: int = 0
+    inbound_amount: float = 0.0
+    outbound_amount: float = 0.0
+    top_sources: dict[str, float] = field(default_factory=dict)
+    top_destinations: dict[str, float] = field(default_factory=dict)
+    inbound_paths: list[FlowPath] = field(default_factory=list)
+    outbound_paths: list[FlowPath] = field(default_factory=list)
+    cycles: list[FlowPath] = field(default_factory=list)
+    # The customer's own transactions on any path or cycle, by transaction ID.
+    flow_transactions: dict[str, str] = field(default_factory=dict)
+
+    @property
+    def paths(self) -> list[FlowPath]:
+        return self.inbound_paths + self.outbound_paths
+
+    @property
+    def longest_path(self) -> Optional[FlowPath]:
+        candidates = self.paths + self.cycles
+        return max(candidates, key=lambda p: (len(p.hops), p.amounts[0])) if candidates else None
+
+
+# -----------------------------------------------------------------------------
+# Graph
+# -----------------------------------------------------------------------------
+class CounterpartyGraph:
+    """Directed money-flow graph over customers and counterparties.
+
+    Every transaction is one edge from payer to payee, stored in insertion
+    order in growable arrays. A compacted CSR index (by source and by
+    destination, each sorted by day) covers all edges up to the last
+    compaction; newer edges are scanned directly until they are numerous
+    enough to fold into the index. A counterparty that is itself a customer
+    ID links the two customers' activity.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._node_ids: dict[str, int] = {}
+        self.names: list[str] = []
+        self._src = _Growable(np.int32)
+        self._dst = _Growable(np.int32)
+        self._day = _Growable(np.int32)
+        self._amount = _Growable(np.float64)
+        self._outbound = _Growable(np.bool_)
+        self._txn_chunks: list[pa.Array] = []
+        self._compacted = 0
+        self._out = _Csr.empty()
+        self._in = _Csr.empty()
+
+    def __len__(self) -> int:
+        return self._src.size
+
+    @property
+    def node_count(self) -> int:
+        return len(self.names)
+
+    # -- ingest ---------------------------------------------------------------
+    def _encode(self, names: pa.Array) -> np.ndarray:
+        # Only the distinct names in a batch go through the Python dict.
+        uniques = pc.unique(names)
+        ids = np.empty(len(uniques), dtype=np.int32)
+        for i, name in enumerate(uniques.to_pylist()):
+            node = self._node_ids.get(name)
+            if node is None:
+                node = self._node_ids[name] = len(self.names)
+                self.names.append(name)
+            ids[i] = node
+        return ids[pc.index_in(names, value_set=uniques).to_numpy(zero_copy_only=False)]
+
+    def add_transactions(self, batch, compact: bool = True) -> None:
+        # Outbound: customer -> counterparty. Inbound: counterparty -> customer.
+        if batch.num_rows == 0:
+            return
+        if isinstance(batch, pa.Table):
+            batch = batch.combine_chunks().to_batches()[0]
+        outbound = pc.equal(batch.column("Direction"), "Outbound").to_numpy(zero_copy_only=False)
+        days = batch.column("Date").cast(pa.int32()).to_numpy(zero_copy_only=False)
+        amount = batch.column("Amount").to_numpy(zero_copy_only=False)
+
+        with self._lock:
+            customer_ids = self._encode(batch.column("Customer ID"))
+            counterparty_ids = self._encode(batch.column("Counterparty"))
+            self._src.extend(np.where(outbound, customer_ids, counterparty_ids))
+            self._dst.extend(np.where(outbound, counterparty_ids, customer_ids))
+            self._day.extend(days)
+            self._amount.extend(amount)
+            self._outbound.extend(outbound)
+            self._txn_chunks.append(batch.column("Transaction ID"))
+            if compact and len(self) - self._compacted > max(COMPACT_MIN_EDGES, int(self._compacted * COMPACT_RATIO)):
+                self.compact()
+
+    def compact(self) -> None:
+        with self._lock:
+            if self._compacted == len(self):
+                return
+            src, dst, day = self._src.view, self._dst.view, self._day.view
+            self._out = _Csr.build(src, day, self.node_count)
+            self._in = _Csr.build(dst, day, self.node_count)
+            self._compacted = len(self)
+            if len(self._txn_chunks) > 1:
+                self._txn_chunks = [pa.concat_arrays(self._txn_chunks)]
+
+    @classmethod
+    @timed("data")
+    def from_store(cls, store: CaseStore, batch_size: int = 1 << 20) -> "CounterpartyGraph":
+        graph = cls()
+        columns = ["Transaction ID", "Customer ID", "Date", "Amount", "Direction", "Counterparty"]
+        # Partitioned files yield many small batches; encode them in batch_size groups.
+        pending, rows = [], 0
+        for batch in store.transactions.to_batches(columns=columns, batch_size=batch_size):
+            pending.append(batch)
+            rows += batch.num_rows
+            if rows >= batch_size:
+                graph.add_transactions(pa.Table.from_batches(pending), compact=False)
+                pending, rows = [], 0
+        if pending:
+            graph.add_transactions(pa.Table.from_batches(pending), compact=False)
+        graph.compact()  # once, instead of at every growth step
+        return graph
+
+    # -- edge access ----------------------------------------------------------
+    def _snapshot(self) -> _Edges:
+        with self._lock:
+            return _Edges(
+                self._src.view,
+                self._dst.view,
+                self._day.view,
+                self._amount.view,
+                self._outbound.view,
+                self._compacted,
+                self._out,
+                self._in,
+            )
+
+    @staticmethod
+    def _adjacent(edges: _Edges, node: int, outgoing: bool, lo: int, hi: int) -> np.ndarray:
+        # Edge indices touching `node` on the given side with lo <= day <= hi, sorted by day.
+        csr, keys = (edges.out, edges.src) if outgoing else (edges.inn, edges.dst)
+        found = []
+        if node + 1 < len(csr.offsets):
+            start, end = csr.offsets[node], csr.offsets[node + 1]
+            days = csr.day[start:end]
+            found.append(csr.order[start + np.searchsorted(days, lo, "left") : start + np.searchsorted(days, hi, "right")])
+        tail = slice(edges.compacted, len(edges.src))
+        if tail.start < tail.stop:
+            mask = (keys[tail] == node) & (edges.day[tail] >= lo) & (edges.day[tail] <= hi)
+            found.append(np.flatnonzero(mask) + edges.compacted)
+        if not found:
+            return np.zeros(0, np.int64)
+        result = np.concatenate(found) if len(found) > 1 else found[0]
+        return result[np.argsort(edges.day[result], kind="stable")] if len(found) > 1 else result
+
+    def _degree(self, edges: _Edges, node: int, outgoing: bool) -> int:
+        csr = edges.out if outgoing else edges.inn
+        return int(csr.offsets[node + 1] - csr.offsets[node]) if node + 1 < len(csr.offsets) else 0
+
+    def transaction_ids(self, edge_indices: Iterable[int]) -> list[str]:
+        with self._lock:
+            ids = pa.chunked_array(self._txn_chunks, pa.string())
+        return ids.take(pa.array(list(edge_indices), pa.int64())).to_pylist()
+
+    # -- queries --------------------------------------------------------------
+    def _walk(self, edges: _Edges, start: int, outgoing: bool, lo: int, hi: int, max_hops: int, limit: int) -> tuple[list, list]:
+        """Temporal flow walks from `start`.
+
+        Outgoing walks follow money forward in time; incoming walks follow it
+        backward to where it came from. A hop must happen within
+        MAX_HOP_GAP_DAYS of the previous one and carry on most of its amount.
+        Returns (paths, cycles) as lists of edge-index tuples in flow order.
+        """
+        paths, cycles = [], []
+        budget = WALK_BUDGET
+        forward_nodes = edges.dst if outgoing else edges.src
+
+        def extend(node: int, trail: list[int], visited: set[int]) -> None:
+            nonlocal budget
+            last = trail[-1]
+            day, amount = int(edges.day[last]), float(edges.amount[last])
+            window = (day, min(hi, day + MAX_HOP_GAP_DAYS)) if outgoing else (max(lo, day - MAX_HOP_GAP_DAYS), day)
+            seen = set()
+            extended = False
+            for edge in self._adjacent(edges, node, outgoing, *window):
+                budget -= 1
+                if budget <= 0 or len(paths) >= limit:
+                    return
+                nxt = int(forward_nodes[edge])
+                hop_amount = float(edges.amount[edge])
+                # Share of the earlier hop's amount carried on by the later one.
+                earlier, later = (amount, hop_amount) if outgoing else (hop_amount, amount)
+                if earlier <= 0 or not (MIN_RETAINED <= later / earlier <= MAX_GROWTH):
+                    continue
+                # A transfer between two customers appears once on each side; follow it once.
+                key = (nxt, int(edges.day[edge]), round(hop_amount, 2))
+                if key in seen:
+                    continue
+                seen.add(key)
+                if nxt == start:
+                    cycles.append(tuple(trail + [edge]))
+                    extended = True
+                    continue
+                if nxt in visited:
+                    continue
+                extended = True
+                if len(trail) + 1 >= max_hops or self._degree(edges, nxt, outgoing) > HUB_DEGREE:
+                    paths.append(tuple(trail + [edge]))
+                    continue
+                extend(nxt, trail + [edge], visited | {nxt})
+            if not extended and len(trail) >= 2:
+                paths.append(tuple(trail))
+
+        for first in self._adjacent(edges, start, outgoing, lo, hi):
+            if budget <= 0 or len(paths) >= limit:
+                break
+            if edges.amount[first] < MIN_FLOW_AMOUNT:
+                continue
+            nxt = int(forward_nodes[first])
+            if self._degree(edges, nxt, outgoing) <= HUB_DEGREE:
+                extend(nxt, [int(first)], {start, nxt})
+        return paths, cycles
+
+    def _flow_path(self, edges: _Edges, trail: tuple, outgoing: bool) -> FlowPath:
+        ordered = trail if outgoing else tuple(reversed(trail))
+        hops = tuple(
+            (
+                self.names[edges.src[e]],
+                self.names[edges.dst[e]],
+                _EPOCH + timedelta(days=int(edges.day[e])),
+                float(edges.amount[e]),
+            )
+            for e in ordered
+        )
+        nodes = (hops[0][0], *(hop[1] for hop in hops))
+        return FlowPath(nodes, tuple(hop[3] for hop in hops), hops[0][2], hops[-1][2], hops)
+
+    @timed("aggregate")
+    def analyze(
+        self,
+        customer_id: str,
+        window_end: date,
+        window_days: int = NETWORK_WINDOW_DAYS,
+        max_hops: int = 5,
+        max_paths: int = 20,
+        top: int = 5,
+    ) -> NetworkSummary:
+        window_start = window_end - timedelta(days=window_days)
+        summary = NetworkSummary(customer_id, window_start, window_end)
+        node = self._node_ids.get(customer_id)
+        if node is None:
+            return summary
+        edges = self._snapshot()
+        lo, hi = (window_start - _EPOCH).days, (window_end - _EPOCH).days
+
+        incoming = self._adjacent(edges, node, False, lo, hi)
+        outgoing = self._adjacent(edges, node, True, lo, hi)
+        for indices, by, target, side in (
+            (incoming, edges.src, summary.top_sources, "in"),
+            (outgoing, edges.dst, summary.top_destinations, "out"),
+        ):
+            if not len(indices):
+                continue
+            others, inverse = np.unique(by[indices], return_inverse=True)
+            totals = np.bincount(inverse, weights=edges.amount[indices])
+            for i in np.argsort(-totals)[:top]:
+                target[self.names[others[i]]] = float(totals[i])
+            if side == "in":
+                summary.fan_in, summary.inbound_amount = len(others), float(totals.sum())
+            else:
+                summary.fan_out, summary.outbound_amount = len(others), float(totals.sum())
+
+        own_edges = set()
+        cycles_by_hops: dict[tuple, FlowPath] = {}
+        for outgoing_walk in (False, True):
+            paths, cycles = self._walk(edges, node, outgoing_walk, lo, hi, max_hops, max_paths)
+            found = [self._flow_path(edges, trail, outgoing_walk) for trail in paths]
+            found.sort(key=lambda p: (len(p.hops), p.amounts[0]), reverse=True)
+            if outgoing_walk:
+                summary.outbound_paths = found[:max_paths]
+            else:
+                summary.inbound_paths = found[:max_paths]
+            # Either walk can close a loop, often the same one through the other
+            # side of a mirrored transfer; each loop is reported once.
+            for trail in cycles:
+                cycle = self._flow_path(edges, trail, outgoing_walk)
+                cycles_by_hops.setdefault(tuple((a, b, d, round(x, 2)) for a, b, d, x in cycle.hops), cycle)
+            for trail in paths + cycles:
+                own_edges.update(e for e in trail if edges.src[e] == node or edges.dst[e] == node)
+        summary.cycles = list(cycles_by_hops.values())[:max_paths]
+
+        # Map hops on mirrored customer-to-customer transfers to the side this customer owns.
+        owned = np.concatenate([outgoing[edges.outbound[outgoing]], incoming[~edges.outbound[incoming]]])
+        owned_key = {
+            (int(edges.src[e]), int(edges.dst[e]), int(edges.day[e]), round(float(edges.amount[e]), 2)): int(e)
+            for e in owned
+        }
+        picked = {
+            owned_key[key]
+            for e in own_edges
+            if (key := (int(edges.src[e]), int(edges.dst[e]), int(edges.day[e]), round(float(edges.amount[e]), 2)))
+            in owned_key
+        }
+        picked = sorted(picked)
+        reasons = ["Rapid Movement" if edges.outbound[e] else "Layering" for e in picked]
+        summary.flow_transactions = dict(zip(self.transaction_ids(picked), reasons))
+        return summary
@@ -0,0 +1,310 @@
+import hashlib
+import math
+import os
+import threading
+import zlib
+from pathlib import Path
+from typing import Iterable, NamedTuple, Optional
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+import pyarrow.fs as pafs
+from cachetools import LRUCache
+
+from instrumentation import timed
+
+
+# -----------------------------------------------------------------------------
+# Locations and schemas
+# -----------------------------------------------------------------------------
+DATA_DIR = Path(os.environ.get("SAR_DATA_DIR", Path(__file__).resolve().parent / "data"))
+
+SOURCE_FORMATS = {
+    ".parquet": "parquet",
+    ".arrow": "ipc",
+    ".feather": "ipc",
+}
+
+ALERT_SCHEMA = pa.schema(
+    [
+        ("Alert ID", pa.string()),
+        ("Case ID", pa.string()),
+        ("Customer ID", pa.string()),
+        ("Customer Name", pa.string()),
+        ("Risk Level", pa.string()),
+        ("Alert Date", pa.date32()),
+        ("Status", pa.string()),
+        ("Suspicious Amount", pa.float64()),
+        ("Assigned Officer", pa.string()),
+    ]
+)
+
+CUSTOMER_SCHEMA = pa.schema(
+    [
+        ("Customer Name", pa.string()),
+        ("Customer ID", pa.string()),
+        ("Risk Rating", pa.string()),
+        ("Occupation", pa.string()),
+        ("Nationality", pa.string()),
+        ("Date of Birth", pa.string()),
+        ("PEP", pa.string()),
+        ("Sanctions Screening", pa.string()),
+        ("Monitoring Plan", pa.string()),
+    ]
+)
+
+TRANSACTION_SCHEMA = pa.schema(
+    [
+        ("Transaction ID", pa.string()),
+        ("Customer ID", pa.string()),
+        ("Date", pa.date32()),
+        ("Amount", pa.float64()),
+        ("Direction", pa.string()),
+        ("Counterparty", pa.string()),
+        ("Country", pa.string()),
+        ("Risk Flag", pa.string()),
+    ]
+)
+
+# Alert sources without an Assigned Officer column are all assigned here.
+DEFAULT_OFFICER = os.environ.get("SAR_DEFAULT_OFFICER", "Mariam Khan")
+
+TRANSACTION_VIEW_COLUMNS = ["Transaction ID", "Date", "Amount", "Direction", "Counterparty", "Country", "Risk Flag"]
+
+# Transactions may be hive-partitioned as transactions/bucket=NN/ with
+# NN = customer_bucket(Customer ID); scans then only touch one bucket per customer.
+TRANSACTION_BUCKETS = int(os.environ.get("SAR_TRANSACTION_BUCKETS", "64"))
+PARTITION_CACHE_BYTES = int(os.environ.get("SAR_PARTITION_CACHE_MB", "256")) * 1024 * 1024
+
+
+# -----------------------------------------------------------------------------
+# Placeholder datasets used when no files are present in DATA_DIR
+# -----------------------------------------------------------------------------
+SEED_ALERTS = [
+    ["ALT-1024", "CASE-3401", "CUST-00981", "Sophia Williams", "High", "2026-02-12", "Open", 185000.00, "Mariam Khan"],
+    ["ALT-1025", "CASE-3402", "CUST-01005", "Liam Johnson", "Medium", "2026-02-12", "Investigating", 94500.00, "Mariam Khan"],
+    ["ALT-1026", "CASE-3403", "CUST-01088", "Olivia Brown", "High", "2026-02-11", "Open", 250000.00, "Mariam Khan"],
+    ["ALT-1027", "CASE-3398", "CUST-01120", "Noah Davis", "Low", "2026-02-10", "Closed", 12000.00, "Mariam Khan"],
+    ["ALT-1028", "CASE-3404", "CUST-01241", "Emma Wilson", "Medium", "2026-02-09", "Pending", 68000.00, "Mariam Khan"],
+]
+
+SEED_CUSTOMERS = [
+    ["Sophia Williams", "CUST-00981", "High", "Import/Export Director", "United Kingdom", "1987-06-14", "No", "No Match", "Enhanced Monitoring"],
+    ["Liam Johnson", "CUST-01005", "Medium", "IT Consultant", "Ireland", "1990-09-21", "No", "No Match", "Periodic Review"],
+    ["Olivia Brown", "CUST-01088", "High", "Logistics Owner", "UAE", "1985-01-03", "No", "No Match", "Enhanced Monitoring"],
+    ["Noah Davis", "CUST-01120", "Low", "Retail Manager", "United States", "1992-03-19", "No", "No Match", "Standard Monitoring"],
+    ["Emma Wilson", "CUST-01241", "Medium", "Property Broker", "Canada", "1988-11-05", "No", "No Match", "Periodic Review"],
+]
+
+SEED_TRANSACTIONS = [
+    ["TXN-7781", "CUST-00981", "2026-02-10", 85000.00, "Outbound", "Blue Harbor Trading", "SG", "High"],
+    ["TXN-7782", "CUST-00981", "2026-02-10", 60000.00, "Inbound", "Sterling Commodities", "AE", "Medium"],
+    ["TXN-7783", "CUST-00981", "2026-02-11", 40000.00, "Outbound", "Northline Brokers", "TR", "High"],
+    ["TXN-7784", "CUST-01241", "2026-02-12", 12000.00, "Inbound", "Atlas Supplies", "GB", "Low"],
+    ["TXN-7785", "CUST-00981", "2026-02-12", 95000.00, "Outbound", "Redwood Logistics", "CY", "High"],
+    ["TXN-7786", "CUST-01088", "2026-02-13", 31000.00, "Outbound", "Falcon Imports", "HK", "Medium"],
+]
+
+
+def _seed_table(rows: list, schema: pa.Schema) -> pa.Table:
+    arrays = [
+        pa.array(values, pa.string()).cast(field.type) if pa.types.is_date(field.type) else pa.array(values, field.type)
+        for field, values in zip(schema, zip(*rows))
+    ]
+    return pa.Table.from_arrays(arrays, schema=schema)
+
+
+# -----------------------------------------------------------------------------
+# Source discovery and versioning
+# -----------------------------------------------------------------------------
+def _locate(data_dir: Path, name: str) -> Optional[tuple[Path, str]]:
+    for suffix, fmt in SOURCE_FORMATS.items():
+        path = data_dir / f"{name}{suffix}"
+        if path.is_file():
+            return path, fmt
+
+    path = data_dir / name
+    if path.is_dir():
+        for suffix, fmt in SOURCE_FORMATS.items():
+            if next(path.rglob(f"*{suffix}"), None) is not None:
+                return path, fmt
+    return None
+
+
+def data_version(data_dir: Path = DATA_DIR) -> str:
+    digest = hashlib.sha1()
+    data_dir = Path(data_dir)
+    if data_dir.is_dir():
+        for path in sorted(data_dir.rglob("*")):
+            if path.is_file() and path.suffix in SOURCE_FORMATS:
+                stat = path.stat()
+                digest.update(f"{path.relative_to(data_dir)}:{stat.st_size}:{stat.st_mtime_ns}".encode())
+    return digest.hexdigest()[:12]
+
+
+def isin(column: str, values: Iterable) -> ds.Expression:
+    return ds.field(column).isin(pa.array(list(values), pa.string()))
+
+
+def customer_bucket(customer_id: str, buckets: int = TRANSACTION_BUCKETS) -> int:
+    return zlib.crc32(customer_id.encode()) % buckets
+
+
+def transaction_filter(
+    directions: Optional[Iterable[str]] = None,
+    risk_flags: Optional[Iterable[str]] = None,
+    min_amount: Optional[float] = None,
+    counterparty: Optional[str] = None,
+    min_score: Optional[int] = None,
+) -> Optional[ds.Expression]:
+    clauses = []
+    if directions:
+        clauses.append(isin("Direction", directions))
+    if risk_flags:
+        clauses.append(isin("Risk Flag", risk_flags))
+    if min_amount:
+        clauses.append(ds.field("Amount") >= float(min_amount))
+    if counterparty:
+        clauses.append(pc.match_substring(ds.field("Counterparty"), counterparty, ignore_case=True))
+    if min_score:
+        # Only valid on tables scored by rules_engine.score_transactions.
+        clauses.append(ds.field("Score") >= int(min_score))
+    if not clauses:
+        return None
+    flt = clauses[0]
+    for clause in clauses[1:]:
+        flt = flt & clause
+    return flt
+
+
+class TransactionPage(NamedTuple):
+    rows: pd.DataFrame
+    total: int
+    page: int
+    page_count: int
+
+
+# -----------------------------------------------------------------------------
+# Columnar case store
+# -----------------------------------------------------------------------------
+class CaseStore:
+    """Read-only alerts / KYC / transactions store over memory-mapped Arrow data.
+
+    Files are looked up in ``data_dir`` as ``<name>.parquet``, ``<name>.arrow``
+    or ``<name>.feather``, or as a (optionally hive-partitioned) directory of
+    such files. Missing sources fall back to the built-in placeholder rows.
+    """
+
+    def __init__(self, data_dir: Path = DATA_DIR):
+        self.data_dir = Path(data_dir)
+        self.version = data_version(self.data_dir)
+        self._filesystem = pafs.LocalFileSystem(use_mmap=True)
+        self._lock = threading.Lock()
+        self._alerts_frame: Optional[pd.DataFrame] = None
+        self._partitions: LRUCache = LRUCache(maxsize=PARTITION_CACHE_BYTES, getsizeof=lambda table: max(table.nbytes, 1))
+
+        self.alerts = self._open("alerts", ALERT_SCHEMA, SEED_ALERTS)
+        self.customers = self._open("customers", CUSTOMER_SCHEMA, SEED_CUSTOMERS)
+        self.transactions = self._open("transactions", TRANSACTION_SCHEMA, SEED_TRANSACTIONS)
+
+    def _open(self, name: str, schema: pa.Schema, seed_rows: list) -> ds.Dataset:
+        located = _locate(self.data_dir, name)
+        if located is None:
+            return ds.dataset(_seed_table(seed_rows, schema))
+        path, fmt = located
+        return ds.dataset(str(path), format=fmt, filesystem=self._filesystem, partitioning="hive")
+
+    # -- alerts ---------------------------------------------------------------
+    @timed("data")
+    def alerts_frame(self) -> pd.DataFrame:
+        # Materialised once per store and shared read-only across sessions.
+        with self._lock:
+            if self._alerts_frame is None:
+                self._alerts_frame = self.alerts.to_table().to_pandas()
+            return self._alerts_frame
+
+    def alert_table(self, case_ids: Optional[Iterable[str]] = None) -> pa.Table:
+        flt = isin("Case ID", case_ids) if case_ids is not None else None
+        return self.alerts.to_table(filter=flt)
+
+    # -- customers ------------------------------------------------------------
+    def customer_table(
+        self,
+        customer_ids: Optional[Iterable[str]] = None,
+        names: Optional[Iterable[str]] = None,
+    ) -> pa.Table:
+        flt = None
+        if customer_ids is not None:
+            flt = isin("Customer ID", customer_ids)
+        if names is not None:
+            name_flt = isin("Customer Name", names)
+            flt = name_flt if flt is None else flt & name_flt
+        return self.customers.to_table(filter=flt)
+
+    # -- transactions ---------------------------------------------------------
+    def transaction_table(
+        self,
+        customer_ids: Optional[Iterable[str]] = None,
+        columns: Optional[list[str]] = None,
+        filter: Optional[ds.Expression] = None,
+    ) -> pa.Table:
+        flt = filter
+        if customer_ids is not None:
+            customer_ids = list(customer_ids)
+            cust_flt = isin("Customer ID", customer_ids)
+            if "bucket" in self.transactions.schema.names:
+                buckets = sorted({customer_bucket(customer_id) for customer_id in customer_ids})
+                cust_flt = cust_flt & ds.field("bucket").isin(pa.array(buckets, self.transactions.schema.field("bucket").type))
+            flt = cust_flt if flt is None else flt & cust_flt
+        return self.transactions.to_table(columns=columns, filter=flt)
+
+    # -- per-customer partitions ----------------------------------------------
+    @timed("data")
+    def customer_transactions(self, customer_id: str) -> pa.Table:
+        # Fetched on first use and kept in a byte-bounded LRU shared by all sessions.
+        with self._lock:
+            table = self._partitions.get(customer_id)
+        if table is not None:
+            return table
+
+        flt = ds.field("Customer ID") == customer_id
+        if "bucket" in self.transactions.schema.names:
+            flt = flt & (ds.field("bucket") == customer_bucket(customer_id))
+        table = self.transactions.to_table(columns=TRANSACTION_SCHEMA.names, filter=flt)
+        with self._lock:
+            self._partitions[customer_id] = table
+        return table
+
+    @timed("data")
+    def transaction_page(
+        self,
+        customer_id: str,
+        filter: Optional[ds.Expression] = None,
+        sort_by: str = "Date",
+        descending: bool = False,
+        page: int = 0,
+        page_size: int = 100,
+        columns: list[str] = TRANSACTION_VIEW_COLUMNS,
+        table: Optional[pa.Table] = None,
+    ) -> TransactionPage:
+        # table overrides the customer's stored partition, e.g. with rule scores appended.
+        if table is None:
+            table = self.customer_transactions(customer_id)
+        if filter is not None:
+            table = table.filter(filter)
+
+        total = table.num_rows
+        page_count = max(1, math.ceil(total / page_size))
+        page = min(max(page, 0), page_count - 1)
+
+        order = "descending" if descending else "ascending"
+        table = table.sort_by([(sort_by, order), ("Transaction ID", "ascending")])
+        rows = table.slice(page * page_size, page_size).select(columns).to_pandas()
+        return TransactionPage(rows, total, page, page_count)
+
+    @timed("data")
+    def transactions_by_id(self, customer_id: str, transaction_ids: Iterable[str]) -> pd.DataFrame:
+        table = self.customer_transactions(customer_id)
+        return table.filter(isin("Transaction ID", transaction_ids)).select(TRANSACTION_VIEW_COLUMNS).to_pandas()
@@ -0,0 +1,121 @@
+import hashlib
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Callable, Iterable, Optional
+
+from cachetools import LRUCache
+
+from audit_store import STATE_DIR
+from data_store import CaseStore
+from evidence_selection import DEFAULT_REASON
+from narrative import DraftResult
+from narrative_templates import TemplateEngine, default_engine
+
+
+DRAFT_CACHE_SIZE = int(os.environ.get("SAR_DRAFT_CACHE_SIZE", "1024"))
+# Set SAR_DRAFT_CACHE_DIR to an empty string to keep the cache in memory only.
+DRAFT_CACHE_DIR = os.environ.get("SAR_DRAFT_CACHE_DIR", str(STATE_DIR / "draft_cache")) or None
+
+
+def draft_key(
+    case_id: str,
+    evidence: Iterable[tuple[str, str]],
+    template_type: str,
+    template_version: str,
+    analyst_summary: str = "",
+    *context: object,
+) -> str:
+    """Stable hash of everything a generated draft depends on.
+
+    ``evidence`` is (Transaction ID, Suspicion Reason) pairs in any order;
+    ``context`` takes extra inputs such as the data version.
+    """
+    payload = {
+        "case": case_id,
+        "evidence": sorted(evidence),
+        "template": template_type,
+        "template_version": template_version,
+        "summary": analyst_summary.strip(),
+        "context": [str(part) for part in context],
+    }
+    return hashlib.sha256(json.dumps(payload, separators=(",", ":")).encode()).hexdigest()
+
+
+def case_draft_key(store: CaseStore, case: dict, template_type: str, engine: Optional[TemplateEngine] = None) -> str:
+    # Batch drafts use every transaction on the customer with the default reason.
+    ids = store.customer_transactions(case["Customer ID"]).column("Transaction ID").to_pylist()
+    engine = engine or default_engine()
+    return draft_key(
+        case["Case ID"],
+        ((tx_id, DEFAULT_REASON) for tx_id in ids),
+        template_type,
+        engine.template_version(template_type),
+        "",
+        store.version,
+    )
+
+
+# -----------------------------------------------------------------------------
+# Two-tier draft cache
+# -----------------------------------------------------------------------------
+class DraftCache:
+    """Generated drafts by content key: an in-memory LRU over an optional directory.
+
+    Disk entries are one JSON file per key, written then renamed, so several
+    processes (e.g. batch workers) can share a directory. Failed results are
+    never cached.
+    """
+
+    def __init__(self, maxsize: int = DRAFT_CACHE_SIZE, directory: Optional[Path] = None):
+        self.directory = Path(directory) if directory else None
+        self._lock = threading.Lock()
+        self._memory: LRUCache = LRUCache(maxsize=maxsize)
+        self.hits = self.disk_hits = self.misses = 0
+
+    def _path(self, key: str) -> Path:
+        return self.directory / key[:2] / f"{key}.json"
+
+    def get(self, key: str) -> Optional[DraftResult]:
+        with self._lock:
+            result = self._memory.get(key)
+            if result is not None:
+                self.hits += 1
+                return result
+        if self.directory is not None:
+            try:
+                result = DraftResult(**json.loads(self._path(key).read_text(encoding="utf-8")))
+            except (OSError, ValueError, TypeError):
+                result = None
+            if result is not None:
+                with self._lock:
+                    self._memory[key] = result
+                    self.disk_hits += 1
+                return result
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, key: str, result: DraftResult) -> DraftResult:
+        if result.error:
+            return result
+        with self._lock:
+            self._memory[key] = result
+        if self.directory is not None:
+            path = self._path(key)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+            tmp.write_text(json.dumps(result.to_dict()), encoding="utf-8")
+            os.replace(tmp, path)
+        return result
+
+    def get_or_create(self, key: str, create: Callable[[], DraftResult]) -> tuple[DraftResult, bool]:
+        cached = self.get(key)
+        if cached is not None:
+            return cached, True
+        return self.put(key, create()), False
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {"entries": len(self._memory), "hits": self.hits, "disk_hits": self.disk_hits, "misses": self.misses}
@@ -0,0 +1,197 @@
+import difflib
+import json
+import re
+import threading
+import zlib
+from datetime import datetime
+from pathlib import Path
+from typing import NamedTuple, Optional
+
+from cachetools import LRUCache
+
+from audit_store import STATE_DIR, TIMESTAMP_FORMAT, connect
+from instrumentation import timed
+
+
+DRAFT_DB = STATE_DIR / "drafts.db"
+# A full snapshot is stored at least every KEYFRAME_INTERVAL versions to bound replay length.
+KEYFRAME_INTERVAL = 16
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS draft_versions (
+    case_id    TEXT    NOT NULL,
+    version    INTEGER NOT NULL,
+    parent     INTEGER,
+    kind       TEXT    NOT NULL CHECK (kind IN ('full', 'delta')),
+    payload    BLOB    NOT NULL,
+    chars      INTEGER NOT NULL,
+    author     TEXT    NOT NULL,
+    created_at TEXT    NOT NULL,
+    PRIMARY KEY (case_id, version)
+) WITHOUT ROWID;
+"""
+
+_TOKEN = re.compile(r"\S+|\s+")
+
+
+class DraftConflict(Exception):
+    """A save was based on an older version than the latest one for the case."""
+
+    def __init__(self, case_id: str, expected: int, latest: "DraftVersion"):
+        super().__init__(f"{case_id} is at v{latest.version} (saved by {latest.author}), not v{expected}")
+        self.case_id = case_id
+        self.expected = expected
+        self.latest = latest
+
+
+class DraftVersion(NamedTuple):
+    case_id: str
+    version: int
+    parent: Optional[int]
+    kind: str
+    stored_bytes: int
+    chars: int
+    author: str
+    created_at: str
+
+
+# -----------------------------------------------------------------------------
+# Delta encoding
+# -----------------------------------------------------------------------------
+def make_delta(parent: str, text: str) -> list:
+    # Word-level edit script: [start, end] copies parent tokens, a string inserts text.
+    old, new = _TOKEN.findall(parent), _TOKEN.findall(text)
+    offsets = [0]
+    for token in old:
+        offsets.append(offsets[-1] + len(token))
+
+    ops: list = []
+    matcher = difflib.SequenceMatcher(None, old, new, autojunk=False)
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == "equal":
+            ops.append([offsets[i1], offsets[i2]])
+        elif j2 > j1:
+            ops.append("".join(new[j1:j2]))
+    return ops
+
+
+def apply_delta(parent: str, ops: list) -> str:
+    return "".join(parent[op[0] : op[1]] if isinstance(op, list) else op for op in ops)
+
+
+def _pack(value) -> bytes:
+    return zlib.compress(json.dumps(value, separators=(",", ":")).encode())
+
+
+def _unpack(payload: bytes):
+    return json.loads(zlib.decompress(payload))
+
+
+# -----------------------------------------------------------------------------
+# Versioned draft store
+# -----------------------------------------------------------------------------
+class DraftStore:
+    """Every saved draft version, stored as a compressed delta against its parent."""
+
+    def __init__(self, path: Path = DRAFT_DB, cache_size: int = 512):
+        self.path = Path(path)
+        self._conn = connect(self.path)
+        self._conn.executescript(SCHEMA)
+        self._lock = threading.RLock()
+        self._texts: LRUCache = LRUCache(maxsize=cache_size)
+
+    def _rows(self, case_id: str, up_to: int) -> list[tuple]:
+        # Newest keyframe at or below `up_to`, then every delta after it.
+        return self._conn.execute(
+            """
+            SELECT version, kind, payload FROM draft_versions
+            WHERE case_id = ? AND version <= ? AND version >= (
+                SELECT MAX(version) FROM draft_versions WHERE case_id = ? AND version <= ? AND kind = 'full'
+            )
+            ORDER BY version
+            """,
+            (case_id, up_to, case_id, up_to),
+        ).fetchall()
+
+    def latest_version(self, case_id: str) -> int:
+        with self._lock:
+            row = self._conn.execute("SELECT MAX(version) FROM draft_versions WHERE case_id = ?", (case_id,)).fetchone()
+        return row[0] or 0
+
+    @timed("data")
+    def text(self, case_id: str, version: Optional[int] = None) -> str:
+        with self._lock:
+            version = version or self.latest_version(case_id)
+            if version == 0:
+                return ""
+            cached = self._texts.get((case_id, version))
+            if cached is not None:
+                return cached
+
+            text = ""
+            for row_version, kind, payload in self._rows(case_id, version):
+                cached = self._texts.get((case_id, row_version))
+                if cached is not None:
+                    text = cached
+                    continue
+                value = _unpack(payload)
+                text = value if kind == "full" else apply_delta(text, value)
+                self._texts[(case_id, row_version)] = text
+            return text
+
+    @timed("data")
+    def save(self, case_id: str, text: str, author: str, expected: Optional[int] = None) -> int:
+        # With `expected`, the save only goes through if the latest version is
+        # still the one the caller started from (0 for a case with no drafts).
+        with self._lock, self._conn:
+            self._conn.execute("BEGIN IMMEDIATE")
+            parent = self.latest_version(case_id)
+            if expected is not None and parent != expected:
+                raise DraftConflict(case_id, expected, self.latest(case_id))
+            version = parent + 1
+
+            kind, payload = "full", _pack(text)
+            if parent and version % KEYFRAME_INTERVAL != 0:
+                delta = _pack(make_delta(self.text(case_id, parent), text))
+                if len(delta) < len(payload):
+                    kind, payload = "delta", delta
+
+            self._conn.execute(
+                "INSERT INTO draft_versions VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    case_id,
+                    version,
+                    parent or None,
+                    kind,
+                    payload,
+                    len(text),
+                    author,
+                    datetime.now().strftime(TIMESTAMP_FORMAT),
+                ),
+            )
+            self._texts[(case_id, version)] = text
+            return version
+
+    def latest(self, case_id: str) -> Optional[DraftVersion]:
+        history = self.history(case_id, limit=1)
+        return history[0] if history else None
+
+    @timed("data")
+    def history(self, case_id: str, limit: int = -1) -> list[DraftVersion]:
+        with self._lock:
+            rows = self._conn.execute(
+                """
+                SELECT case_id, version, parent, kind, LENGTH(payload), chars, author, created_at
+                FROM draft_versions WHERE case_id = ? ORDER BY version DESC LIMIT ?
+                """,
+                (case_id, limit),
+            ).fetchall()
+        return [DraftVersion(*row) for row in rows]
+
+    @timed("data")
+    def diff(self, case_id: str, from_version: int, to_version: int) -> str:
+        before = self.text(case_id, from_version).splitlines(keepends=True)
+        after = self.text(case_id, to_version).splitlines(keepends=True)
+        return "".join(
+            difflib.unified_diff(before, after, fromfile=f"v{from_version}", tofile=f"v{to_version}", lineterm="\n")
+        )
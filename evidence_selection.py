@@ -0,0 +1,128 @@
+import hashlib
+from dataclasses import dataclass, field
+from typing import Optional, Sequence
+
+
+DEFAULT_REASON = "Unusual Pattern"
+
+REASON_OPTIONS = [
+    "Structuring",
+    "Layering",
+    "Rapid Movement",
+    "Sanctions Risk",
+    "Unusual Pattern",
+    "Other",
+]
+
+
+# -----------------------------------------------------------------------------
+# Evidence selection held as IDs plus a reason map
+# -----------------------------------------------------------------------------
+@dataclass
+class SelectionDelta:
+    added: list[str] = field(default_factory=list)
+    removed: list[str] = field(default_factory=list)
+    retagged: list[str] = field(default_factory=list)
+
+    def __bool__(self) -> bool:
+        return bool(self.added or self.removed or self.retagged)
+
+
+@dataclass
+class EvidenceSelection:
+    case_id: str = ""
+    ids: set[str] = field(default_factory=set)
+    reasons: dict[str, str] = field(default_factory=dict)
+    version: int = 0
+    _fingerprint: tuple[int, str] = field(default=(-1, ""), init=False, repr=False, compare=False)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __contains__(self, transaction_id: str) -> bool:
+        return transaction_id in self.ids
+
+    def reason(self, transaction_id: str) -> str:
+        return self.reasons.get(transaction_id, DEFAULT_REASON)
+
+    def sorted_ids(self) -> list[str]:
+        return sorted(self.ids)
+
+    def fingerprint(self) -> str:
+        # Content hash of the selection, recomputed only when the version moves.
+        if self._fingerprint[0] != self.version:
+            digest = hashlib.sha1(self.case_id.encode())
+            for tx_id in self.sorted_ids():
+                digest.update(f"|{tx_id}={self.reason(tx_id)}".encode())
+            self._fingerprint = (self.version, digest.hexdigest())
+        return self._fingerprint[1]
+
+    def apply_edits(
+        self, row_ids: Sequence[str], edited_rows: dict, suggested: Optional[Sequence[str]] = None
+    ) -> SelectionDelta:
+        # edited_rows is st.data_editor's {row position: {column: new value}} delta
+        # against the frame it was given; row_ids maps positions to Transaction IDs.
+        # Newly ticked rows take the suggested reason unless the analyst picked one.
+        delta = SelectionDelta()
+        for pos, changes in edited_rows.items():
+            tx_id = row_ids[int(pos)]
+
+            if "Select" in changes:
+                if changes["Select"] and tx_id not in self.ids:
+                    self.ids.add(tx_id)
+                    if suggested is not None and suggested[int(pos)] != DEFAULT_REASON:
+                        self.reasons[tx_id] = suggested[int(pos)]
+                    delta.added.append(tx_id)
+                elif not changes["Select"] and tx_id in self.ids:
+                    self.ids.discard(tx_id)
+                    self.reasons.pop(tx_id, None)
+                    delta.removed.append(tx_id)
+
+            reason = changes.get("Suspicion Reason")
+            if reason and tx_id in self.ids and reason != self.reason(tx_id):
+                self.reasons[tx_id] = reason
+                if tx_id not in delta.added:
+                    delta.retagged.append(tx_id)
+
+        if delta:
+            self.version += 1
+        return delta
+
+    def tag(self, reasons: dict[str, str]) -> SelectionDelta:
+        # Select each transaction with the given reason, e.g. from network analysis.
+        delta = SelectionDelta()
+        for tx_id, reason in reasons.items():
+            if tx_id not in self.ids:
+                self.ids.add(tx_id)
+                delta.added.append(tx_id)
+            elif reason == self.reason(tx_id):
+                continue
+            else:
+                delta.retagged.append(tx_id)
+            self.reasons[tx_id] = reason
+
+        if delta:
+            self.version += 1
+        return delta
+
+    def copy(self) -> "EvidenceSelection":
+        # Independent snapshot, e.g. for a background job while the analyst keeps editing.
+        return EvidenceSelection(self.case_id, set(self.ids), dict(self.reasons), self.version)
+
+    def clear(self, case_id: str = "") -> None:
+        self.case_id = case_id
+        self.ids.clear()
+        self.reasons.clear()
+        self.version += 1
+
+
+def describe_delta(delta: SelectionDelta, selected_count: int) -> str:
+    parts = []
+    if delta.added:
+        parts.append(f"Added {len(delta.added)} ({', '.join(sorted(delta.added))})")
+    if delta.removed:
+        parts.append(f"removed {len(delta.removed)} ({', '.join(sorted(delta.removed))})")
+    if delta.retagged:
+        parts.append(f"retagged {len(delta.retagged)} ({', '.join(sorted(delta.retagged))})")
+    summary = "; ".join(parts)
+    return f"{summary[:1].upper()}{summary[1:]}. {selected_count} suspicious transactions selected."
@@ -0,0 +1,94 @@
+import os
+from dataclasses import dataclass, field
+
+import numpy as np
+import pandas as pd
+
+from instrumentation import timed
+
+
+STRUCTURING_THRESHOLD = float(os.environ.get("SAR_STRUCTURING_THRESHOLD", "10000"))
+STRUCTURING_MARGIN = 0.10
+ROUND_AMOUNT_UNIT = 1000.0
+# Shared by the rules, the evidence summary and the synthetic data generator.
+HIGH_RISK_COUNTRIES = os.environ.get("SAR_HIGH_RISK_COUNTRIES", "AE,CY,TR,PA,VG,KY,IR,KP,SY,MM").split(",")
+TOP_COUNTERPARTIES = 3
+
+
+def is_round_amount(amounts: np.ndarray) -> np.ndarray:
+    # Whole multiples of ROUND_AMOUNT_UNIT; zero does not count.
+    return (amounts >= ROUND_AMOUNT_UNIT) & (np.mod(amounts, ROUND_AMOUNT_UNIT) == 0)
+
+
+# -----------------------------------------------------------------------------
+# Aggregated view of the selected evidence
+# -----------------------------------------------------------------------------
+@dataclass
+class EvidenceSummary:
+    tx_count: int = 0
+    total_amount: float = 0.0
+    inbound_amount: float = 0.0
+    outbound_amount: float = 0.0
+    first_date: str = "-"
+    last_date: str = "-"
+    active_days: int = 0
+    tx_per_day: float = 0.0
+    amount_per_day: float = 0.0
+    round_amount_count: int = 0
+    structuring_count: int = 0
+    high_risk_count: int = 0
+    top_counterparties: list[str] = field(default_factory=list)
+    reasons: list[str] = field(default_factory=list)
+    country_totals: dict[str, float] = field(default_factory=dict)
+    counterparty_totals: dict[str, float] = field(default_factory=dict)
+
+    @property
+    def empty(self) -> bool:
+        return self.tx_count == 0
+
+    @property
+    def date_range(self) -> str:
+        return f"{self.first_date} to {self.last_date}"
+
+
+def _totals(keys: pd.Series, amounts: np.ndarray) -> dict[str, float]:
+    codes, uniques = pd.factorize(keys, sort=False)
+    sums = np.bincount(codes, weights=amounts, minlength=len(uniques))
+    order = np.argsort(-sums, kind="stable")
+    return {str(uniques[i]): float(sums[i]) for i in order}
+
+
+@timed("aggregate")
+def summarize_evidence(evidence: pd.DataFrame) -> EvidenceSummary:
+    if evidence.empty:
+        return EvidenceSummary()
+
+    amounts = evidence["Amount"].to_numpy(dtype=np.float64)
+    dates = pd.to_datetime(evidence["Date"]).to_numpy()
+    outbound = (evidence["Direction"] == "Outbound").to_numpy()
+
+    first, last = dates.min(), dates.max()
+    active_days = int((last - first) // np.timedelta64(1, "D")) + 1
+    total = float(amounts.sum())
+
+    lower = STRUCTURING_THRESHOLD * (1 - STRUCTURING_MARGIN)
+    counterparty_counts = evidence["Counterparty"].value_counts()
+
+    return EvidenceSummary(
+        tx_count=int(amounts.size),
+        total_amount=total,
+        inbound_amount=float(amounts[~outbound].sum()),
+        outbound_amount=float(amounts[outbound].sum()),
+        first_date=str(pd.Timestamp(first).date()),
+        last_date=str(pd.Timestamp(last).date()),
+        active_days=active_days,
+        tx_per_day=amounts.size / active_days,
+        amount_per_day=total / active_days,
+        round_amount_count=int(np.count_nonzero(is_round_amount(amounts))),
+        structuring_count=int(np.count_nonzero((amounts >= lower) & (amounts < STRUCTURING_THRESHOLD))),
+        high_risk_count=int((evidence["Risk Flag"] == "High").sum()),
+        top_counterparties=counterparty_counts.head(TOP_COUNTERPARTIES).index.tolist(),
+        reasons=sorted(evidence["Suspicion Reason"].unique().tolist()),
+        country_totals=_totals(evidence["Country"], amounts),
+        counterparty_totals=_totals(evidence["Counterparty"], amounts),
+    )
@@ -0,0 +1,265 @@
+import functools
+import os
+import re
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Iterator, Optional
+
+
+ENABLED = os.environ.get("SAR_INSTRUMENTATION", "1") != "0"
+# Prometheus histogram upper bounds, in seconds.
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+MAX_TRACE_SPANS = 500
+METRIC_PREFIX = "sar"
+
+
+@dataclass
+class Span:
+    kind: str
+    name: str
+    started: float
+    depth: int
+    seconds: float = 0.0
+    child_seconds: float = 0.0
+    frontend_bytes: int = 0
+    frontend_messages: int = 0
+
+    @property
+    def self_seconds(self) -> float:
+        # Time not spent in nested instrumented calls, e.g. a renderer's own widget work.
+        return max(0.0, self.seconds - self.child_seconds)
+
+
+@dataclass
+class Series:
+    count: int = 0
+    total: float = 0.0
+    self_total: float = 0.0
+    max: float = 0.0
+    buckets: list[int] = field(default_factory=lambda: [0] * len(LATENCY_BUCKETS))
+    frontend_bytes: int = 0
+    frontend_messages: int = 0
+
+
+# -----------------------------------------------------------------------------
+# Process-wide registry
+# -----------------------------------------------------------------------------
+class MetricsRegistry:
+    """Cumulative timings per (kind, name) since process start."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._series: dict[tuple[str, str], Series] = {}
+
+    def observe(self, span: Span) -> None:
+        with self._lock:
+            series = self._series.get((span.kind, span.name))
+            if series is None:
+                series = self._series[(span.kind, span.name)] = Series()
+            series.count += 1
+            series.total += span.seconds
+            series.self_total += span.self_seconds
+            series.max = max(series.max, span.seconds)
+            for i, bound in enumerate(LATENCY_BUCKETS):
+                if span.seconds <= bound:
+                    series.buckets[i] += 1
+                    break
+            series.frontend_bytes += span.frontend_bytes
+            series.frontend_messages += span.frontend_messages
+
+    def snapshot(self) -> list[dict]:
+        with self._lock:
+            items = sorted(self._series.items(), key=lambda item: item[1].total, reverse=True)
+            return [
+                {
+                    "Kind": kind,
+                    "Name": name,
+                    "Calls": s.count,
+                    "Total ms": round(s.total * 1000, 2),
+                    "Self ms": round(s.self_total * 1000, 2),
+                    "Mean ms": round(s.total * 1000 / s.count, 3),
+                    "Max ms": round(s.max * 1000, 2),
+                    "Frontend KB": round(s.frontend_bytes / 1024, 1),
+                    "Messages": s.frontend_messages,
+                }
+                for (kind, name), s in items
+            ]
+
+    def reset(self) -> None:
+        with self._lock:
+            self._series.clear()
+
+    def prometheus(self) -> str:
+        def labels(kind: str, name: str, **extra: str) -> str:
+            pairs = {"kind": kind, "name": name, **extra}
+            return ",".join(f'{key}="{_escape(value)}"' for key, value in pairs.items())
+
+        seconds = f"{METRIC_PREFIX}_span_seconds"
+        lines = [
+            f"# HELP {seconds} Wall time of instrumented renderers, data access and aggregations.",
+            f"# TYPE {seconds} histogram",
+        ]
+        self_lines = [
+            f"# HELP {METRIC_PREFIX}_span_self_seconds_total Wall time excluding nested instrumented calls.",
+            f"# TYPE {METRIC_PREFIX}_span_self_seconds_total counter",
+        ]
+        byte_lines = [
+            f"# HELP {METRIC_PREFIX}_frontend_bytes_total Bytes of ForwardMsg payload sent to the browser.",
+            f"# TYPE {METRIC_PREFIX}_frontend_bytes_total counter",
+        ]
+        message_lines = [
+            f"# HELP {METRIC_PREFIX}_frontend_messages_total ForwardMsg messages sent to the browser.",
+            f"# TYPE {METRIC_PREFIX}_frontend_messages_total counter",
+        ]
+        with self._lock:
+            for (kind, name), s in sorted(self._series.items()):
+                cumulative = 0
+                for bound, hits in zip(LATENCY_BUCKETS, s.buckets):
+                    cumulative += hits
+                    lines.append(f"{seconds}_bucket{{{labels(kind, name, le=repr(bound))}}} {cumulative}")
+                lines.append(f"{seconds}_bucket{{{labels(kind, name, le='+Inf')}}} {s.count}")
+                lines.append(f"{seconds}_sum{{{labels(kind, name)}}} {s.total:.6f}")
+                lines.append(f"{seconds}_count{{{labels(kind, name)}}} {s.count}")
+                self_lines.append(f"{METRIC_PREFIX}_span_self_seconds_total{{{labels(kind, name)}}} {s.self_total:.6f}")
+                if kind == "render":
+                    byte_lines.append(f"{METRIC_PREFIX}_frontend_bytes_total{{{labels(kind, name)}}} {s.frontend_bytes}")
+                    message_lines.append(f"{METRIC_PREFIX}_frontend_messages_total{{{labels(kind, name)}}} {s.frontend_messages}")
+        return "\n".join(lines + self_lines + byte_lines + message_lines) + "\n"
+
+    def write_textfile(self, path: Path) -> Path:
+        # Write-then-rename so a scraper (e.g. node_exporter's textfile collector) never reads a partial file.
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(path.suffix + ".tmp")
+        tmp.write_text(self.prometheus(), encoding="utf-8")
+        os.replace(tmp, path)
+        return path
+
+
+def _escape(value: str) -> str:
+    return re.sub(r'(["\\])', r"\\\1", value).replace("\n", r"\n")
+
+
+REGISTRY = MetricsRegistry()
+
+
+# -----------------------------------------------------------------------------
+# Per-thread span stack and rerun trace
+# -----------------------------------------------------------------------------
+# Streamlit runs each session's script in its own thread, so thread-local state
+# is per session and per rerun.
+_local = threading.local()
+
+
+def _stack() -> list[Span]:
+    stack = getattr(_local, "stack", None)
+    if stack is None:
+        stack = _local.stack = []
+    return stack
+
+
+def begin_run() -> None:
+    _local.trace = []
+    _local.run_started = time.perf_counter()
+
+
+def _fragment_run() -> bool:
+    # A rerun of fragments alone skips the script body, so nothing else calls begin_run() for it.
+    try:
+        from streamlit.runtime.scriptrunner import get_script_run_ctx
+    except ImportError:
+        return False
+    ctx = get_script_run_ctx(suppress_warning=True)
+    return bool(ctx is not None and ctx.fragment_ids_this_run)
+
+
+def current_trace() -> list[Span]:
+    return sorted(getattr(_local, "trace", []), key=lambda s: s.started)
+
+
+def run_elapsed() -> float:
+    started = getattr(_local, "run_started", None)
+    return time.perf_counter() - started if started is not None else 0.0
+
+
+@contextmanager
+def span(kind: str, name: str) -> Iterator[Optional[Span]]:
+    if not ENABLED:
+        yield None
+        return
+    stack = _stack()
+    current = Span(kind, name, started=time.perf_counter(), depth=len(stack))
+    stack.append(current)
+    try:
+        yield current
+    finally:
+        current.seconds = time.perf_counter() - current.started
+        stack.pop()
+        if stack:
+            stack[-1].child_seconds += current.seconds
+        trace = getattr(_local, "trace", None)
+        if trace is not None and len(trace) < MAX_TRACE_SPANS:
+            trace.append(current)
+        REGISTRY.observe(current)
+
+
+def timed(kind: str, name: Optional[str] = None) -> Callable:
+    """Decorator form of ``span``; the name defaults to the function's qualified name.
+
+    Fragment reruns do not run the script body, so the outermost timed call of
+    one starts a new trace.
+    """
+
+    def decorate(func: Callable) -> Callable:
+        if not ENABLED:
+            return func
+        label = name or func.__qualname__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            # An outermost call during a fragment rerun is that rerun's first span.
+            if not _stack() and _fragment_run():
+                begin_run()
+            with span(kind, label):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorate
+
+
+# -----------------------------------------------------------------------------
+# Frontend payload accounting
+# -----------------------------------------------------------------------------
+def _record_payload(size: int) -> None:
+    for active in _stack():
+        active.frontend_bytes += size
+        active.frontend_messages += 1
+
+
+def track_frontend_payload() -> None:
+    """Count the bytes of every message this session's script sends to the browser.
+
+    Wraps the script-run context's enqueue hook once per script thread; the
+    bytes are attributed to every span open at the time.
+    """
+    if not ENABLED:
+        return
+    try:
+        from streamlit.runtime.scriptrunner import get_script_run_ctx
+    except ImportError:
+        return
+    ctx = get_script_run_ctx(suppress_warning=True)
+    enqueue = getattr(ctx, "_enqueue", None)
+    if enqueue is None or getattr(enqueue, "_sar_tracked", False):
+        return
+
+    def counting_enqueue(msg) -> None:
+        _record_payload(msg.ByteSize())
+        enqueue(msg)
+
+    counting_enqueue._sar_tracked = True
+    ctx._enqueue = counting_enqueue
@@ -0,0 +1,110 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Optional
+
+
+JOB_WORKERS = int(os.environ.get("SAR_JOB_WORKERS", "4"))
+# Finished jobs kept for deduplication and for sessions that have not polled yet.
+MAX_FINISHED_JOBS = 1000
+
+QUEUED = "Queued"
+RUNNING = "Running"
+DONE = "Done"
+FAILED = "Failed"
+
+# A job function gets a progress(fraction, message) callback and returns the job's result.
+Progress = Callable[[float, str], None]
+
+
+@dataclass
+class Job:
+    key: str
+    description: str = ""
+    status: str = QUEUED
+    progress: float = 0.0
+    message: str = "Waiting for a worker"
+    result: Any = None
+    error: str = ""
+    submitted_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+
+    @property
+    def finished(self) -> bool:
+        return self.status in (DONE, FAILED)
+
+    @property
+    def elapsed(self) -> float:
+        return (self.finished_at or time.time()) - (self.started_at or self.submitted_at)
+
+
+# -----------------------------------------------------------------------------
+# Background job queue shared by all sessions
+# -----------------------------------------------------------------------------
+class JobQueue:
+    """Runs jobs on a thread pool and tracks their status and progress.
+
+    Jobs are identified by a caller-supplied key (e.g. a hash of the evidence
+    and template inputs); submitting a key that is queued, running or done
+    returns the existing job instead of starting a second one. Failed jobs are
+    retried on the next submit.
+    """
+
+    def __init__(self, workers: int = JOB_WORKERS, retain: int = MAX_FINISHED_JOBS):
+        self.retain = retain
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="sar-job")
+        self._lock = threading.Lock()
+        self._jobs: OrderedDict[str, Job] = OrderedDict()
+
+    def submit(self, key: str, fn: Callable[[Progress], Any], description: str = "") -> Job:
+        with self._lock:
+            job = self._jobs.get(key)
+            if job is not None and job.status != FAILED:
+                self._jobs.move_to_end(key)
+                return job
+            job = self._jobs[key] = Job(key, description)
+            self._evict()
+        self._pool.submit(self._run, job, fn)
+        return job
+
+    def get(self, key: str) -> Optional[Job]:
+        with self._lock:
+            return self._jobs.get(key)
+
+    def counts(self) -> dict[str, int]:
+        counts = dict.fromkeys((QUEUED, RUNNING, DONE, FAILED), 0)
+        with self._lock:
+            for job in self._jobs.values():
+                counts[job.status] += 1
+        return counts
+
+    def shutdown(self, wait: bool = True) -> None:
+        self._pool.shutdown(wait=wait, cancel_futures=not wait)
+
+    def _evict(self) -> None:
+        # Oldest finished jobs go first; queued and running jobs are never dropped.
+        finished = [key for key, job in self._jobs.items() if job.finished]
+        for key in finished[: max(0, len(finished) - self.retain)]:
+            del self._jobs[key]
+
+    @staticmethod
+    def _run(job: Job, fn: Callable[[Progress], Any]) -> None:
+        def progress(fraction: float, message: str) -> None:
+            job.progress = min(max(fraction, 0.0), 1.0)
+            job.message = message
+
+        job.status, job.started_at, job.message = RUNNING, time.time(), "Started"
+        try:
+            job.result = fn(progress)
+        except Exception as exc:  # surfaced to the session that polls the job
+            job.error = repr(exc)
+            job.status, job.message = FAILED, "Failed"
+        else:
+            job.progress = 1.0
+            job.status, job.message = DONE, "Finished"
+        finally:
+            job.finished_at = time.time()
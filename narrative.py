@@ -0,0 +1,131 @@
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from typing import Optional
+
+import pandas as pd
+
+from counterparty_graph import NetworkSummary
+from data_store import TRANSACTION_VIEW_COLUMNS, CaseStore
+from evidence_selection import DEFAULT_REASON
+from evidence_summary import STRUCTURING_THRESHOLD, EvidenceSummary, summarize_evidence
+from instrumentation import timed
+from narrative_templates import TemplateEngine, default_engine
+
+
+TEMPLATE_TYPES = ["Structuring", "Cross-border laundering", "Sanctions evasion", "Fraud", "Other"]
+
+
+# -----------------------------------------------------------------------------
+# Narrative generation engine
+# -----------------------------------------------------------------------------
+def timestamp() -> str:
+    return datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+
+@dataclass
+class DraftResult:
+    case_id: str
+    alert_id: str
+    template_type: str
+    narrative: str
+    tx_count: int
+    total_amount: float
+    generated_at: str
+    error: Optional[str] = None
+    template_version: str = ""
+    cached: bool = False
+
+    @classmethod
+    def failure(cls, case_id: str, alert_id: str, template_type: str, error: str) -> "DraftResult":
+        return cls(case_id, alert_id, template_type, "", 0, 0.0, timestamp(), error)
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+
+def narrative_context(
+    case: dict,
+    summary: EvidenceSummary,
+    template_type: str,
+    analyst_summary: str = "",
+    network: Optional[NetworkSummary] = None,
+) -> dict:
+    # Everything is pre-formatted so templates only interpolate strings.
+    longest = network.longest_path if network else None
+    return {
+        "template_type": template_type,
+        "typology": template_type.lower(),
+        "case_id": case["Case ID"],
+        "alert_id": case["Alert ID"],
+        "customer_name": case.get("Customer Name", ""),
+        "tx_count": summary.tx_count,
+        "total_amount": f"{summary.total_amount:,.2f}",
+        "inbound_amount": f"{summary.inbound_amount:,.2f}",
+        "outbound_amount": f"{summary.outbound_amount:,.2f}",
+        "date_range": summary.date_range,
+        "tx_per_day": f"{summary.tx_per_day:,.1f}",
+        "amount_per_day": f"{summary.amount_per_day:,.2f}",
+        "counterparties": ", ".join(summary.top_counterparties),
+        "reasons": ", ".join(summary.reasons),
+        "country_count": len(summary.country_totals),
+        "top_countries": ", ".join(list(summary.country_totals)[:3]),
+        "round_amount_count": summary.round_amount_count,
+        "structuring_count": summary.structuring_count,
+        "structuring_threshold": f"{STRUCTURING_THRESHOLD:,.0f}",
+        "high_risk_count": summary.high_risk_count,
+        "analyst_summary": analyst_summary if analyst_summary else "Analyst notes pending additional detail.",
+        "fan_in": network.fan_in if network else 0,
+        "fan_out": network.fan_out if network else 0,
+        "flow_path_count": len(network.paths) if network else 0,
+        "cycle_count": len(network.cycles) if network else 0,
+        "longest_flow": longest.describe() if longest else "",
+        "network_window": f"{network.window_start} to {network.window_end}" if network else "",
+    }
+
+
+@timed("aggregate")
+def build_narrative(
+    case: dict,
+    summary: EvidenceSummary,
+    template_type: str,
+    analyst_summary: str = "",
+    engine: Optional[TemplateEngine] = None,
+    network: Optional[NetworkSummary] = None,
+) -> tuple[str, str]:
+    engine = engine or default_engine()
+    return engine.render(template_type, narrative_context(case, summary, template_type, analyst_summary, network))
+
+
+def case_evidence(store: CaseStore, case: dict, reasons: Optional[dict[str, str]] = None) -> pd.DataFrame:
+    # Without an analyst selection every transaction on the customer is evidence.
+    evidence = store.customer_transactions(case["Customer ID"]).select(TRANSACTION_VIEW_COLUMNS).to_pandas()
+    evidence["Suspicion Reason"] = evidence["Transaction ID"].map(reasons or {}).fillna(DEFAULT_REASON)
+    return evidence
+
+
+def generate_draft(
+    case: dict,
+    summary: EvidenceSummary,
+    template_type: str,
+    analyst_summary: str = "",
+    engine: Optional[TemplateEngine] = None,
+    network: Optional[NetworkSummary] = None,
+) -> DraftResult:
+    narrative, template_version = build_narrative(case, summary, template_type, analyst_summary, engine, network)
+    return DraftResult(
+        case_id=case["Case ID"],
+        alert_id=case["Alert ID"],
+        template_type=template_type,
+        narrative=narrative,
+        tx_count=summary.tx_count,
+        total_amount=summary.total_amount,
+        generated_at=timestamp(),
+        template_version=template_version,
+    )
+
+
+def generate_case_draft(store: CaseStore, case: dict, template_type: str, analyst_summary: str = "") -> DraftResult:
+    summary = summarize_evidence(case_evidence(store, case))
+    if summary.empty:
+        return DraftResult.failure(case["Case ID"], case["Alert ID"], template_type, "No transactions on file for this case.")
+    return generate_draft(case, summary, template_type, analyst_summary)
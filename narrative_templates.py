@@ -0,0 +1,127 @@
+import hashlib
+import os
+import re
+import threading
+import time
+from pathlib import Path
+from typing import NamedTuple, Optional
+
+import jinja2
+
+
+TEMPLATE_DIR = Path(os.environ.get("SAR_TEMPLATE_DIR", Path(__file__).resolve().parent / "templates"))
+TEMPLATE_SUFFIX = ".j2"
+FALLBACK_TEMPLATE = "other"
+# Shared paragraphs, pulled into templates with {% include "partials/<name>.j2" %}.
+PARTIALS_DIR = "partials"
+RELOAD_INTERVAL_SECONDS = 1.0
+
+
+def template_slug(template_type: str) -> str:
+    # "Cross-border laundering" -> "cross_border_laundering"
+    return re.sub(r"[^a-z0-9]+", "_", template_type.lower()).strip("_")
+
+
+class _Partials(NamedTuple):
+    signature: tuple
+    source_hash: str
+    env: jinja2.Environment
+
+
+class _Entry(NamedTuple):
+    signature: tuple
+    source_hash: str
+    template: jinja2.Template
+    next_check: float
+
+
+# -----------------------------------------------------------------------------
+# Compiled, hot-reloadable template cache
+# -----------------------------------------------------------------------------
+class TemplateEngine:
+    """Per-typology Jinja2 templates compiled once and cached by source hash.
+
+    Template files are re-checked at most every ``reload_interval`` seconds, so
+    the render path normally touches no files. Edited files are recompiled;
+    unchanged content keeps its compiled template. A template's hash covers
+    the shared partials too, so editing one gives every template a new version.
+    """
+
+    def __init__(self, template_dir: Path = TEMPLATE_DIR, reload_interval: float = RELOAD_INTERVAL_SECONDS):
+        self.template_dir = Path(template_dir)
+        self.reload_interval = reload_interval
+        self._lock = threading.Lock()
+        self._partials: Optional[_Partials] = None
+        # One entry per slug, holding its compiled template, so the unlocked fast
+        # path reads a single consistent value and an edit replaces the old one.
+        self._entries: dict[str, _Entry] = {}
+
+    def _path(self, slug: str) -> Path:
+        path = self.template_dir / f"{slug}{TEMPLATE_SUFFIX}"
+        if slug != FALLBACK_TEMPLATE and not path.is_file():
+            return self.template_dir / f"{FALLBACK_TEMPLATE}{TEMPLATE_SUFFIX}"
+        return path
+
+    def _load_partials(self) -> _Partials:
+        # Called under the lock. Partials are served from memory, and a change
+        # gets a fresh environment so templates compiled earlier keep theirs.
+        paths = sorted((self.template_dir / PARTIALS_DIR).glob(f"*{TEMPLATE_SUFFIX}"))
+        stats = [path.stat() for path in paths]
+        signature = tuple((path.name, stat.st_mtime_ns, stat.st_size) for path, stat in zip(paths, stats))
+        if self._partials is None or self._partials.signature != signature:
+            sources = {f"{PARTIALS_DIR}/{path.name}": path.read_text(encoding="utf-8") for path in paths}
+            digest = hashlib.sha1()
+            for name, source in sorted(sources.items()):
+                digest.update(f"{name}\0{source}\0".encode())
+            env = jinja2.Environment(
+                loader=jinja2.DictLoader(sources),
+                autoescape=False,
+                undefined=jinja2.StrictUndefined,
+                trim_blocks=True,
+                lstrip_blocks=True,
+            )
+            self._partials = _Partials(signature, digest.hexdigest(), env)
+        return self._partials
+
+    def _resolve(self, template_type: str) -> tuple[str, jinja2.Template]:
+        slug = template_slug(template_type)
+        now = time.monotonic()
+        entry = self._entries.get(slug)
+        if entry is not None and now < entry.next_check:
+            return entry.source_hash, entry.template
+
+        with self._lock:
+            entry = self._entries.get(slug)
+            path = self._path(slug)
+            stat = path.stat()
+            partials = self._load_partials()
+            signature = (stat.st_mtime_ns, stat.st_size, partials.signature)
+            if entry is not None and entry.signature == signature:
+                entry = entry._replace(next_check=now + self.reload_interval)
+            else:
+                source = path.read_text(encoding="utf-8")
+                source_hash = hashlib.sha1(f"{source}\0{partials.source_hash}".encode()).hexdigest()[:12]
+                if entry is None or entry.source_hash != source_hash:
+                    template = partials.env.from_string(source)
+                else:
+                    template = entry.template
+                entry = _Entry(signature, source_hash, template, now + self.reload_interval)
+            self._entries[slug] = entry
+            return entry.source_hash, entry.template
+
+    def template_version(self, template_type: str) -> str:
+        return self._resolve(template_type)[0]
+
+    def render(self, template_type: str, context: dict) -> tuple[str, str]:
+        version, template = self._resolve(template_type)
+        return template.render(context), version
+
+
+_default_engine: Optional[TemplateEngine] = None
+
+
+def default_engine() -> TemplateEngine:
+    global _default_engine
+    if _default_engine is None:
+        _default_engine = TemplateEngine()
+    return _default_engine
@@ -0,0 +1,105 @@
+from pathlib import Path
+
+import pyarrow as pa
+import streamlit as st
+
+from alert_metrics import AlertMetrics, AlertStatusStore
+from audit_store import AUDIT_DB, AuditStore
+from case_index import CaseIndex
+from counterparty_graph import CounterpartyGraph
+from data_store import DATA_DIR, CaseStore, data_version
+from draft_cache import DRAFT_CACHE_DIR, DraftCache
+from draft_store import DRAFT_DB, DraftStore
+from job_queue import JobQueue
+from rules_engine import score_transactions
+from sar_export import FilingStore
+from workflow_store import WorkflowStore
+
+
+STYLESHEET = Path(__file__).resolve().parent / "static" / "styles.css"
+# Resources built per data version are kept for the current version and the
+# one before it, so sessions still finishing a rerun on the old version do
+# not rebuild it, and older versions are released.
+DATA_VERSIONS_KEPT = 2
+
+
+# -----------------------------------------------------------------------------
+# Process-wide resources
+#
+# These live in their own module rather than in app.py so that warmup.py can
+# fill the same cache entries (Streamlit keys them by module and source) in the
+# server process before the first session connects.
+# -----------------------------------------------------------------------------
+@st.cache_resource(show_spinner=False)
+def stylesheet() -> str:
+    # Read once per process; the page sends it as a style-only element. It is not
+    # served through server.enableStaticServing: Streamlit serves .css files from
+    # static/ as text/plain with nosniff, which browsers refuse as a stylesheet.
+    return f"<style>\n{STYLESHEET.read_text(encoding='utf-8')}</style>"
+
+
+@st.cache_data(ttl=60, show_spinner=False)
+def current_data_version() -> str:
+    return data_version(DATA_DIR)
+
+
+@st.cache_resource(max_entries=DATA_VERSIONS_KEPT, show_spinner=False)
+def get_case_store(version: str) -> CaseStore:
+    return CaseStore(DATA_DIR)
+
+
+@st.cache_resource(max_entries=DATA_VERSIONS_KEPT, show_spinner=False)
+def get_case_index(version: str) -> CaseIndex:
+    return CaseIndex.from_store(get_case_store(version))
+
+
+@st.cache_resource(max_entries=DATA_VERSIONS_KEPT, show_spinner="Building counterparty network...")
+def get_counterparty_graph(version: str) -> CounterpartyGraph:
+    return CounterpartyGraph.from_store(get_case_store(version))
+
+
+@st.cache_resource(max_entries=256, show_spinner=False)
+def get_scored_transactions(version: str, customer_id: str) -> pa.Table:
+    # Rules run over the customer's whole history once per data version, not per page.
+    return score_transactions(get_case_store(version).customer_transactions(customer_id))
+
+
+@st.cache_resource(show_spinner=False)
+def get_audit_store() -> AuditStore:
+    return AuditStore(AUDIT_DB)
+
+
+@st.cache_resource(show_spinner=False)
+def get_alert_status_store() -> AlertStatusStore:
+    return AlertStatusStore()
+
+
+@st.cache_resource(max_entries=DATA_VERSIONS_KEPT, show_spinner=False)
+def get_alert_metrics(version: str) -> AlertMetrics:
+    # Counted once per data version, then updated in place as alerts change status.
+    return AlertMetrics.from_store(get_case_store(version), get_case_index(version), get_alert_status_store())
+
+
+@st.cache_resource(show_spinner=False)
+def get_draft_store() -> DraftStore:
+    return DraftStore(DRAFT_DB)
+
+
+@st.cache_resource(show_spinner=False)
+def get_workflow_store() -> WorkflowStore:
+    return WorkflowStore(get_draft_store())
+
+
+@st.cache_resource(show_spinner=False)
+def get_filing_store() -> FilingStore:
+    return FilingStore()
+
+
+@st.cache_resource(show_spinner=False)
+def get_draft_cache() -> DraftCache:
+    return DraftCache(directory=DRAFT_CACHE_DIR)
+
+
+@st.cache_resource(show_spinner=False)
+def get_job_queue() -> JobQueue:
+    return JobQueue()
@@ -0,0 +1,127 @@
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from evidence_selection import DEFAULT_REASON
+from evidence_summary import HIGH_RISK_COUNTRIES, STRUCTURING_MARGIN, STRUCTURING_THRESHOLD, is_round_amount
+from instrumentation import timed
+
+
+# Structuring: this many near-threshold transactions within STRUCTURING_BURST_DAYS of each other.
+STRUCTURING_BURST_COUNT = 3
+STRUCTURING_BURST_DAYS = 7
+# Rapid movement: funds leave within RAPID_DAYS of arriving, carrying on RAPID_RETAINED of the amount.
+RAPID_DAYS = 3
+RAPID_RETAINED = 0.5
+RAPID_MIN_AMOUNT = 1_000.0
+SUGGEST_MIN_SCORE = 40
+
+SCORE_COLUMN = "Score"
+SUGGESTION_COLUMN = "Suggested Reason"
+RULES_COLUMN = "Rules"
+
+# (rule label, suggested reason, points); a transaction's reason comes from its highest-scoring rule.
+RULES = [
+    ("Near threshold", "Structuring", 30),
+    ("Structuring burst", "Structuring", 20),
+    ("Rapid out", "Rapid Movement", 35),
+    ("Passed on", "Layering", 35),
+    ("High-risk country", "Sanctions Risk", 25),
+    ("High risk flag", "Sanctions Risk", 20),
+    ("Medium risk flag", "Unusual Pattern", 8),
+    ("Round amount", "Unusual Pattern", 10),
+]
+RULE_POINTS = np.array([points for _, _, points in RULES], dtype=np.float64)
+RULE_REASONS = np.array([reason for _, reason, _ in RULES], dtype=object)
+
+
+# -----------------------------------------------------------------------------
+# Vectorised rules
+# -----------------------------------------------------------------------------
+def _window_sums(event_days: np.ndarray, event_amounts: np.ndarray, lo: np.ndarray, hi: np.ndarray) -> np.ndarray:
+    # Sum of event amounts with lo <= day <= hi, for every (lo, hi) pair at once.
+    order = np.argsort(event_days, kind="stable")
+    days = event_days[order]
+    cumulative = np.concatenate([[0.0], np.cumsum(event_amounts[order])])
+    return cumulative[np.searchsorted(days, hi, "right")] - cumulative[np.searchsorted(days, lo, "left")]
+
+
+def _window_counts(event_days: np.ndarray, lo: np.ndarray, hi: np.ndarray) -> np.ndarray:
+    days = np.sort(event_days)
+    return np.searchsorted(days, hi, "right") - np.searchsorted(days, lo, "left")
+
+
+def rule_hits(table: pa.Table) -> np.ndarray:
+    """Boolean matrix (transactions x RULES) of which rules each transaction trips.
+
+    Rules look at the customer's whole history, so pass all of the customer's
+    transactions rather than one page.
+    """
+    amount = table.column("Amount").to_numpy()
+    day = table.column("Date").cast(pa.int32()).to_numpy()
+    inbound = pc.equal(table.column("Direction"), "Inbound").to_numpy(zero_copy_only=False)
+    outbound = ~inbound
+    country = pc.is_in(table.column("Country"), value_set=pa.array(HIGH_RISK_COUNTRIES)).to_numpy(zero_copy_only=False)
+    flag = table.column("Risk Flag")
+
+    near = (amount >= STRUCTURING_THRESHOLD * (1 - STRUCTURING_MARGIN)) & (amount < STRUCTURING_THRESHOLD)
+    burst = near & (
+        _window_counts(day[near], day - STRUCTURING_BURST_DAYS, day + STRUCTURING_BURST_DAYS) >= STRUCTURING_BURST_COUNT
+    )
+
+    # Inbound funds in the RAPID_DAYS before each transaction, and outbound funds in the RAPID_DAYS after.
+    received = _window_sums(day[inbound], amount[inbound], day - RAPID_DAYS, day)
+    sent = _window_sums(day[outbound], amount[outbound], day, day + RAPID_DAYS)
+    rapid_out = (
+        outbound
+        & (received >= RAPID_MIN_AMOUNT)
+        & (amount >= RAPID_RETAINED * received)
+        & (amount <= received * 1.05)
+    )
+    passed_on = inbound & (amount >= RAPID_MIN_AMOUNT) & (sent >= RAPID_RETAINED * amount)
+
+    round_amount = is_round_amount(amount)
+    return np.column_stack(
+        [
+            near,
+            burst,
+            rapid_out,
+            passed_on,
+            country,
+            pc.equal(flag, "High").to_numpy(zero_copy_only=False),
+            pc.equal(flag, "Medium").to_numpy(zero_copy_only=False),
+            round_amount,
+        ]
+    )
+
+
+@timed("aggregate")
+def score_transactions(table: pa.Table) -> pa.Table:
+    """Append Score (0-100), Suggested Reason and Rules columns to a customer's transactions."""
+    if table.num_rows == 0:
+        return table.append_column(SCORE_COLUMN, pa.array([], pa.int8())).append_column(
+            SUGGESTION_COLUMN, pa.array([], pa.string())
+        ).append_column(RULES_COLUMN, pa.array([], pa.string()))
+
+    hits = rule_hits(table)
+    points = hits * RULE_POINTS
+    score = np.minimum(points.sum(axis=1), 100).astype(np.int8)
+    reason = np.where(score > 0, RULE_REASONS[points.argmax(axis=1)], DEFAULT_REASON)
+
+    # Rows share few distinct rule combinations, so label each combination once.
+    masks, inverse = np.unique(hits @ (1 << np.arange(len(RULES))), return_inverse=True)
+    labels = pa.array(
+        [", ".join(label for i, (label, _, _) in enumerate(RULES) if mask >> i & 1) for mask in masks.tolist()]
+    )
+    rules = labels.take(pa.array(inverse.ravel()))
+    return (
+        table.append_column(SCORE_COLUMN, pa.array(score))
+        .append_column(SUGGESTION_COLUMN, pa.array(reason, pa.string()))
+        .append_column(RULES_COLUMN, rules)
+    )
+
+
+def suggested_reasons(scored: pa.Table, min_score: int = SUGGEST_MIN_SCORE) -> dict[str, str]:
+    # Transaction ID -> suggested reason for every transaction scoring at least min_score.
+    hits = scored.filter(pc.greater_equal(scored.column(SCORE_COLUMN), min_score))
+    return dict(zip(hits.column("Transaction ID").to_pylist(), hits.column(SUGGESTION_COLUMN).to_pylist()))
@@ -0,0 +1,362 @@
+import argparse
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import xml.etree.ElementTree as ET
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from itertools import islice
+from pathlib import Path
+from typing import Iterable, Iterator, NamedTuple, Optional
+
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+from audit_store import AUDIT_DB, STATE_DIR, TIMESTAMP_FORMAT, connect, connect_readonly, read_events
+from case_index import CaseIndex
+from data_store import DATA_DIR, TRANSACTION_VIEW_COLUMNS, CaseStore, customer_bucket, isin
+from draft_store import DRAFT_DB, DraftStore
+
+
+FILING_DB = STATE_DIR / "filings.db"
+EXPORT_DIR = Path(os.environ.get("SAR_EXPORT_DIR", Path(__file__).resolve().parent / "exports"))
+EXPORT_FORMATS = ["xml", "json"]
+REPORT_VERSION = "1.0"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS filings (
+    filing_id     INTEGER PRIMARY KEY AUTOINCREMENT,
+    case_id       TEXT    NOT NULL,
+    alert_id      TEXT    NOT NULL,
+    customer_id   TEXT    NOT NULL,
+    draft_version INTEGER NOT NULL,
+    evidence      TEXT    NOT NULL,
+    submitted_by  TEXT    NOT NULL,
+    submitted_at  TEXT    NOT NULL,
+    exported_at   TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_filings_pending ON filings (exported_at, filing_id);
+"""
+
+
+class Filing(NamedTuple):
+    filing_id: int
+    case_id: str
+    alert_id: str
+    customer_id: str
+    draft_version: int
+    # Transaction ID -> Suspicion Reason at the time of submission.
+    evidence: dict[str, str]
+    submitted_by: str
+    submitted_at: str
+
+
+class BundleResult(NamedTuple):
+    filing_id: int
+    case_id: str
+    path: str
+    transactions: int
+    audit_events: int
+    size_bytes: int
+    error: Optional[str] = None
+
+
+# -----------------------------------------------------------------------------
+# Submitted SARs
+# -----------------------------------------------------------------------------
+class FilingStore:
+    """Every submitted SAR, with the draft version and evidence it was filed with."""
+
+    def __init__(self, path: Path = FILING_DB):
+        self.path = Path(path)
+        self._conn = connect(self.path)
+        self._conn.executescript(SCHEMA)
+        self._lock = threading.Lock()
+
+    def record(self, case: dict, draft_version: int, evidence: dict[str, str], user: str) -> int:
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                """
+                INSERT INTO filings (case_id, alert_id, customer_id, draft_version, evidence, submitted_by, submitted_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                """,
+                (
+                    case["Case ID"],
+                    case["Alert ID"],
+                    case["Customer ID"],
+                    draft_version,
+                    json.dumps(evidence, sort_keys=True),
+                    user,
+                    datetime.now().strftime(TIMESTAMP_FORMAT),
+                ),
+            )
+        return cursor.lastrowid
+
+    def filings(self, include_exported: bool = False, batch_size: int = 1000) -> Iterator[Filing]:
+        # Keyset pages on filing_id, so memory stays bounded however long the backlog is.
+        last = 0
+        pending = "" if include_exported else "AND exported_at IS NULL"
+        while True:
+            with self._lock:
+                rows = self._conn.execute(
+                    f"""
+                    SELECT filing_id, case_id, alert_id, customer_id, draft_version, evidence, submitted_by, submitted_at
+                    FROM filings WHERE filing_id > ? {pending} ORDER BY filing_id LIMIT ?
+                    """,
+                    (last, batch_size),
+                ).fetchall()
+            if not rows:
+                return
+            for row in rows:
+                yield Filing(*row[:5], json.loads(row[5]), *row[6:])
+            last = rows[-1][0]
+
+    def mark_exported(self, filing_ids: Iterable[int]) -> None:
+        now = datetime.now().strftime(TIMESTAMP_FORMAT)
+        with self._lock, self._conn:
+            self._conn.executemany("UPDATE filings SET exported_at = ? WHERE filing_id = ?", ((now, i) for i in filing_ids))
+
+    def pending_count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM filings WHERE exported_at IS NULL").fetchone()[0]
+
+
+# -----------------------------------------------------------------------------
+# Bundle documents
+# -----------------------------------------------------------------------------
+def _text(value) -> str:
+    return "" if value is None else str(value)
+
+
+def _xml(parent: ET.Element, tag: str, value) -> None:
+    element = ET.SubElement(parent, tag)
+    if isinstance(value, dict):
+        for key, item in value.items():
+            _xml(element, key, item)
+    elif isinstance(value, list):
+        for item in value:
+            _xml(element, tag[:-1] if tag.endswith("s") else "Entry", item)
+    else:
+        element.text = _text(value)
+
+
+def to_xml(report: dict) -> bytes:
+    # Element names are the report keys in CamelCase, e.g. audit_trail -> AuditTrail.
+    def camel(value):
+        if isinstance(value, dict):
+            return {"".join(part.title() for part in key.split("_")): camel(item) for key, item in value.items()}
+        if isinstance(value, list):
+            return [camel(item) for item in value]
+        return value
+
+    root = ET.Element("SuspiciousActivityReport", version=REPORT_VERSION)
+    for key, value in camel(report).items():
+        _xml(root, key, value)
+    ET.indent(root)
+    return ET.tostring(root, encoding="utf-8", xml_declaration=True)
+
+
+def evidence_tables(store: CaseStore, filings: list[Filing]) -> dict[int, pa.Table]:
+    # One scan for the whole group instead of one per customer; filings are
+    # grouped by transaction bucket, so it touches a single partition.
+    ids = set().union(*(filing.evidence for filing in filings))
+    rows = store.transaction_table(
+        [filing.customer_id for filing in filings],
+        columns=TRANSACTION_VIEW_COLUMNS,
+        filter=isin("Transaction ID", ids),
+    ).sort_by([("Date", "ascending"), ("Transaction ID", "ascending")])
+
+    tables = {}
+    for filing in filings:
+        table = rows.filter(isin("Transaction ID", filing.evidence))
+        reasons = [filing.evidence[tx_id] for tx_id in table.column("Transaction ID").to_pylist()]
+        tables[filing.filing_id] = table.append_column("Suspicion Reason", pa.array(reasons, pa.string()))
+    return tables
+
+
+def audit_slice(audit: Optional[sqlite3.Connection], filing: Filing) -> Iterator[dict]:
+    # The case's trail up to and including the submission, bounded and streamed by SQLite.
+    if audit is None:
+        return iter(())
+    return read_events(audit, filing.case_id, until=datetime.strptime(filing.submitted_at, TIMESTAMP_FORMAT))
+
+
+def build_report(
+    filing: Filing,
+    case: dict,
+    customer: dict,
+    narrative: str,
+    evidence: pa.Table,
+    audit: Iterable[dict],
+) -> dict:
+    total = pc.sum(evidence.column("Amount")).as_py() or 0.0
+    return {
+        "filing": {
+            "filing_id": filing.filing_id,
+            "case_id": filing.case_id,
+            "alert_id": filing.alert_id,
+            "submitted_by": filing.submitted_by,
+            "submitted_at": filing.submitted_at,
+            "draft_version": filing.draft_version,
+        },
+        "subject": {
+            "customer_id": filing.customer_id,
+            "name": customer.get("Customer Name"),
+            "date_of_birth": customer.get("Date of Birth"),
+            "nationality": customer.get("Nationality"),
+            "occupation": customer.get("Occupation"),
+            "risk_rating": customer.get("Risk Rating"),
+            "pep": customer.get("PEP"),
+        },
+        "alert": {
+            "risk_level": case.get("Risk Level"),
+            "alert_date": _text(case.get("Alert Date")),
+            "suspicious_amount": case.get("Suspicious Amount"),
+        },
+        "narrative": narrative,
+        "evidence": {
+            "file": "evidence.parquet",
+            "transactions": evidence.num_rows,
+            "total_amount": round(total, 2),
+        },
+        "audit_trail": [{key.lower().replace(" ", "_"): value for key, value in event.items()} for event in audit],
+    }
+
+
+# -----------------------------------------------------------------------------
+# Worker process state
+# -----------------------------------------------------------------------------
+_store: Optional[CaseStore] = None
+_index: Optional[CaseIndex] = None
+_drafts: Optional[DraftStore] = None
+_audit: Optional[sqlite3.Connection] = None
+_out_dir: Optional[Path] = None
+_format = "xml"
+
+
+def _init_worker(data_dir: str, draft_db: str, audit_db: str, out_dir: str, fmt: str) -> None:
+    # Each worker opens the shared stores once and reuses them for every bundle.
+    global _store, _index, _drafts, _audit, _out_dir, _format
+    _store = CaseStore(Path(data_dir))
+    _index = CaseIndex.from_store(_store)
+    _drafts = DraftStore(Path(draft_db))
+    # Workers only read the audit log, so they skip the store's writer thread.
+    _audit = connect_readonly(Path(audit_db)) if Path(audit_db).exists() else None
+    _out_dir, _format = Path(out_dir), fmt
+
+
+def _write_bundle(filing: Filing, evidence: pa.Table) -> BundleResult:
+    bundle = _out_dir / f"{filing.case_id}-{filing.filing_id:06d}"
+    try:
+        case = _index.case(filing.case_id) or {}
+        customer = _index.customer(filing.customer_id) or {}
+        narrative = _drafts.text(filing.case_id, filing.draft_version)
+        report = build_report(filing, case, customer, narrative, evidence, audit_slice(_audit, filing))
+
+        bundle.mkdir(parents=True, exist_ok=True)
+        pq.write_table(evidence, bundle / "evidence.parquet", compression="zstd")
+        report["evidence"]["sha256"] = hashlib.sha256((bundle / "evidence.parquet").read_bytes()).hexdigest()
+        if _format == "xml":
+            document = to_xml(report)
+        else:
+            document = json.dumps(report, indent=2, default=str).encode()
+        (bundle / f"sar.{_format}").write_bytes(document)
+        size = sum(path.stat().st_size for path in bundle.iterdir())
+        return BundleResult(filing.filing_id, filing.case_id, str(bundle), evidence.num_rows, len(report["audit_trail"]), size)
+    except Exception as exc:  # one bad filing must not sink the whole run
+        return BundleResult(filing.filing_id, filing.case_id, str(bundle), 0, 0, 0, repr(exc))
+
+
+def _export(filings: list[Filing]) -> list[BundleResult]:
+    try:
+        tables = evidence_tables(_store, filings)
+    except Exception as exc:
+        return [BundleResult(f.filing_id, f.case_id, "", 0, 0, 0, repr(exc)) for f in filings]
+    return [_write_bundle(filing, tables[filing.filing_id]) for filing in filings]
+
+
+# -----------------------------------------------------------------------------
+# Export driver
+# -----------------------------------------------------------------------------
+def export_bundles(
+    filings: Iterable[Filing],
+    out_dir: Path,
+    fmt: str = "xml",
+    data_dir: Path = DATA_DIR,
+    draft_db: Path = DRAFT_DB,
+    audit_db: Path = AUDIT_DB,
+    workers: Optional[int] = None,
+    chunk_size: int = 1024,
+) -> Iterator[list[BundleResult]]:
+    """Write one bundle per filing, yielding results a chunk at a time.
+
+    Only ``chunk_size`` filings are in flight at once, so memory is bounded by
+    the chunk rather than by the backlog. Within a chunk, filings are grouped
+    by transaction bucket and each group goes to one worker.
+    """
+    out_dir.mkdir(parents=True, exist_ok=True)
+    filings = iter(filings)
+    initargs = (str(data_dir), str(draft_db), str(audit_db), str(out_dir), fmt)
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=initargs) as pool:
+        while True:
+            chunk = list(islice(filings, chunk_size))
+            if not chunk:
+                return
+            groups: dict[int, list[Filing]] = {}
+            for filing in chunk:
+                groups.setdefault(customer_bucket(filing.customer_id), []).append(filing)
+            yield [result for results in pool.map(_export, groups.values()) for result in results]
+
+
+def run_export(
+    store: FilingStore,
+    out_dir: Path,
+    fmt: str = "xml",
+    include_exported: bool = False,
+    **options,
+) -> tuple[int, int]:
+    # Results are appended to manifest.jsonl and marked exported a chunk at a time.
+    exported = failed = 0
+    out_dir.mkdir(parents=True, exist_ok=True)
+    with open(out_dir / "manifest.jsonl", "a", encoding="utf-8") as manifest:
+        for results in export_bundles(store.filings(include_exported), out_dir, fmt, **options):
+            manifest.writelines(json.dumps(result._asdict()) + "\n" for result in results)
+            manifest.flush()
+            store.mark_exported(result.filing_id for result in results if result.error is None)
+            exported += sum(result.error is None for result in results)
+            failed += sum(result.error is not None for result in results)
+    return exported, failed
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Export submitted SARs as filing bundles.")
+    parser.add_argument("--out", type=Path, default=EXPORT_DIR, help="Folder the bundles are written to.")
+    parser.add_argument("--format", choices=EXPORT_FORMATS, default="xml", help="Report document format.")
+    parser.add_argument("--all", action="store_true", help="Re-export filings that were already exported.")
+    parser.add_argument("--data-dir", type=Path, default=DATA_DIR, help="Folder holding alerts/customers/transactions.")
+    parser.add_argument("--filing-db", type=Path, default=FILING_DB)
+    parser.add_argument("--draft-db", type=Path, default=DRAFT_DB)
+    parser.add_argument("--audit-db", type=Path, default=AUDIT_DB)
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="Writer processes.")
+    parser.add_argument("--chunk-size", type=int, default=1024, help="Filings in flight at a time.")
+    args = parser.parse_args(argv)
+
+    exported, failed = run_export(
+        FilingStore(args.filing_db),
+        args.out,
+        args.format,
+        args.all,
+        data_dir=args.data_dir,
+        draft_db=args.draft_db,
+        audit_db=args.audit_db,
+        workers=args.workers,
+        chunk_size=args.chunk_size,
+    )
+    print(f"Exported {exported} SAR bundles ({failed} failed) into {args.out}.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,32 @@
+import pickle
+import sys
+from collections.abc import MutableMapping
+from typing import Any, Optional
+
+
+def estimate_size(value: Any) -> int:
+    # Serialized size is a close, cheap proxy for what a value costs to hold.
+    try:
+        return len(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+    except Exception:
+        return sys.getsizeof(value)
+
+
+# -----------------------------------------------------------------------------
+# Per-session memory report
+# -----------------------------------------------------------------------------
+class SessionStateManager:
+    def __init__(self, state: MutableMapping):
+        self.state = state
+
+    def footprint(self) -> dict[str, int]:
+        sizes = {str(key): estimate_size(value) for key, value in self.state.items()}
+        return dict(sorted(sizes.items(), key=lambda item: item[1], reverse=True))
+
+    def lightweight_state(self, sizes: Optional[dict[str, int]] = None, limit: int = 2048) -> dict:
+        # What the debug panel may render: small values only, large ones summarized.
+        view = {}
+        for key, size in (sizes or self.footprint()).items():
+            value = self.state[key]
+            view[key] = value if size <= limit else f"<{type(value).__name__}, {size:,} bytes>"
+        return view
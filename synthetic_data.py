@@ -0,0 +1,436 @@
+import argparse
+import shutil
+from collections import defaultdict
+from dataclasses import dataclass, field
+from datetime import date
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+from data_store import ALERT_SCHEMA, CUSTOMER_SCHEMA, TRANSACTION_BUCKETS, TRANSACTION_SCHEMA, customer_bucket
+from evidence_summary import HIGH_RISK_COUNTRIES, STRUCTURING_THRESHOLD
+
+
+DEFAULT_CHUNK_ROWS = 1_000_000
+DEFAULT_SUSPECT_RATE = 0.01
+DEFAULT_START = date(2025, 1, 1)
+DEFAULT_DAYS = 365
+
+FIRST_NAMES = [
+    "Sophia", "Liam", "Olivia", "Noah", "Emma", "Amelia", "Oliver", "Isla", "Arjun", "Fatima",
+    "Mohammed", "Chen", "Priya", "Lucas", "Mia", "Omar", "Hannah", "Yusuf", "Grace", "Mateo",
+]
+LAST_NAMES = [
+    "Williams", "Johnson", "Brown", "Davis", "Wilson", "Khan", "Patel", "Smith", "Taylor", "Nguyen",
+    "Garcia", "Ahmed", "Murphy", "Rossi", "Kowalski", "Okafor", "Silva", "Haddad", "Jones", "Evans",
+]
+OCCUPATIONS = [
+    "Import/Export Director", "IT Consultant", "Logistics Owner", "Retail Manager", "Property Broker",
+    "Teacher", "Nurse", "Software Engineer", "Restaurant Owner", "Accountant", "Student", "Retired",
+]
+NATIONALITIES = ["United Kingdom", "Ireland", "UAE", "United States", "Canada", "India", "Poland", "Nigeria"]
+NATIONALITY_WEIGHTS = [0.62, 0.06, 0.05, 0.06, 0.04, 0.08, 0.05, 0.04]
+MONITORING_PLANS = {"Low": "Standard Monitoring", "Medium": "Periodic Review", "High": "Enhanced Monitoring"}
+OFFICERS = ["Mariam Khan", "Daniel Okafor", "Priya Raman", "Tom Fletcher", "Grace Lin"]
+
+DOMESTIC_COUNTRY = "GB"
+COUNTRIES = ["GB", "IE", "FR", "DE", "US", "SG", "HK", "AE", "TR", "CY"]
+COUNTRY_WEIGHTS = [0.81, 0.03, 0.03, 0.03, 0.03, 0.015, 0.015, 0.02, 0.01, 0.01]
+COUNTERPARTY_STEMS = [
+    "Blue Harbor", "Sterling", "Northline", "Atlas", "Redwood", "Falcon", "Meridian", "Crescent",
+    "Summit", "Oakridge", "Silverline", "Harbourview", "Kingsway", "Evergreen", "Pinnacle", "Riverside",
+]
+COUNTERPARTY_KINDS = ["Trading", "Commodities", "Brokers", "Supplies", "Logistics", "Imports", "Retail", "Holdings"]
+
+TYPOLOGIES = ["structuring", "layering", "high_risk_corridor"]
+
+
+# -----------------------------------------------------------------------------
+# Vectorised helpers
+# -----------------------------------------------------------------------------
+def _ids(prefix: str, numbers: np.ndarray, width: int) -> pa.Array:
+    digits = pc.utf8_lpad(pc.cast(pa.array(numbers), pa.string()), width, "0")
+    return pc.binary_join_element_wise(prefix, digits, "")
+
+
+def _dates(start: date, offsets: np.ndarray) -> pa.Array:
+    epoch_day = (start - date(1970, 1, 1)).days
+    return pa.array(np.asarray(offsets, dtype=np.int32) + epoch_day, pa.int32()).cast(pa.date32())
+
+
+def _counterparty_pool(rng: np.random.Generator, size: int = 4000) -> pa.Array:
+    stems = rng.choice(COUNTERPARTY_STEMS, size)
+    kinds = rng.choice(COUNTERPARTY_KINDS, size)
+    suffixes = rng.choice(["Ltd", "LLC", "plc", "GmbH", "FZE"], size)
+    return pa.array([f"{stem} {kind} {suffix}" for stem, kind, suffix in zip(stems, kinds, suffixes)])
+
+
+# -----------------------------------------------------------------------------
+# Typologies
+# -----------------------------------------------------------------------------
+@dataclass
+class PatternRows:
+    owner: list = field(default_factory=list)
+    day: list = field(default_factory=list)
+    amount: list = field(default_factory=list)
+    direction: list = field(default_factory=list)
+    counterparty: list = field(default_factory=list)
+    country: list = field(default_factory=list)
+    risk: list = field(default_factory=list)
+
+    def add(self, owner, day, amount, direction, counterparty, country, risk) -> None:
+        self.owner.append(owner)
+        self.day.append(day)
+        self.amount.append(round(float(amount), 2))
+        self.direction.append(direction)
+        self.counterparty.append(counterparty)
+        self.country.append(country)
+        self.risk.append(risk)
+
+    def __len__(self) -> int:
+        return len(self.owner)
+
+
+def structuring_burst(rows: PatternRows, rng: np.random.Generator, suspect: int, day: int) -> float:
+    # Repeated cash deposits just under the reporting threshold over a few days.
+    count = int(rng.integers(6, 20))
+    amounts = rng.uniform(0.88, 0.995, count) * STRUCTURING_THRESHOLD
+    days = day + np.sort(rng.integers(0, 10, count))
+    for amount, d in zip(amounts, days):
+        branch = f"Cash Deposit - Branch {int(rng.integers(1, 400)):03d}"
+        rows.add(suspect, d, amount, "Inbound", branch, DOMESTIC_COUNTRY, "Medium" if amount < 9500 else "High")
+    return float(amounts.sum())
+
+
+def layering_chain(rows: PatternRows, rng: np.random.Generator, suspect: int, day: int, id_of, n_customers: int) -> float:
+    # Offshore funds hop through several customers (counterparty = the other customer's ID)
+    # before leaving again, losing a small fee at each hop.
+    hops = [suspect, *(int(c) for c in rng.integers(0, n_customers, int(rng.integers(2, 5))))]
+    amount = float(rng.uniform(50_000, 400_000))
+    origin = f"{rng.choice(COUNTERPARTY_STEMS)} Holdings FZE"
+    rows.add(suspect, day, amount, "Inbound", origin, str(rng.choice(HIGH_RISK_COUNTRIES)), "High")
+    initial = amount
+    for sender, receiver in zip(hops, hops[1:]):
+        day += int(rng.integers(1, 4))
+        amount *= float(rng.uniform(0.96, 0.995))
+        rows.add(sender, day, amount, "Outbound", id_of(receiver), DOMESTIC_COUNTRY, "Medium")
+        rows.add(receiver, day, amount, "Inbound", id_of(sender), DOMESTIC_COUNTRY, "Medium")
+    day += int(rng.integers(1, 4))
+    exit_to = f"{rng.choice(COUNTERPARTY_STEMS)} Trading Ltd"
+    rows.add(hops[-1], day, amount * 0.99, "Outbound", exit_to, str(rng.choice(HIGH_RISK_COUNTRIES)), "High")
+    return initial
+
+
+def high_risk_corridor(rows: PatternRows, rng: np.random.Generator, suspect: int, day: int) -> float:
+    # Large wires to and from high-risk jurisdictions within a few weeks.
+    count = int(rng.integers(4, 12))
+    total = 0.0
+    for _ in range(count):
+        amount = float(rng.uniform(20_000, 250_000))
+        direction = "Outbound" if rng.random() < 0.6 else "Inbound"
+        name = f"{rng.choice(COUNTERPARTY_STEMS)} {rng.choice(COUNTERPARTY_KINDS)}"
+        rows.add(suspect, day + int(rng.integers(0, 21)), amount, direction, name, str(rng.choice(HIGH_RISK_COUNTRIES)), "High")
+        total += amount
+    return total
+
+
+# -----------------------------------------------------------------------------
+# Generator
+# -----------------------------------------------------------------------------
+@dataclass
+class GenerationStats:
+    customers: int = 0
+    transactions: int = 0
+    alerts: int = 0
+    pattern_transactions: int = 0
+    by_typology: dict = field(default_factory=lambda: defaultdict(int))
+
+
+class SyntheticDataset:
+    """Seeded AML dataset written to Parquet in bounded memory.
+
+    Customers and transactions are produced chunk by chunk, each chunk from its
+    own ``(seed, chunk)`` random stream, so the same arguments always give the
+    same files. Transactions are written as one Parquet file per ``bucket=NN``
+    hive partition, the layout ``CaseStore`` prunes by customer.
+    """
+
+    def __init__(
+        self,
+        out_dir: Path,
+        n_transactions: int,
+        n_customers: Optional[int] = None,
+        seed: int = 7,
+        chunk_rows: int = DEFAULT_CHUNK_ROWS,
+        suspect_rate: float = DEFAULT_SUSPECT_RATE,
+        start: date = DEFAULT_START,
+        days: int = DEFAULT_DAYS,
+        buckets: int = TRANSACTION_BUCKETS,
+    ):
+        self.out_dir = Path(out_dir)
+        self.n_transactions = int(n_transactions)
+        self.n_customers = int(n_customers or max(10, self.n_transactions // 100))
+        self.seed = seed
+        self.chunk_rows = int(chunk_rows)
+        self.start = start
+        self.days = days
+        self.buckets = buckets
+
+        rng = np.random.default_rng([seed, 0])
+        n_suspects = max(1, int(self.n_customers * suspect_rate))
+        self.suspects = np.sort(rng.choice(self.n_customers, n_suspects, replace=False))
+        self.typology = rng.integers(0, len(TYPOLOGIES), n_suspects)
+        self.pattern_day = rng.integers(0, max(1, days - 30), n_suspects)
+        # Skewed activity: a minority of customers carries most of the volume.
+        activity = rng.lognormal(0.0, 1.0, self.n_customers)
+        self.activity_cdf = np.cumsum(activity) / activity.sum()
+        self.counterparties = _counterparty_pool(rng)
+        self.stats = GenerationStats()
+
+    def _id(self, index: int) -> str:
+        return f"CUST-{index:08d}"
+
+    # -- customers ------------------------------------------------------------
+    def _customer_chunks(self):
+        suspect_mask_all = np.zeros(self.n_customers, dtype=bool)
+        suspect_mask_all[self.suspects] = True
+        for chunk, first in enumerate(range(0, self.n_customers, self.chunk_rows)):
+            rng = np.random.default_rng([self.seed, 1, chunk])
+            index = np.arange(first, min(first + self.chunk_rows, self.n_customers))
+            n = len(index)
+            names = np.char.add(
+                np.char.add(rng.choice(FIRST_NAMES, n), " "), rng.choice(LAST_NAMES, n)
+            )
+            suspect = suspect_mask_all[index]
+            risk = np.where(
+                suspect,
+                rng.choice(["Medium", "High"], n, p=[0.4, 0.6]),
+                rng.choice(["Low", "Medium", "High"], n, p=[0.7, 0.24, 0.06]),
+            )
+            pep = np.where(rng.random(n) < 0.01, "Yes", "No")
+            screening = np.where(rng.random(n) < 0.002, "Potential Match", "No Match")
+            birth = _dates(date(1940, 1, 1), rng.integers(0, 365 * 65, n))
+            yield pa.Table.from_arrays(
+                [
+                    pa.array(names),
+                    _ids("CUST-", index, 8),
+                    pa.array(risk),
+                    pa.array(rng.choice(OCCUPATIONS, n)),
+                    pa.array(rng.choice(NATIONALITIES, n, p=NATIONALITY_WEIGHTS)),
+                    pc.cast(birth, pa.string()),
+                    pa.array(pep),
+                    pa.array(screening),
+                    pa.array([MONITORING_PLANS[r] for r in risk]),
+                ],
+                schema=CUSTOMER_SCHEMA,
+            )
+
+    # -- transactions ---------------------------------------------------------
+    def _patterns(self, chunk: int, n_chunks: int, rng: np.random.Generator, amounts: dict, last_day: dict) -> PatternRows:
+        rows = PatternRows()
+        for k in range(chunk, len(self.suspects), n_chunks):
+            suspect, typology, day = int(self.suspects[k]), TYPOLOGIES[self.typology[k]], int(self.pattern_day[k])
+            before = len(rows)
+            if typology == "structuring":
+                amount = structuring_burst(rows, rng, suspect, day)
+            elif typology == "layering":
+                amount = layering_chain(rows, rng, suspect, day, self._id, self.n_customers)
+            else:
+                amount = high_risk_corridor(rows, rng, suspect, day)
+            amounts[suspect] = amount
+            last_day[suspect] = max(rows.day[before:])
+            self.stats.by_typology[typology] += 1
+        return rows
+
+    def _noise(self, rng: np.random.Generator, n: int) -> dict:
+        # String columns are built by index into small vocabularies, never as numpy strings.
+        country = rng.choice(len(COUNTRIES), n, p=COUNTRY_WEIGHTS)
+        amount = np.round(rng.lognormal(5.5, 1.4, n), 2)
+        high_risk = np.isin(np.array(COUNTRIES), HIGH_RISK_COUNTRIES)[country] & (amount > 5_000)
+        risk = np.where(high_risk, 2, (rng.random(n) < 0.1).astype(np.int8))
+        return {
+            "owner": np.searchsorted(self.activity_cdf, rng.random(n)).clip(0, self.n_customers - 1),
+            "day": rng.integers(0, self.days, n),
+            "amount": amount,
+            "direction": pa.array(["Inbound", "Outbound"]).take(pa.array(rng.random(n) < 0.55, pa.int8())),
+            "counterparty": self.counterparties.take(pa.array(rng.integers(0, len(self.counterparties), n))),
+            "country": pa.array(COUNTRIES).take(pa.array(country)),
+            "risk": pa.array(["Low", "Medium", "High"]).take(pa.array(risk)),
+        }
+
+    def _transaction_chunk(self, chunk: int, n_chunks: int, first_id: int, amounts: dict, last_day: dict) -> tuple[pa.Table, np.ndarray]:
+        rng = np.random.default_rng([self.seed, 2, chunk])
+        rows = min(self.chunk_rows, self.n_transactions - chunk * self.chunk_rows)
+        pattern = self._patterns(chunk, n_chunks, rng, amounts, last_day)
+        noise = self._noise(rng, max(0, rows - len(pattern)))
+
+        columns = {}
+        for key, values in noise.items():
+            planted = getattr(pattern, key)
+            if isinstance(values, pa.Array):
+                columns[key] = pa.concat_arrays([pa.array(planted, pa.string()), values])
+            else:
+                columns[key] = np.concatenate([np.asarray(planted, dtype=values.dtype), values])
+        owner = columns["owner"].astype(np.int64)
+        n = len(owner)
+        table = pa.Table.from_arrays(
+            [
+                _ids("TXN-", np.arange(first_id, first_id + n), 10),
+                _ids("CUST-", owner, 8),
+                _dates(self.start, columns["day"]),
+                pa.array(columns["amount"], pa.float64()),
+                columns["direction"],
+                columns["counterparty"],
+                columns["country"],
+                columns["risk"],
+            ],
+            schema=TRANSACTION_SCHEMA,
+        )
+        self.stats.pattern_transactions += len(pattern)
+        return table, owner
+
+    def _write_transactions(self, amounts: dict, last_day: dict) -> None:
+        root = self.out_dir / "transactions"
+        bucket_of = np.fromiter(
+            (customer_bucket(self._id(i), self.buckets) for i in range(self.n_customers)),
+            dtype=np.int32,
+            count=self.n_customers,
+        )
+        writers: dict[int, pq.ParquetWriter] = {}
+        n_chunks = max(1, -(-self.n_transactions // self.chunk_rows))
+        next_id = 0
+        try:
+            for chunk in range(n_chunks):
+                table, owner = self._transaction_chunk(chunk, n_chunks, next_id, amounts, last_day)
+                next_id += table.num_rows
+                self.stats.transactions += table.num_rows
+
+                # Group rows by bucket with one stable sort instead of a filter per bucket.
+                bucket = bucket_of[owner]
+                order = np.argsort(bucket, kind="stable")
+                table, bucket = table.take(order), bucket[order]
+                bounds = np.searchsorted(bucket, np.arange(self.buckets + 1))
+                for b in range(self.buckets):
+                    lo, hi = bounds[b], bounds[b + 1]
+                    if lo == hi:
+                        continue
+                    if b not in writers:
+                        path = root / f"bucket={b:02d}" / "part-0.parquet"
+                        path.parent.mkdir(parents=True, exist_ok=True)
+                        writers[b] = pq.ParquetWriter(path, TRANSACTION_SCHEMA)
+                    writers[b].write_table(table.slice(lo, hi - lo))
+        finally:
+            for writer in writers.values():
+                writer.close()
+
+    # -- alerts ---------------------------------------------------------------
+    def _alerts(self, amounts: dict, last_day: dict) -> pa.Table:
+        rng = np.random.default_rng([self.seed, 3])
+        # Rule hits on ordinary customers, so not every alert is a true positive.
+        others = rng.choice(self.n_customers, max(1, len(self.suspects) // 3), replace=False)
+        others = others[~np.isin(others, self.suspects)]
+        subjects = np.concatenate([self.suspects, others])
+        n = len(subjects)
+        true_hit = np.arange(n) < len(self.suspects)
+
+        days = np.array(
+            [last_day.get(int(s), 0) for s in subjects], dtype=np.int64
+        ) + rng.integers(1, 6, n)
+        days = np.where(true_hit, days, rng.integers(0, self.days, n))
+        amount = np.where(
+            true_hit,
+            [amounts.get(int(s), 0.0) for s in subjects],
+            rng.uniform(5_000, 40_000, n),
+        )
+        risk = np.where(
+            true_hit,
+            rng.choice(["Medium", "High"], n, p=[0.35, 0.65]),
+            rng.choice(["Low", "Medium"], n, p=[0.7, 0.3]),
+        )
+        names = pq.read_table(self.out_dir / "customers.parquet", columns=["Customer Name"]).column(0)
+
+        order = np.argsort(days, kind="stable")
+        subjects, days, amount, risk = subjects[order], days[order], amount[order], risk[order]
+        number = np.arange(n)
+        return pa.Table.from_arrays(
+            [
+                _ids("ALT-", number, 7),
+                _ids("CASE-", number, 7),
+                _ids("CUST-", subjects, 8),
+                names.take(pa.array(subjects)),
+                pa.array(risk),
+                _dates(self.start, np.minimum(days, self.days + 30)),
+                pa.array(rng.choice(["Open", "Investigating", "Pending", "Closed"], n, p=[0.5, 0.25, 0.15, 0.1])),
+                pa.array(np.round(amount, 2), pa.float64()),
+                pa.array(rng.choice(OFFICERS, n)),
+            ],
+            schema=ALERT_SCHEMA,
+        )
+
+    # -- entry point ----------------------------------------------------------
+    def write(self, overwrite: bool = False) -> GenerationStats:
+        for name in ("alerts.parquet", "customers.parquet", "transactions"):
+            target = self.out_dir / name
+            if target.exists():
+                if not overwrite:
+                    raise FileExistsError(f"{target} already exists; pass overwrite=True to replace it")
+                shutil.rmtree(target) if target.is_dir() else target.unlink()
+        self.out_dir.mkdir(parents=True, exist_ok=True)
+
+        with pq.ParquetWriter(self.out_dir / "customers.parquet", CUSTOMER_SCHEMA) as writer:
+            for table in self._customer_chunks():
+                writer.write_table(table)
+                self.stats.customers += table.num_rows
+
+        amounts: dict[int, float] = {}
+        last_day: dict[int, int] = {}
+        self._write_transactions(amounts, last_day)
+
+        # Written last: its presence marks a complete dataset.
+        alerts = self._alerts(amounts, last_day)
+        pq.write_table(alerts, self.out_dir / "alerts.parquet")
+        self.stats.alerts = alerts.num_rows
+        return self.stats
+
+
+def generate(out_dir: Path, n_transactions: int, overwrite: bool = False, **options) -> GenerationStats:
+    return SyntheticDataset(out_dir, n_transactions, **options).write(overwrite=overwrite)
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Write a seeded synthetic AML dataset to Parquet.")
+    parser.add_argument("--out", type=Path, default=Path("data"), help="Output folder (the app's data folder layout).")
+    parser.add_argument("--transactions", type=float, required=True, help="Number of transactions, e.g. 1e6.")
+    parser.add_argument("--customers", type=float, help="Number of customers (default: transactions / 100).")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--chunk-rows", type=int, default=DEFAULT_CHUNK_ROWS, help="Rows generated per chunk; bounds memory.")
+    parser.add_argument("--suspect-rate", type=float, default=DEFAULT_SUSPECT_RATE, help="Share of customers with a planted typology.")
+    parser.add_argument("--start", type=date.fromisoformat, default=DEFAULT_START, help="First transaction date (YYYY-MM-DD).")
+    parser.add_argument("--days", type=int, default=DEFAULT_DAYS, help="Length of the transaction window in days.")
+    parser.add_argument("--overwrite", action="store_true", help="Replace an existing dataset in --out.")
+    args = parser.parse_args(argv)
+
+    stats = generate(
+        args.out,
+        int(args.transactions),
+        overwrite=args.overwrite,
+        n_customers=int(args.customers) if args.customers else None,
+        seed=args.seed,
+        chunk_rows=args.chunk_rows,
+        suspect_rate=args.suspect_rate,
+        start=args.start,
+        days=args.days,
+    )
+    typologies = ", ".join(f"{name}: {count}" for name, count in sorted(stats.by_typology.items()))
+    print(
+        f"Wrote {stats.customers:,} customers, {stats.transactions:,} transactions "
+        f"({stats.pattern_transactions:,} in planted patterns; {typologies}) and {stats.alerts:,} alerts to {args.out}"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+import cProfile
+import os
+import time
+
+# Set SAR_STARTUP_PROFILE=1 to profile everything from here on, imports included.
+STARTUP_PROFILE = os.environ.get("SAR_STARTUP_PROFILE", "0") != "0"
+_PROFILER = cProfile.Profile() if STARTUP_PROFILE else None
+if _PROFILER is not None:
+    _PROFILER.enable()
+_STARTED = time.perf_counter()
+
+import argparse
+import pstats
+import sys
+from pathlib import Path
+from typing import Callable, Optional
+
+from audit_store import STATE_DIR
+from instrumentation import span
+from narrative import TEMPLATE_TYPES
+from narrative_templates import default_engine
+from resources import (
+    current_data_version,
+    get_alert_metrics,
+    get_audit_store,
+    get_case_index,
+    get_case_store,
+    get_counterparty_graph,
+    get_draft_cache,
+    get_filing_store,
+    get_job_queue,
+    get_scored_transactions,
+    get_workflow_store,
+    stylesheet,
+)
+
+# Seconds spent importing this module's dependencies (pandas, pyarrow, streamlit, jinja2, ...).
+IMPORT_SECONDS = time.perf_counter() - _STARTED
+
+APP = Path(__file__).resolve().parent / "app.py"
+PROFILE_FILE = STATE_DIR / "startup.prof"
+
+
+# -----------------------------------------------------------------------------
+# Warm-up phases
+# -----------------------------------------------------------------------------
+def _case_data() -> None:
+    version = current_data_version()
+    get_case_store(version)
+    get_case_index(version).alert_page()
+    get_alert_metrics(version)
+
+
+def _stores() -> None:
+    get_audit_store()
+    get_workflow_store()
+    get_filing_store()
+    get_draft_cache()
+    get_job_queue()
+
+
+def _templates() -> None:
+    engine = default_engine()
+    for template_type in TEMPLATE_TYPES:
+        engine.template_version(template_type)
+
+
+def _first_case() -> None:
+    # The case every new session opens on.
+    version = current_data_version()
+    index = get_case_index(version)
+    get_scored_transactions(version, index.alert(index.alert_ids()[0])["Customer ID"])
+
+
+def _network() -> None:
+    get_counterparty_graph(current_data_version())
+
+
+def warm_up(network: bool = True) -> list[tuple[str, float]]:
+    """Fill the process-wide caches a first session would otherwise build.
+
+    Returns (phase, seconds) including the import time of this module. Phases
+    are also recorded as "startup" spans, so they show in the Performance panel.
+    """
+    phases: list[tuple[str, Callable[[], None]]] = [
+        ("stylesheet", stylesheet),
+        ("case data", _case_data),
+        ("stores", _stores),
+        ("templates", _templates),
+        ("first case", _first_case),
+    ]
+    if network:
+        phases.append(("counterparty graph", _network))
+
+    timings = [("imports", IMPORT_SECONDS)]
+    for name, phase in phases:
+        started = time.perf_counter()
+        with span("startup", name):
+            phase()
+        timings.append((name, time.perf_counter() - started))
+    return timings
+
+
+def format_timings(timings: list[tuple[str, float]]) -> str:
+    lines = [f"{name:<20} {seconds * 1000:>10,.1f} ms" for name, seconds in timings]
+    lines.append(f"{'total':<20} {sum(seconds for _, seconds in timings) * 1000:>10,.1f} ms")
+    return "\n".join(lines)
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Preload shared caches, then optionally start the app in this process.")
+    parser.add_argument("--serve", action="store_true", help="Start the Streamlit server after warming up.")
+    parser.add_argument("--port", type=int, default=None, help="Server port when serving.")
+    parser.add_argument("--no-network", action="store_true", help="Skip building the counterparty graph.")
+    args = parser.parse_args(argv)
+
+    timings = warm_up(network=not args.no_network)
+    print(format_timings(timings))
+    if _PROFILER is not None:
+        _PROFILER.disable()
+        PROFILE_FILE.parent.mkdir(parents=True, exist_ok=True)
+        _PROFILER.dump_stats(PROFILE_FILE)
+        pstats.Stats(_PROFILER, stream=sys.stdout).sort_stats("cumulative").print_stats(25)
+        print(f"Profile written to {PROFILE_FILE}")
+
+    if args.serve:
+        # The server runs in this process, so sessions find the caches filled above.
+        from streamlit.web import bootstrap
+
+        bootstrap.load_config_options({"server_port": args.port})
+        bootstrap.run(str(APP), False, [], {"server_port": args.port})
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,300 @@
+import argparse
+import gc
+import json
+import random
+import tempfile
+import threading
+import time
+import tracemalloc
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Callable, Optional
+
+import numpy as np
+import pyarrow as pa
+
+from alert_metrics import AlertMetrics
+from audit_store import AuditStore, from_epoch
+from case_index import CaseIndex
+from counterparty_graph import CounterpartyGraph
+from data_store import CaseStore, transaction_filter
+from draft_store import DraftStore
+from evidence_selection import REASON_OPTIONS, EvidenceSelection
+from evidence_summary import summarize_evidence
+from narrative import case_evidence, generate_draft
+from rules_engine import score_transactions
+from synthetic_data import generate
+from workflow_store import WorkflowStore
+
+
+DEFAULT_TRANSACTIONS = [1_000, 100_000]
+DEFAULT_AUDIT_EVENTS = [100, 10_000]
+AUDIT_ACTIONS = ["Alert selected", "Transactions selected", "Narrative generated", "Draft saved", "SAR submitted"]
+
+
+# -----------------------------------------------------------------------------
+# Synthetic datasets
+# -----------------------------------------------------------------------------
+def build_case_data(out_dir: Path, n_transactions: int, seed: int = 7) -> Path:
+    if not (out_dir / "alerts.parquet").exists():
+        generate(out_dir, n_transactions, overwrite=True, seed=seed)
+    return out_dir  # otherwise reuse the dataset built by an earlier run
+
+
+def build_audit_log(path: Path, n_events: int, seed: int = 7) -> AuditStore:
+    fresh = not path.exists()
+    store = AuditStore(path)
+    if fresh:
+        rng = random.Random(seed)
+        start = 1_767_225_600
+        store.append_many(
+            {
+                "Timestamp": from_epoch(start + i * 30),
+                "User": f"user{rng.randrange(50)}",
+                "Action": rng.choice(AUDIT_ACTIONS),
+                "Case ID": f"CASE-{rng.randrange(max(1, n_events // 20)):08d}",
+                "Description": "Synthetic benchmark event.",
+            }
+            for i in range(n_events)
+        )
+        store.flush()
+    return store
+
+
+# -----------------------------------------------------------------------------
+# Measurement
+# -----------------------------------------------------------------------------
+@dataclass
+class FlowResult:
+    flow: str
+    scale: str
+    iterations: int
+    p50_ms: float
+    p95_ms: float
+    p99_ms: float
+    max_ms: float
+    py_peak_mb: float
+    arrow_peak_mb: float
+
+
+class ArrowPeakSampler:
+    # Arrow buffers bypass tracemalloc, so their peak is sampled from the pool.
+    def __init__(self, interval: float = 0.001):
+        self.interval = interval
+        self.pool = pa.default_memory_pool()
+        self.peak = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            self.peak = max(self.peak, self.pool.bytes_allocated())
+            time.sleep(self.interval)
+
+    def __enter__(self) -> "ArrowPeakSampler":
+        self.baseline = self.pool.bytes_allocated()
+        self.peak = self.baseline
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._stop.set()
+        self._thread.join()
+        self.peak = max(self.peak, self.pool.bytes_allocated())
+
+
+def measure(flow: str, scale: str, fn: Callable[[int], None], iterations: int, memory_iterations: int = 3) -> FlowResult:
+    fn(0)  # warm caches the same way a live server would be warm
+    timings = []
+    for i in range(iterations):
+        start = time.perf_counter()
+        fn(i)
+        timings.append((time.perf_counter() - start) * 1000)
+
+    gc.collect()
+    tracemalloc.start()
+    with ArrowPeakSampler() as arrow:
+        for i in range(memory_iterations):
+            fn(iterations + i)
+    _, py_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    p50, p95, p99 = np.percentile(timings, [50, 95, 99])
+    return FlowResult(
+        flow=flow,
+        scale=scale,
+        iterations=iterations,
+        p50_ms=round(float(p50), 3),
+        p95_ms=round(float(p95), 3),
+        p99_ms=round(float(p99), 3),
+        max_ms=round(max(timings), 3),
+        py_peak_mb=round(py_peak / 2**20, 2),
+        arrow_peak_mb=round((arrow.peak - arrow.baseline) / 2**20, 2),
+    )
+
+
+# -----------------------------------------------------------------------------
+# Flows
+# -----------------------------------------------------------------------------
+def case_flows(data_dir: Path, state_dir: Path, scale: str, iterations: int, seed: int) -> list[FlowResult]:
+    store = CaseStore(data_dir)
+    index = CaseIndex.from_store(store)
+    alert_ids = index.alert_ids()
+    rng = random.Random(seed)
+    cases = [index.alert(rng.choice(alert_ids)) for _ in range(64)]
+    drafts = DraftStore(state_dir / f"drafts-{scale}.db")
+    graph = CounterpartyGraph.from_store(store)
+    metrics = AlertMetrics.from_store(store, index)
+    workflow = WorkflowStore(drafts, state_dir / f"workflow-{scale}.db")
+    results = []
+
+    def case_selection(i: int) -> None:
+        case = index.alert(rng.choice(alert_ids))
+        index.customer(case["Customer ID"])
+
+    def dashboard(i: int) -> None:
+        metrics.change(rng.choice(alert_ids), status=rng.choice(["Open", "Under Review", "SAR Filed"]))
+        metrics.counts()
+        metrics.by_age()
+
+    def evidence_selection(i: int) -> None:
+        case = cases[i % len(cases)]
+        page = store.transaction_page(
+            case["Customer ID"],
+            filter=transaction_filter(risk_flags=["High", "Medium"]) if i % 2 else None,
+            sort_by="Amount",
+            descending=True,
+        )
+        ids = page.rows["Transaction ID"].tolist()
+        selection = EvidenceSelection(case["Case ID"])
+        selection.apply_edits(
+            ids, {pos: {"Select": True, "Suspicion Reason": rng.choice(REASON_OPTIONS)} for pos in range(0, len(ids), 3)}
+        )
+        selection.fingerprint()
+
+    def draft_generation(i: int) -> None:
+        case = cases[i % len(cases)]
+        generate_draft(case, summarize_evidence(case_evidence(store, case)), "Structuring", "Benchmark summary.")
+
+    def rule_scoring(i: int) -> None:
+        case = cases[i % len(cases)]
+        score_transactions(store.customer_transactions(case["Customer ID"]))
+
+    def network_analysis(i: int) -> None:
+        case = cases[i % len(cases)]
+        graph.analyze(case["Customer ID"], case["Alert Date"])
+
+    def case_activity(i: int) -> None:
+        # One session's poll: 500 sessions spread over the sample cases, with a save every 50th poll.
+        case_id = cases[i % len(cases)]["Case ID"]
+        session_id = f"session-{i % 500}"
+        workflow.touch(case_id, session_id, "benchmark.user", "Analyst")
+        activity = workflow.activity(case_id)
+        workflow.editors(case_id, exclude=session_id)
+        if i % 50 == 0:
+            workflow.save_draft(case_id, f"Revision {i}.", "benchmark.user", expected=activity.latest.version if activity.latest else 0)
+
+    texts = {}
+
+    def save(i: int) -> None:
+        case = cases[i % len(cases)]
+        base = texts.get(case["Case ID"])
+        if base is None:
+            base = texts[case["Case ID"]] = generate_draft(
+                case, summarize_evidence(case_evidence(store, case)), "Structuring"
+            ).narrative
+        drafts.save(case["Case ID"], f"{base}\n\nRevision note {i}.", "benchmark.user")
+
+    for name, fn in [
+        ("case_selection", case_selection),
+        ("dashboard", dashboard),
+        ("evidence_selection", evidence_selection),
+        ("rule_scoring", rule_scoring),
+        ("network_analysis", network_analysis),
+        ("draft_generation", draft_generation),
+        ("case_activity", case_activity),
+        ("save", save),
+    ]:
+        results.append(measure(name, scale, fn, iterations))
+    workflow.close()
+    return results
+
+
+def audit_flows(store: AuditStore, scale: str, iterations: int, seed: int) -> list[FlowResult]:
+    rng = random.Random(seed)
+    facets = store.facets()
+
+    def audit_filtering(i: int) -> None:
+        kwargs = [
+            {},
+            {"actions": [rng.choice(facets["action"])]},
+            {"user": rng.choice(facets["user"])},
+            {"case_id": rng.choice(facets["case_id"])},
+        ][i % 4]
+        page = store.query(**kwargs)
+        if page.next_key:
+            store.query(before=page.next_key, **kwargs)
+        store.facets()
+
+    return [measure("audit_filtering", scale, audit_filtering, iterations)]
+
+
+# -----------------------------------------------------------------------------
+# Entry point
+# -----------------------------------------------------------------------------
+def run(
+    transactions: list[int],
+    audit_events: list[int],
+    iterations: int,
+    work_dir: Path,
+    seed: int = 7,
+) -> list[FlowResult]:
+    results = []
+    for n in transactions:
+        scale = f"{n:.0e} tx"
+        data_dir = build_case_data(work_dir / f"case-data-{n}-{seed}", n, seed)
+        # Only the datasets are reused; draft and workflow stores start empty on every run.
+        with tempfile.TemporaryDirectory(prefix="sar-benchmark-state-") as state_dir:
+            results.extend(case_flows(data_dir, Path(state_dir), scale, iterations, seed))
+    for n in audit_events:
+        store = build_audit_log(work_dir / f"audit-{n}-{seed}.db", n, seed)
+        results.extend(audit_flows(store, f"{n:.0e} events", iterations, seed))
+        store.close()
+    return results
+
+
+def format_table(results: list[FlowResult]) -> str:
+    header = f"{'flow':<20}{'scale':<14}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'max ms':>10}{'py MB':>9}{'arrow MB':>10}"
+    lines = [header, "-" * len(header)]
+    for r in results:
+        lines.append(
+            f"{r.flow:<20}{r.scale:<14}{r.p50_ms:>10.2f}{r.p95_ms:>10.2f}{r.p99_ms:>10.2f}{r.max_ms:>10.2f}"
+            f"{r.py_peak_mb:>9.2f}{r.arrow_peak_mb:>10.2f}"
+        )
+    return "\n".join(lines)
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the case-review workflow on synthetic data.")
+    parser.add_argument("--transactions", type=float, nargs="+", default=DEFAULT_TRANSACTIONS, help="Transaction counts, e.g. 1e3 1e5 1e7.")
+    parser.add_argument("--audit-events", type=float, nargs="+", default=DEFAULT_AUDIT_EVENTS, help="Audit event counts, e.g. 1e2 1e4 1e6.")
+    parser.add_argument("--iterations", type=int, default=50, help="Timed iterations per flow.")
+    parser.add_argument("--work-dir", type=Path, default=Path(tempfile.gettempdir()) / "sar-benchmark", help="Where datasets are generated and reused.")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--json", type=Path, help="Also write results to this JSON file.")
+    args = parser.parse_args(argv)
+
+    results = run(
+        [int(n) for n in args.transactions],
+        [int(n) for n in args.audit_events],
+        args.iterations,
+        args.work_dir,
+        args.seed,
+    )
+    print(format_table(results))
+    if args.json:
+        args.json.write_text(json.dumps([asdict(r) for r in results], indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,250 @@
+import os
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import NamedTuple, Optional
+
+from cachetools import TTLCache
+
+from audit_store import STATE_DIR, TIMESTAMP_FORMAT, connect
+from draft_store import DraftStore, DraftVersion
+from instrumentation import timed
+
+
+WORKFLOW_DB = STATE_DIR / "workflow.db"
+# A session counts as having a case open until it has been quiet this long.
+PRESENCE_TTL_SECONDS = 30
+# Case snapshots are rebuilt on every change made through the store, and at
+# least this often to pick up drafts written by other processes (e.g. batch runs).
+SNAPSHOT_TTL_SECONDS = int(os.environ.get("SAR_WORKFLOW_REFRESH", "30"))
+
+PENDING = "Pending"
+APPROVED = "Approved"
+REJECTED = "Rejected"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS review_requests (
+    id            INTEGER PRIMARY KEY AUTOINCREMENT,
+    case_id       TEXT    NOT NULL,
+    alert_id      TEXT    NOT NULL,
+    draft_version INTEGER NOT NULL,
+    requested_by  TEXT    NOT NULL,
+    requested_at  TEXT    NOT NULL,
+    status        TEXT    NOT NULL CHECK (status IN ('Pending', 'Approved', 'Rejected')),
+    reviewer      TEXT,
+    decided_at    TEXT,
+    note          TEXT    NOT NULL DEFAULT ''
+);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_review_pending ON review_requests (case_id) WHERE status = 'Pending';
+CREATE INDEX IF NOT EXISTS idx_review_status ON review_requests (status, id);
+CREATE INDEX IF NOT EXISTS idx_review_case   ON review_requests (case_id, id);
+"""
+
+REVIEW_COLUMNS = "id, case_id, alert_id, draft_version, requested_by, requested_at, status, reviewer, decided_at, note"
+
+
+class ReviewRequest(NamedTuple):
+    review_id: int
+    case_id: str
+    alert_id: str
+    draft_version: int
+    requested_by: str
+    requested_at: str
+    status: str
+    reviewer: Optional[str]
+    decided_at: Optional[str]
+    note: str
+
+
+class ReviewConflict(Exception):
+    """A review decision no longer matches the case's pending review."""
+
+
+class Editor(NamedTuple):
+    session_id: str
+    user: str
+    role: str
+    seen_at: float
+
+
+class CaseActivity(NamedTuple):
+    revision: int
+    latest: Optional[DraftVersion]
+    review: Optional[ReviewRequest]
+
+
+def _now() -> str:
+    return datetime.now().strftime(TIMESTAMP_FORMAT)
+
+
+# -----------------------------------------------------------------------------
+# Shared workflow state: drafts, reviews and who has a case open
+# -----------------------------------------------------------------------------
+class WorkflowStore:
+    """Draft saves, the reviewer queue and case presence for every session.
+
+    Each case has an in-memory revision counter that is bumped by every draft
+    save, review change and editor arriving or leaving. Sessions read a case
+    through ``activity``, a snapshot shared by every session on the case that
+    is only rebuilt from SQLite once the counter has moved, so hundreds of
+    sessions watching for changes cost dict lookups rather than queries.
+
+    Counters and presence belong to this process. Sessions served by another
+    server process see its changes only when the snapshot TTL expires.
+    """
+
+    def __init__(self, drafts: DraftStore, path: Path = WORKFLOW_DB):
+        self.path = Path(path)
+        self.drafts = drafts
+        self._conn = connect(self.path)
+        self._conn.executescript(SCHEMA)
+        self._lock = threading.Lock()
+        self._revisions: dict[str, int] = {}
+        self._snapshots: TTLCache = TTLCache(maxsize=4096, ttl=SNAPSHOT_TTL_SECONDS)
+        self._presence: dict[str, dict[str, Editor]] = {}
+        self._session_case: dict[str, str] = {}
+        self._next_sweep = 0.0
+
+    def _notify(self, case_id: str) -> None:
+        with self._lock:
+            self._revisions[case_id] = self._revisions.get(case_id, 0) + 1
+            self._snapshots.pop(case_id, None)
+
+    # -- change notifications -------------------------------------------------
+    def revision(self, case_id: str) -> int:
+        return self._revisions.get(case_id, 0)
+
+    @timed("data")
+    def activity(self, case_id: str) -> CaseActivity:
+        with self._lock:
+            revision = self.revision(case_id)
+            cached = self._snapshots.get(case_id)
+            if cached is not None and cached.revision == revision:
+                return cached
+            snapshot = CaseActivity(revision, self.drafts.latest(case_id), self._review(case_id))
+            self._snapshots[case_id] = snapshot
+            return snapshot
+
+    # -- drafts ---------------------------------------------------------------
+    def save_draft(self, case_id: str, text: str, author: str, expected: Optional[int]) -> int:
+        # Raises DraftConflict if someone saved the case since `expected`.
+        version = self.drafts.save(case_id, text, author, expected=expected)
+        self._notify(case_id)
+        return version
+
+    # -- reviewer queue -------------------------------------------------------
+    def _review(self, case_id: str) -> Optional[ReviewRequest]:
+        row = self._conn.execute(
+            f"SELECT {REVIEW_COLUMNS} FROM review_requests WHERE case_id = ? ORDER BY id DESC LIMIT 1", (case_id,)
+        ).fetchone()
+        return ReviewRequest(*row) if row else None
+
+    def request_review(self, case_id: str, alert_id: str, draft_version: int, user: str) -> ReviewRequest:
+        # A case has at most one pending review; asking again moves it to the new version.
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                """
+                UPDATE review_requests SET draft_version = ?, requested_by = ?, requested_at = ?
+                WHERE case_id = ? AND status = ?
+                """,
+                (draft_version, user, _now(), case_id, PENDING),
+            )
+            if cursor.rowcount == 0:
+                self._conn.execute(
+                    """
+                    INSERT INTO review_requests (case_id, alert_id, draft_version, requested_by, requested_at, status)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                    """,
+                    (case_id, alert_id, draft_version, user, _now(), PENDING),
+                )
+            review = self._review(case_id)
+        self._notify(case_id)
+        return review
+
+    def decide(self, case_id: str, draft_version: int, reviewer: str, approve: bool, note: str = "") -> ReviewRequest:
+        """Approve or reject the pending review of ``draft_version``.
+
+        Raises ReviewConflict if there is no pending review, or if it is for a
+        different version than the one the reviewer read.
+        """
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                """
+                UPDATE review_requests SET status = ?, reviewer = ?, decided_at = ?, note = ?
+                WHERE case_id = ? AND status = ? AND draft_version = ?
+                """,
+                (APPROVED if approve else REJECTED, reviewer, _now(), note, case_id, PENDING, draft_version),
+            )
+            if cursor.rowcount == 0:
+                pending = self._review(case_id)
+                if pending is None or pending.status != PENDING:
+                    raise ReviewConflict(f"{case_id} has no pending review")
+                raise ReviewConflict(f"Review of {case_id} is for v{pending.draft_version}, not v{draft_version}")
+            review = self._review(case_id)
+        self._notify(case_id)
+        return review
+
+    @property
+    def pending_count(self) -> int:
+        # Counted from the status index, so reviews decided by other processes are included.
+        with self._lock:
+            return self._conn.execute(
+                "SELECT COUNT(*) FROM review_requests WHERE status = ?", (PENDING,)
+            ).fetchone()[0]
+
+    @timed("data")
+    def pending(self, limit: int = 100) -> list[ReviewRequest]:
+        # Oldest request first.
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT {REVIEW_COLUMNS} FROM review_requests WHERE status = ? ORDER BY id LIMIT ?", (PENDING, limit)
+            ).fetchall()
+        return [ReviewRequest(*row) for row in rows]
+
+    # -- presence -------------------------------------------------------------
+    def _sweep(self, now: float) -> set[str]:
+        # Called under the lock. Drops sessions that went quiet, on every case.
+        cutoff = now - PRESENCE_TTL_SECONDS
+        changed = set()
+        for case_id, editors in list(self._presence.items()):
+            for expired in [key for key, e in editors.items() if e.seen_at < cutoff]:
+                del editors[expired]
+                self._session_case.pop(expired, None)
+                changed.add(case_id)
+            if not editors:
+                del self._presence[case_id]
+        self._next_sweep = now + PRESENCE_TTL_SECONDS
+        return changed
+
+    def touch(self, case_id: str, session_id: str, user: str, role: str) -> None:
+        # Called on every render of a case; only editors arriving, leaving or
+        # changing role bump the revision.
+        editor = Editor(session_id, user, role, time.monotonic())
+        with self._lock:
+            changed = self._sweep(editor.seen_at) if editor.seen_at >= self._next_sweep else set()
+            previous_case = self._session_case.get(session_id)
+            if previous_case is not None and previous_case != case_id:
+                left = self._presence.get(previous_case, {})
+                if left.pop(session_id, None) is not None:
+                    changed.add(previous_case)
+                if not left:
+                    self._presence.pop(previous_case, None)
+            self._session_case[session_id] = case_id
+            editors = self._presence.setdefault(case_id, {})
+            previous = editors.get(session_id)
+            editors[session_id] = editor
+        if previous is None or (previous.user, previous.role) != (user, role):
+            changed.add(case_id)
+        for changed_case in changed:
+            self._notify(changed_case)
+
+    def editors(self, case_id: str, exclude: Optional[str] = None) -> list[Editor]:
+        cutoff = time.monotonic() - PRESENCE_TTL_SECONDS
+        with self._lock:
+            editors = list(self._presence.get(case_id, {}).values())
+        return [e for e in editors if e.seen_at >= cutoff and e.session_id != exclude]
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()